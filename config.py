@@ -15,3 +15,80 @@ COOKIES = {
 
 # Maximum number of pages to fetch (each page has ~24 tenders)
 MAX_PAGES = 100
+
+# Number of listing pages fetched in parallel (1 = sequential, one page per second)
+FETCH_CONCURRENCY = 4
+
+# Attachments of one tender downloaded in parallel (sync backend; the async backend
+# is bounded by FETCH_CONCURRENCY). All downloads share the Etimad connection pool
+DOWNLOAD_CONCURRENCY = 4
+
+# Background download jobs (POST /api/downloads/jobs): tenders downloaded at the same
+# time, and attachment transfers allowed in flight overall and per host (sync backend)
+DOWNLOAD_JOB_WORKERS = 2
+DOWNLOAD_MAX_CONNECTIONS = 8
+DOWNLOAD_PER_HOST = 4
+
+# Keep each distinct attachment once in data/blobs (by SHA-256) and hardlink it into
+# tender folders, so documents shared between tenders are not stored twice
+DOWNLOAD_DEDUP = True
+
+# HTML-to-PDF rendering (RFP booklets, reports) runs in separate worker processes so
+# WeasyPrint never blocks the web server. Jobs beyond PDF_RENDER_QUEUE waiting are
+# refused, and a job running longer than PDF_RENDER_TIMEOUT seconds is killed
+PDF_RENDER_WORKERS = 2
+PDF_RENDER_QUEUE = 16
+PDF_RENDER_TIMEOUT = 120
+
+# Document extraction for AI analysis: a tender's files are extracted by up to
+# EXTRACTION_WORKERS worker processes at once (1 = one at a time in the web server).
+# A file taking longer than EXTRACTION_TIMEOUT seconds is skipped and listed as an error
+EXTRACTION_WORKERS = 4
+EXTRACTION_TIMEOUT = 300
+
+# PDFs of at least PDF_SHARD_MIN_PAGES pages are extracted in page ranges of
+# PDF_SHARD_PAGES pages spread over the extraction workers (EXTRACTION_TIMEOUT
+# then applies to each range)
+PDF_SHARD_MIN_PAGES = 100
+PDF_SHARD_PAGES = 50
+
+# Rows of each Excel sheet (BOQs, price schedules) written into the extracted text;
+# later rows are still counted in the sheet statistics
+EXCEL_TEXT_MAX_ROWS = 1000
+
+# Save every HTML page TenderAttachmentDownloader fetches under downloads/<tender>/ (debugging only)
+ATTACHMENT_DEBUG_HTML = False
+
+# Scraper backend: 'sync' (requests + thread pool) or 'async' (aiohttp, needs `pip install aiohttp`)
+SCRAPER_BACKEND = 'sync'
+
+# Incremental sync: stop paginating at the first page made only of known tenders
+# and merge new/changed tenders into the local store (use /api/tenders?full=1 for a full crawl)
+INCREMENTAL_SYNC = True
+
+# Seconds before the cached /api/tenders listing is refreshed in the background
+# (stale data is still served immediately while the refresh runs)
+LISTING_CACHE_TTL = 300
+
+# Adaptive rate limiting for every Etimad request (token bucket + AIMD concurrency).
+# The rate starts at RATE_LIMIT_INITIAL_RPS, grows while responses are healthy and is
+# halved (with exponential backoff) on 429/5xx/timeouts. State: /api/rate-limit-status
+RATE_LIMIT_INITIAL_RPS = 2.0
+RATE_LIMIT_MAX_RPS = 20.0
+RATE_LIMIT_MAX_CONCURRENCY = 16
+HTTP_MAX_RETRIES = 3
+
+# Circuit breaker: after CIRCUIT_FAILURE_THRESHOLD consecutive failures (5xx, timeouts,
+# login redirects) Etimad calls fail fast and listings are served from the local store;
+# Etimad is probed in the background every CIRCUIT_RESET_TIMEOUT seconds
+CIRCUIT_FAILURE_THRESHOLD = 5
+CIRCUIT_RESET_TIMEOUT = 30
+
+# Classification requests in flight for the bulk check (/api/tenders/classifications).
+# Results are stored in data/tenders.db, so re-checks only fetch unseen tenders
+CLASSIFICATION_CONCURRENCY = 8
+
+# Fetch the classification of newly listed tenders in the background during listing
+# sync and hide the ones that require classification from /api/tenders
+ENRICH_CLASSIFICATIONS = True
+ENRICHMENT_WORKERS = 4
@@ -1,4 +1,4 @@
-from flask import Flask, render_template, jsonify, send_file, request, make_response
+from flask import Flask, render_template, jsonify, send_file, request, make_response, Response, stream_with_context
 import json
 import os
 import sys
@@ -14,6 +14,11 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 
 # Import scrapers
 from src.scrapers import TenderScraper
+from src.scrapers.http_client import get_http_client
+from src.scrapers.circuit_breaker import CircuitOpenError
+from src.scrapers.attachment_manifest import AttachmentManifest, MANIFEST_NAME
+from src.scrapers.blob_store import BlobStore
+from src.scrapers.download_jobs import DownloadJobManager
 
 # Import config
 import config
@@ -25,9 +30,10 @@ from src.processors import DocumentProcessor
 from src.core import AIAnalyzer
 from src.evaluators import FinancialEvaluator, TechnicalEvaluator, MarketResearcher
 from src.reports import ReportGenerator
+from src.reports.pdf_renderer import RenderError, RenderQueueFull, get_pdf_service
 
 # Import Phase 5 modules for optimization
-from src.core import CacheManager, CostTracker
+from src.core import CacheManager, CostTracker, ListingCache, TenderListing
 
 # Import WeasyPrint for PDF generation
 try:
@@ -144,7 +150,38 @@ def get_cookies():
 
 # Initialize scraper with configuration
 cookies = get_cookies()
-scraper = TenderScraper(cookies=cookies, use_api=config.USE_API)
+if config.SCRAPER_BACKEND == 'async':
+    from src.scrapers.async_scraper import AsyncScraperFacade
+    scraper = AsyncScraperFacade(cookies=cookies, use_api=config.USE_API, concurrency=config.FETCH_CONCURRENCY)
+else:
+    scraper = TenderScraper(cookies=cookies, use_api=config.USE_API, fetch_concurrency=config.FETCH_CONCURRENCY,
+                            download_concurrency=config.DOWNLOAD_CONCURRENCY)
+
+# Shared keep-alive pool used by every outbound Etimad request
+http_client = get_http_client()
+
+# Stale-while-revalidate cache of the filtered listing (keyed by max_pages)
+listing_cache = ListingCache(ttl_seconds=config.LISTING_CACHE_TTL)
+
+# Classify new tenders in the background after each listing fetch; once the queue
+# drains the cached listing is marked stale so the next view drops the excluded ones
+if config.ENRICH_CLASSIFICATIONS:
+    scraper.enable_enrichment(max_workers=config.ENRICHMENT_WORKERS, on_drain=listing_cache.expire)
+
+# Shared attachments are stored once and hardlinked into each tender folder
+if config.DOWNLOAD_DEDUP:
+    scraper.blob_store = BlobStore(Path(__file__).parent.parent / 'data' / 'blobs')
+
+# Worker processes that render HTML to PDF (RFP booklets and reports)
+pdf_service = get_pdf_service()
+
+# Background queue for bulk attachment downloads (/api/downloads/jobs)
+download_jobs = DownloadJobManager(
+    scraper,
+    workers=config.DOWNLOAD_JOB_WORKERS,
+    max_connections=config.DOWNLOAD_MAX_CONNECTIONS,
+    per_host=config.DOWNLOAD_PER_HOST
+)
 
 # Keep-alive tracking
 last_keep_alive_time = None
@@ -157,7 +194,11 @@ analysis_lock = threading.Lock()
 # Initialize analysis modules
 try:
     company_context = CompanyContext()
-    document_processor = DocumentProcessor()
+    document_processor = DocumentProcessor(workers=config.EXTRACTION_WORKERS,
+                                           file_timeout=config.EXTRACTION_TIMEOUT,
+                                           shard_min_pages=config.PDF_SHARD_MIN_PAGES,
+                                           shard_pages=config.PDF_SHARD_PAGES,
+                                           excel_text_rows=config.EXCEL_TEXT_MAX_ROWS)
     ai_analyzer = AIAnalyzer()
     report_generator = ReportGenerator()
     cache_manager = CacheManager()
@@ -201,7 +242,13 @@ def keep_session_alive():
                 'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
             }
             
-            response = requests.get(url, cookies=scraper.cookies, headers=headers, timeout=10)
+            try:
+                response = http_client.get(url, headers=headers, timeout=10)
+            except CircuitOpenError as e:
+                # Etimad is down or logged out - the breaker's own probe handles recovery
+                keep_alive_status = "circuit_open"
+                print(f"⛔ Keep-alive skipped: {e}")
+                continue
             
             if response.status_code == 200:
                 last_keep_alive_time = datetime.now()
@@ -227,18 +274,44 @@ def index():
 
 @app.route('/api/tenders')
 def get_tenders():
-    """API endpoint to fetch and filter tenders"""
+    """
+    API endpoint to fetch and filter tenders
+    
+    Optional paging: page (1-based), page_size, sort (e.g. lastOfferDate or
+    -documentPrice) and fields (comma-separated keys to return). Without
+    page_size every filtered tender is returned.
+    """
     try:
         # Get max_pages from query parameter (default from config)
         max_pages = request.args.get('max_pages', config.MAX_PAGES, type=int)
         
-        # Fetch all tenders (from API or local JSON based on config)
-        tenders = scraper.fetch_all_tenders(max_pages=max_pages)
-        print(f"Fetched {len(tenders)} tenders")
+        page = request.args.get('page', 1, type=int)
+        page_size = request.args.get('page_size', type=int)
+        sort = request.args.get('sort') or None
+        fields = [f.strip() for f in request.args.get('fields', '').split(',') if f.strip()] or None
+        
+        # full=1 forces a complete crawl instead of the incremental delta sync
+        full_crawl = request.args.get('full', '0') in ('1', 'true')
         
-        # Check if we got tenders from API or fell back to JSON
-        if config.USE_API and len(tenders) == 0:
-            # API returned nothing, likely authentication issue
+        def load_listing():
+            # Fetch all tenders (from API or local store based on config)
+            tenders = scraper.fetch_all_tenders(max_pages=max_pages,
+                                                incremental=config.INCREMENTAL_SYNC and not full_crawl)
+            print(f"Fetched {len(tenders)} tenders")
+            
+            if config.USE_API and len(tenders) == 0:
+                # API returned nothing, likely authentication issue - keep the cached list
+                return None
+            
+            # Filter tenders (exclude those requiring تصنيف)
+            filtered = scraper.filter_tenders(tenders)
+            print(f"Filtered to {len(filtered)} tenders")
+            return TenderListing(filtered)
+        
+        # Cached list comes back immediately; a stale one is refreshed in the background
+        listing, cache_status = listing_cache.get(max_pages, load_listing, force=full_crawl)
+        
+        if listing is None:
             return jsonify({
                 'success': False,
                 'error': 'فشل جلب المنافسات من الموقع. الكوكيز قد تكون منتهية الصلاحية.',
@@ -247,15 +320,24 @@ def get_tenders():
                 'tenders': []
             })
         
-        # Filter tenders (exclude those requiring تصنيف)
-        filtered_tenders = scraper.filter_tenders(tenders)
-        print(f"Filtered to {len(filtered_tenders)} tenders")
+        try:
+            tenders_page = listing.page(page=page, page_size=page_size, sort=sort, fields=fields)
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
         
         return jsonify({
             'success': True,
-            'count': len(filtered_tenders),
-            'tenders': filtered_tenders,
-            'source': 'API' if config.USE_API else 'Local JSON'
+            'count': len(tenders_page),
+            'total': len(listing),
+            'page': page,
+            'page_size': page_size,
+            'tenders': tenders_page,
+            'source': 'API' if config.USE_API else 'Local store',
+            'sync': scraper.last_sync_stats,
+            'cache': cache_status,
+            'enrichment': scraper.enricher.snapshot() if scraper.enricher else None,
+            # While the circuit is open the list is the last good snapshot from the local store
+            'circuit': http_client.breaker.state if http_client.breaker else None
         })
     except Exception as e:
         print(f"Error in get_tenders: {str(e)}")
@@ -280,7 +362,7 @@ def download_tender_documents(tender_id):
         print(f"   Reference: {reference_number}")
         
         # Call the download function with error handling
-        folder_path = scraper.download_tender_documents(
+        folder_path, report = scraper.download_tender_attachments(
             tender_id, 
             tender_name=tender_name,
             reference_number=reference_number
@@ -291,7 +373,8 @@ def download_tender_documents(tender_id):
         return jsonify({
             'success': True,
             'message': f'تم تحميل المستندات بنجاح',
-            'folder': folder_path
+            'folder': folder_path,
+            'report': report
         })
         
     except requests.exceptions.Timeout as e:
@@ -320,6 +403,53 @@ def download_tender_documents(tender_id):
             'error': error_msg
         }), 500
 
+@app.route('/api/downloads/jobs', methods=['POST'])
+def create_download_job():
+    """
+    Queue attachment downloads for many tenders
+    Body: {"tenders": [{"tenderId", "tenderName", "referenceNumber"}, ...]} or {"tender_ids": [...]}
+    Returns the job id at once; progress is at /api/downloads/jobs/<job_id>
+    """
+    data = request.get_json(silent=True) or {}
+    tenders = data.get('tenders') or data.get('tender_ids') or []
+    
+    try:
+        job_id = download_jobs.submit(tenders)
+    except ValueError:
+        return jsonify({
+            'success': False,
+            'error': 'لم يتم تحديد منافسات للتحميل'
+        }), 400
+    
+    return jsonify({
+        'success': True,
+        'job_id': job_id,
+        'status_url': f'/api/downloads/jobs/{job_id}'
+    }), 202
+
+@app.route('/api/downloads/jobs', methods=['GET'])
+def list_download_jobs():
+    """Summary of recent download jobs"""
+    return jsonify({
+        'success': True,
+        'jobs': download_jobs.jobs()
+    })
+
+@app.route('/api/downloads/jobs/<job_id>', methods=['GET'])
+def get_download_job(job_id):
+    """Per-tender progress of a download job: files done, bytes transferred, throughput"""
+    job = download_jobs.status(job_id)
+    if job is None:
+        return jsonify({
+            'success': False,
+            'error': 'لم يتم العثور على مهمة التحميل'
+        }), 404
+    
+    return jsonify({
+        'success': True,
+        **job
+    })
+
 @app.route('/api/tender/<path:tender_id_str>/download-pdf', methods=['GET'])
 def download_tender_pdf(tender_id_str):
     """Download tender conditions template as PDF and save to downloads folder"""
@@ -339,7 +469,6 @@ def download_tender_pdf(tender_id_str):
             }), 500
         
         # Fetch HTML from Etimad (server-side to avoid CORS)
-        import requests
         rfp_url = f"https://tenders.etimad.sa/Tender/PrintConditionsTemplateRfp?STenderId={tender_id_str}"
         
         print(f"📄 Fetching RFP HTML from: {rfp_url}")
@@ -357,7 +486,7 @@ def download_tender_pdf(tender_id_str):
             'Upgrade-Insecure-Requests': '1',
         }
         
-        response = requests.get(rfp_url, cookies=scraper.cookies, headers=headers, timeout=30)
+        response = http_client.get(rfp_url, headers=headers, timeout=30)
         
         print(f"   Response status: {response.status_code}")
         
@@ -383,12 +512,6 @@ def download_tender_pdf(tender_id_str):
         
         print(f"✅ Fetched HTML successfully")
         
-        # Save HTML directly (skip PDF conversion issues)
-        print("� Saving HTML file...")
-        html_buffer = BytesIO(html_content.encode('utf-8'))
-        file_extension = 'html'
-        print(f"✅ HTML ready ({len(html_content)} bytes)")
-        
         # Determine folder name (same logic as download endpoint)
         if tender_name and reference_number:
             # Clean strings for safe folder naming
@@ -406,13 +529,48 @@ def download_tender_pdf(tender_id_str):
         tender_folder = downloads_dir / folder_name
         tender_folder.mkdir(parents=True, exist_ok=True)
         
+        pdf_filename = "كراسة_الشروط_والمواصفات.pdf"
+        pdf_path = tender_folder / pdf_filename
+        
+        # Render in the PDF worker processes (Flask threads stay responsive)
+        if request.args.get('async') == '1':
+            try:
+                job_id = pdf_service.submit(html_content, pdf_path, base_url=rfp_url)
+            except RenderQueueFull as e:
+                return jsonify({
+                    'success': False,
+                    'error': str(e)
+                }), 503
+            return jsonify({
+                'success': True,
+                'job_id': job_id,
+                'status_url': f'/api/pdf-jobs/{job_id}',
+                'folder': folder_name,
+                'file': pdf_filename,
+                'path': str(pdf_path)
+            }), 202
+        
+        try:
+            print("🖨️  Rendering PDF...")
+            pdf_service.render(html_content, pdf_path, base_url=rfp_url)
+            print(f"✅ PDF saved to: {pdf_path}")
+            return jsonify({
+                'success': True,
+                'message': 'تم تحميل وحفظ كراسة الشروط بنجاح',
+                'folder': folder_name,
+                'file': pdf_filename,
+                'path': str(pdf_path)
+            })
+        except RenderError as e:
+            print(f"⚠️  PDF rendering failed ({e}), saving HTML instead")
+        
         # Save HTML to the folder
-        html_filename = f"كراسة_الشروط_والمواصفات.{file_extension}"
+        html_filename = "كراسة_الشروط_والمواصفات.html"
         html_path = tender_folder / html_filename
         
         print(f"💾 Saving HTML to: {html_path}")
         with open(html_path, 'wb') as f:
-            f.write(html_buffer.getvalue())
+            f.write(html_content.encode('utf-8'))
         
         print(f"✅ HTML saved successfully!")
         
@@ -433,6 +591,30 @@ def download_tender_pdf(tender_id_str):
             'error': str(e)
         }), 500
 
+@app.route('/api/pdf-jobs', methods=['GET'])
+def list_pdf_jobs():
+    """PDF rendering service state and recent jobs"""
+    return jsonify({
+        'success': True,
+        'service': pdf_service.snapshot(),
+        'jobs': pdf_service.recent_jobs()
+    })
+
+@app.route('/api/pdf-jobs/<job_id>', methods=['GET'])
+def get_pdf_job(job_id):
+    """Status of one PDF rendering job"""
+    job = pdf_service.status(job_id)
+    if job is None:
+        return jsonify({
+            'success': False,
+            'error': 'لم يتم العثور على مهمة إنشاء PDF'
+        }), 404
+    
+    return jsonify({
+        'success': True,
+        **job
+    })
+
 @app.route('/api/tender/<tender_id>/delete', methods=['DELETE'])
 def delete_tender(tender_id):
     """Delete a tender from the list (UI only - doesn't modify JSON file)"""
@@ -456,7 +638,8 @@ def get_keep_alive_status():
         response = {
             'status': keep_alive_status,
             'last_ping': last_keep_alive_time.strftime('%Y-%m-%d %H:%M:%S') if last_keep_alive_time else None,
-            'cookies_count': len(scraper.cookies) if scraper.cookies else 0
+            'cookies_count': len(scraper.cookies) if scraper.cookies else 0,
+            'circuit': http_client.breaker.snapshot() if http_client.breaker else None
         }
         
         return jsonify(response)
@@ -466,12 +649,22 @@ def get_keep_alive_status():
             'error': str(e)
         }), 500
 
+@app.route('/api/rate-limit-status', methods=['GET'])
+def get_rate_limit_status():
+    """Get the adaptive rate limiter state (current rate, concurrency, backoff, counters)"""
+    if http_client.rate_limiter is None:
+        return jsonify({'enabled': False})
+    
+    return jsonify({
+        'enabled': True,
+        **http_client.rate_limiter.snapshot()
+    })
+
 @app.route('/api/update-cookies', methods=['POST'])
 def update_cookies():
     """Update cookies manually from user input"""
     try:
         from datetime import datetime
-        import requests
         
         data = request.get_json()
         cookie_string = data.get('cookies', '').strip()
@@ -532,7 +725,8 @@ def update_cookies():
         try:
             url = "https://tenders.etimad.sa/Tender/AllSupplierTendersAsync"
             params = {'PageSize': 1, 'PageNumber': 1, 'Sort': 'OffersDueDate'}
-            response = requests.get(url, cookies=cookies, params=params, timeout=10)
+            # Test the candidate cookies through the shared pool without installing them yet
+            response = http_client.get(url, cookies=cookies, params=params, timeout=10)
             
             if response.status_code != 200:
                 return jsonify({
@@ -571,11 +765,13 @@ def update_cookies():
         # Update config
         config.COOKIES = cookies
         
-        # Update the scraper with new cookies
-        global scraper
-        scraper = TenderScraper(cookies=cookies, use_api=config.USE_API)
+        # Swap credentials on the live connection pool (no new scraper needed)
+        scraper.update_cookies(cookies)
         print("✅ Updated scraper with new cookies")
         
+        # Next listing request re-crawls with the new credentials
+        listing_cache.expire()
+        
         return jsonify({
             'success': True,
             'message': f'تم تحديث الكوكيز بنجاح! وجدنا {total_tenders} منافسة',
@@ -595,16 +791,20 @@ def update_cookies():
 
 @app.route('/api/tender/<tender_id_str>/classification')
 def get_tender_classification(tender_id_str):
-    """Get classification (التصنيف) for a specific tender"""
+    """Get classification (التصنيف) for a specific tender (stored result if any, refresh=1 to re-fetch)"""
     try:
-        classification_info = scraper.get_tender_classification(tender_id_str)
+        refresh = request.args.get('refresh', '0') in ('1', 'true')
+        _, classification_info, cached = next(
+            scraper.iter_tender_classifications([tender_id_str], refresh=refresh)
+        )
         
         if classification_info:
             return jsonify({
                 'success': True,
                 'classification': classification_info['classification'],
                 'requires_classification': classification_info['requires_classification'],
-                'bundles': classification_info.get('bundles', [])
+                'bundles': classification_info.get('bundles', []),
+                'cached': cached
             })
         else:
             return jsonify({
@@ -621,6 +821,46 @@ def get_tender_classification(tender_id_str):
             'error': str(e)
         }), 500
 
+@app.route('/api/tenders/classifications', methods=['POST'])
+def get_tender_classifications():
+    """
+    Classifications for many tenders, streamed as NDJSON (one line per tender, in
+    completion order). Body: {"tender_ids": [tenderIdString, ...], "refresh": false}
+    """
+    data = request.get_json(silent=True) or {}
+    tender_ids = [str(tid) for tid in data.get('tender_ids', []) if tid]
+    refresh = bool(data.get('refresh', False))
+    
+    if not tender_ids:
+        return jsonify({
+            'success': False,
+            'error': 'No tender IDs provided'
+        }), 400
+    
+    print(f"\n🔍 Bulk classification check for {len(tender_ids)} tenders")
+    
+    def generate():
+        for tender_id_str, classification_info, cached in scraper.iter_tender_classifications(
+                tender_ids, concurrency=config.CLASSIFICATION_CONCURRENCY, refresh=refresh):
+            if classification_info:
+                line = {
+                    'tenderIdString': tender_id_str,
+                    'success': True,
+                    'classification': classification_info['classification'],
+                    'requires_classification': classification_info['requires_classification'],
+                    'bundles': classification_info.get('bundles', []),
+                    'cached': cached
+                }
+            else:
+                line = {
+                    'tenderIdString': tender_id_str,
+                    'success': False,
+                    'error': 'Failed to fetch classification'
+                }
+            yield json.dumps(line, ensure_ascii=False) + '\n'
+    
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
 @app.route('/api/proxy/etimad', methods=['GET', 'POST'])
 def proxy_etimad():
     """
@@ -628,8 +868,6 @@ def proxy_etimad():
     Accepts a 'url' parameter and forwards the request with proper cookies
     """
     try:
-        import requests
-        
         # Get the target URL from query parameter
         target_url = request.args.get('url')
         
@@ -660,17 +898,15 @@ def proxy_etimad():
         
         # Forward the request with cookies
         if request.method == 'POST':
-            response = requests.post(
+            response = http_client.post(
                 target_url, 
-                cookies=scraper.cookies, 
                 headers=headers,
                 data=request.get_data(),
                 timeout=30
             )
         else:
-            response = requests.get(
+            response = http_client.get(
                 target_url, 
-                cookies=scraper.cookies, 
                 headers=headers,
                 timeout=30
             )
@@ -742,7 +978,7 @@ def analyze_tender_task(tender_id, tender_folder):
         
         # If not in cache, process documents
         if not extracted_data:
-            extracted_data = document_processor.process_folder(tender_folder)
+            extracted_data = document_processor.process_folder(tender_folder, cache=cache_manager)
             # Cache the results
             if cache_manager:
                 cache_manager.set_document_cache(folder_path, extracted_data)
@@ -1151,9 +1387,21 @@ def get_downloads():
                     'modified_at': datetime.fromtimestamp(folder.stat().st_mtime).isoformat(),
                 }
                 
-                # Count files in folder
-                files = list(folder.glob('*'))
-                tender_info['file_count'] = len([f for f in files if f.is_file()])
+                # Count files in folder (partial downloads and the manifest itself excluded)
+                files = [f for f in folder.iterdir()
+                         if f.is_file() and f.name != MANIFEST_NAME and f.suffix not in ('.part', '.tmp')]
+                tender_info['file_count'] = len(files)
+                tender_info['total_size'] = sum(f.stat().st_size for f in files)
+                
+                # Attachment manifest: which of those files the scraper downloaded, and when
+                manifest = AttachmentManifest(str(folder))
+                if manifest.files:
+                    names = {f.name for f in files}
+                    entries = [entry for entry in manifest.files.values() if entry.get('filename') in names]
+                    tender_info['attachment_count'] = len(entries)
+                    tender_info['last_downloaded_at'] = max(
+                        (entry.get('downloaded_at') or '' for entry in entries), default=''
+                    ) or None
                 
                 # Check for analysis result
                 analysis_file = folder / 'analysis_result.json'
@@ -1216,6 +1464,10 @@ def delete_download(folder_name):
         import shutil
         shutil.rmtree(folder_path)
         
+        # Drop attachments no other tender folder shares
+        if scraper.blob_store is not None:
+            scraper.blob_store.prune()
+        
         return jsonify({
             'success': True,
             'message': f'تم حذف المجلد: {folder_name}'
@@ -1373,6 +1625,8 @@ def get_cache_stats():
             }), 500
         
         stats = cache_manager.get_cache_stats()
+        if scraper.blob_store is not None:
+            stats['attachment_blobs'] = scraper.blob_store.snapshot()
         
         return jsonify({
             'success': True,
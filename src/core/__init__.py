@@ -1,10 +1,11 @@
 """
 Core Module
-Contains the main AI analyzer, cache manager, and cost tracker
+Contains the main AI analyzer, cache manager, cost tracker and listing cache
 """
 
 from .ai_analyzer import AIAnalyzer
 from .cache_manager import CacheManager
 from .cost_tracker import CostTracker
+from .listing_cache import ListingCache, TenderListing
 
-__all__ = ['AIAnalyzer', 'CacheManager', 'CostTracker']
+__all__ = ['AIAnalyzer', 'CacheManager', 'CostTracker', 'ListingCache', 'TenderListing']
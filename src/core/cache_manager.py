@@ -8,12 +8,16 @@ import json
 import hashlib
 from pathlib import Path
 from datetime import datetime, timedelta
-from typing import Dict, Optional, Any
+from typing import Dict, Iterable, Optional, Any
 import logging
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Attachment manifest written into each tender folder by the scraper
+# (src/scrapers/attachment_manifest.py; not imported, so the cache stays free of scraper dependencies)
+MANIFEST_NAME = 'manifest.json'
+
 
 class CacheManager:
     """Manages caching for tender analysis to avoid redundant processing"""
@@ -32,9 +36,11 @@ class CacheManager:
         self.documents_cache = self.cache_dir / "documents"
         self.search_cache = self.cache_dir / "search"
         self.analysis_cache = self.cache_dir / "analysis"
+        self.extractions_cache = self.documents_cache / "files"
         
         # Create subdirectories
         self.documents_cache.mkdir(exist_ok=True)
+        self.extractions_cache.mkdir(exist_ok=True)
         self.search_cache.mkdir(exist_ok=True)
         self.analysis_cache.mkdir(exist_ok=True)
         
@@ -65,10 +71,52 @@ class CacheManager:
             logger.error(f"Failed to hash file {file_path}: {e}")
             return ""
     
+    def _get_file_sha256(self, file_path: Path) -> str:
+        """SHA-256 of a file (the hash the attachment manifest records), or "" on error"""
+        hash_sha256 = hashlib.sha256()
+        try:
+            with open(file_path, "rb") as f:
+                for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                    hash_sha256.update(chunk)
+            return hash_sha256.hexdigest()
+        except Exception as e:
+            logger.error(f"Failed to hash file {file_path}: {e}")
+            return ""
+    
+    def _load_manifest_hashes(self, folder_path: Path) -> Dict[str, str]:
+        """
+        Content hashes recorded in the folder's attachment manifest.json, for files
+        still on disk with the recorded size and mtime
+        
+        Args:
+            folder_path: Path to tender folder
+            
+        Returns:
+            {filename: sha256}
+        """
+        try:
+            with open(folder_path / MANIFEST_NAME, 'r', encoding='utf-8') as f:
+                entries = json.load(f).get('files', {}).values()
+        except (OSError, ValueError):
+            return {}
+        
+        hashes = {}
+        for entry in entries:
+            try:
+                stat = (folder_path / entry['filename']).stat()
+            except (OSError, KeyError):
+                continue
+            if entry.get('sha256') and stat.st_size == entry.get('size') and stat.st_mtime == entry.get('mtime'):
+                hashes[entry['filename']] = entry['sha256']
+        return hashes
+    
     def _get_folder_hash(self, folder_path: Path) -> str:
         """
         Get combined hash of all files in a folder
         
+        Attachments recorded in the folder's manifest.json reuse the hash computed
+        while downloading; other files are hashed here.
+        
         Args:
             folder_path: Path to folder
             
@@ -77,9 +125,13 @@ class CacheManager:
         """
         hashes = []
         try:
+            known = self._load_manifest_hashes(folder_path)
             for file_path in sorted(folder_path.rglob("*")):
-                if file_path.is_file():
-                    file_hash = self._get_file_hash(file_path)
+                if file_path.is_file() and file_path.name != MANIFEST_NAME and file_path.suffix != '.part':
+                    if file_path.parent == folder_path and file_path.name in known:
+                        file_hash = known[file_path.name]
+                    else:
+                        file_hash = self._get_file_hash(file_path)
                     if file_hash:
                         hashes.append(f"{file_path.name}:{file_hash}")
             
@@ -179,6 +231,86 @@ class CacheManager:
             logger.error(f"Failed to save document cache: {e}")
             return False
     
+    def get_file_hashes(self, folder_path: Path, files: Iterable[Path]) -> Dict[Path, str]:
+        """
+        SHA-256 of each file, reusing the hashes recorded in the folder's manifest.json
+        
+        Args:
+            folder_path: Path to tender folder
+            files: Files inside the folder
+            
+        Returns:
+            {file_path: sha256} (files that could not be read are left out)
+        """
+        known = self._load_manifest_hashes(folder_path)
+        hashes = {}
+        for file_path in files:
+            file_hash = known.get(file_path.name) if file_path.parent == folder_path else None
+            file_hash = file_hash or self._get_file_sha256(file_path)
+            if file_hash:
+                hashes[file_path] = file_hash
+        return hashes
+    
+    def _extraction_cache_file(self, file_hash: str, suffix: str, version: str) -> Path:
+        return self.extractions_cache / file_hash[:2] / f"{file_hash}{suffix}.v{version}.json"
+    
+    def get_extraction_cache(self, file_hash: str, suffix: str, version: str) -> Optional[Dict]:
+        """
+        Get the cached extraction of one file
+        
+        Args:
+            file_hash: SHA-256 of the file content
+            suffix: File extension (content is extracted according to it)
+            version: Extractor version (and output-affecting settings) the entry must have been produced with
+            
+        Returns:
+            {'category', 'entry'} as stored by set_extraction_cache, or None
+        """
+        cache_file = self._extraction_cache_file(file_hash, suffix, version)
+        if not self._is_cache_valid(cache_file, self.document_cache_days):
+            return None
+        
+        try:
+            with open(cache_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            logger.error(f"Failed to read extraction cache: {e}")
+            return None
+    
+    def set_extraction_cache(self, file_hash: str, suffix: str, version: str, category: str,
+                             entry: Optional[Dict]) -> bool:
+        """
+        Cache the extraction of one file
+        
+        Args:
+            file_hash: SHA-256 of the file content
+            suffix: File extension
+            version: Extractor version (and output-affecting settings) that produced the entry
+            category: process_folder() result key the entry belongs to
+            entry: Extracted entry without its filename (None if the file had no text)
+            
+        Returns:
+            True if successful, False otherwise
+        """
+        cache_file = self._extraction_cache_file(file_hash, suffix, version)
+        tmp_file = cache_file.with_suffix('.tmp')
+        
+        try:
+            cache_file.parent.mkdir(exist_ok=True)
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump({
+                    'category': category,
+                    'entry': entry,
+                    'cached_at': datetime.now().isoformat()
+                }, f, ensure_ascii=False)
+            os.replace(tmp_file, cache_file)
+            return True
+        except Exception as e:
+            logger.error(f"Failed to save extraction cache: {e}")
+            if tmp_file.exists():
+                tmp_file.unlink()
+            return False
+    
     def get_search_cache(self, query: str) -> Optional[Dict]:
         """
         Get cached search results
@@ -306,6 +438,8 @@ class CacheManager:
             if cache_type in ["documents", "all"]:
                 for file in self.documents_cache.glob("*.json"):
                     file.unlink()
+                for file in self.extractions_cache.glob("*/*.json"):
+                    file.unlink()
                 logger.info("✅ Documents cache cleared")
             
             if cache_type in ["search", "all"]:
@@ -334,15 +468,17 @@ class CacheManager:
             doc_count = len(list(self.documents_cache.glob("*.json")))
             search_count = len(list(self.search_cache.glob("*.json")))
             analysis_count = len(list(self.analysis_cache.glob("*.json")))
+            extraction_files = list(self.extractions_cache.glob("*/*.json"))
             
             # Calculate total size
-            total_size = 0
+            total_size = sum(file.stat().st_size for file in extraction_files)
             for cache_dir in [self.documents_cache, self.search_cache, self.analysis_cache]:
                 for file in cache_dir.glob("*.json"):
                     total_size += file.stat().st_size
             
             return {
                 'documents_cached': doc_count,
+                'file_extractions_cached': len(extraction_files),
                 'searches_cached': search_count,
                 'analyses_cached': analysis_count,
                 'total_cache_size_mb': round(total_size / (1024 * 1024), 2),
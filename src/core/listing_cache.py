@@ -0,0 +1,233 @@
+"""
+Listing Cache Module
+Stale-while-revalidate cache for the tender listing served by /api/tenders,
+and the paged/sorted view over it
+"""
+
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, List, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class _Entry:
+    """Cached value for one key plus its refresh state"""
+
+    def __init__(self):
+        self.value = None
+        self.loaded_at = None
+        self.refreshing = False
+        self.forced = False         # the running refresh is a forced (full) load
+        self.expired = False
+        self.done = threading.Event()
+        self.last_error = None
+        self.queued_loader = None   # forced load to run once the running refresh ends
+        self.queued_done = None
+
+
+class ListingCache:
+    """
+    Serves the last crawled listing immediately and refreshes it in the background
+
+    - No data yet: the caller waits for the first crawl
+    - Fresh data (younger than ttl_seconds): returned as is
+    - Stale data: returned as is, and one background refresh is started
+    Refreshes of the same key are coalesced: while one is running, other
+    callers get the cached value (or wait on the running crawl) instead of
+    starting a second one. A forced call made during a background (possibly
+    incremental) refresh queues one forced load to run right after it.
+    """
+
+    def __init__(self, ttl_seconds: float = 300):
+        """
+        Initialize listing cache
+
+        Args:
+            ttl_seconds: Age after which cached data is considered stale
+        """
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._entries: Dict[Hashable, _Entry] = {}
+
+    def get(self, key: Hashable, loader: Callable[[], Optional[Any]], force: bool = False):
+        """
+        Get the cached value for key
+
+        Args:
+            key: Cache key (e.g. the requested max_pages)
+            loader: Zero-argument callable doing the crawl; returns None when there is
+                    nothing usable (the previous value is then kept)
+            force: Wait for a fresh crawl instead of serving cached data
+
+        Returns:
+            (value, status) - value is None only if no crawl has ever succeeded
+        """
+        with self._lock:
+            entry = self._entries.setdefault(key, _Entry())
+            must_wait = force or entry.value is None
+            if must_wait or self._is_stale(entry):
+                done = self._start_refresh(key, entry, loader, forced=force)
+
+        if must_wait:
+            done.wait()
+
+        with self._lock:
+            return entry.value, self._status(entry)
+
+    def expire(self):
+        """Mark every entry stale so the next request triggers a refresh"""
+        with self._lock:
+            for entry in self._entries.values():
+                entry.expired = True
+
+    def status(self, key: Hashable) -> Dict[str, Any]:
+        """Age and refresh state of one key"""
+        with self._lock:
+            return self._status(self._entries.get(key, _Entry()))
+
+    def _is_stale(self, entry: _Entry) -> bool:
+        return entry.expired or entry.loaded_at is None or time.time() - entry.loaded_at >= self.ttl_seconds
+
+    def _start_refresh(self, key, entry: _Entry, loader, forced: bool = False) -> threading.Event:
+        """
+        Start a background refresh unless one is already running (caller holds the lock)
+
+        A forced refresh requested while a non-forced one is running is queued
+        behind it (several such requests share one queued load).
+
+        Returns:
+            Event set when the refresh the caller should wait for has finished
+        """
+        if not entry.refreshing:
+            entry.refreshing = True
+            entry.forced = forced
+            entry.done = threading.Event()
+            threading.Thread(target=self._refresh, args=(key, entry, loader), daemon=True).start()
+            return entry.done
+
+        if forced and not entry.forced:
+            if entry.queued_done is None:
+                entry.queued_done = threading.Event()
+            entry.queued_loader = loader
+            return entry.queued_done
+        return entry.done
+
+    def _refresh(self, key, entry: _Entry, loader):
+        """Run the loader and store its result, then any forced load queued meanwhile"""
+        while loader is not None:
+            try:
+                value, error = loader(), None
+            except Exception as e:
+                logger.error(f"Listing refresh failed for {key}: {e}")
+                value, error = None, str(e)
+
+            with self._lock:
+                if value is not None:
+                    entry.value = value
+                    entry.loaded_at = time.time()
+                    entry.expired = False
+                entry.last_error = error
+                entry.done.set()
+
+                loader, entry.queued_loader = entry.queued_loader, None
+                if loader is None:
+                    entry.refreshing = False
+                    entry.forced = False
+                else:
+                    entry.forced = True
+                    entry.done, entry.queued_done = entry.queued_done, None
+
+    def _status(self, entry: _Entry) -> Dict[str, Any]:
+        age = None if entry.loaded_at is None else round(time.time() - entry.loaded_at, 1)
+        return {
+            'age_seconds': age,
+            'loaded_at': entry.loaded_at,
+            'stale': self._is_stale(entry),
+            'refreshing': entry.refreshing,
+            'ttl_seconds': self.ttl_seconds,
+            'last_error': entry.last_error,
+        }
+
+
+class TenderListing:
+    """
+    Filtered tender rows with lazily built sort orders, served page by page
+
+    Rows keep the order they were loaded in (newest submission first). Each sort
+    order is computed once per listing and reused by every page request until the
+    cache replaces the listing.
+    """
+
+    # Sortable row fields -> key function (missing values always sort last)
+    SORT_KEYS = {
+        'lastOfferDate': lambda v: str(v),
+        'documentPrice': lambda v: float(v),
+        'tenderName': lambda v: str(v),
+        'agencyName': lambda v: str(v),
+        'referenceNumber': lambda v: str(v),
+    }
+
+    def __init__(self, rows: List[Dict[str, Any]]):
+        self.rows = rows
+        self.fields = set(rows[0]) if rows else set()
+        self._orders: Dict[str, List[int]] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.rows)
+
+    def _order(self, sort: str) -> List[int]:
+        """Row indexes for a sort spec like 'lastOfferDate' or '-documentPrice'"""
+        with self._lock:
+            if sort not in self._orders:
+                descending = sort.startswith('-')
+                field = sort.lstrip('-')
+                if field not in self.SORT_KEYS:
+                    raise ValueError(f"Unsupported sort field: {field}")
+                to_key = self.SORT_KEYS[field]
+
+                present, missing = [], []
+                for idx, row in enumerate(self.rows):
+                    try:
+                        value = row.get(field)
+                        if value in (None, '', 'N/A'):
+                            raise ValueError
+                        present.append((to_key(value), idx))
+                    except (TypeError, ValueError):
+                        missing.append(idx)
+
+                present.sort(reverse=descending)
+                self._orders[sort] = [idx for _, idx in present] + missing
+            return self._orders[sort]
+
+    def page(self, page: int = 1, page_size: Optional[int] = None,
+             sort: Optional[str] = None, fields: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """
+        Get one page of rows
+
+        Args:
+            page: 1-based page number
+            page_size: Rows per page (None = all rows)
+            sort: Sort field, '-' prefix for descending (None = load order)
+            fields: Row keys to return (None = all keys)
+
+        Returns:
+            List of (projected) rows
+        """
+        if page < 1 or (page_size is not None and page_size < 1):
+            raise ValueError("page and page_size must be positive")
+        if fields:
+            unknown = [f for f in fields if f not in self.fields]
+            if unknown and self.rows:
+                raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+
+        order = self._order(sort) if sort else range(len(self.rows))
+        if page_size is not None:
+            start = (page - 1) * page_size
+            order = order[start:start + page_size]
+
+        if fields:
+            return [{f: self.rows[idx].get(f) for f in fields} for idx in order]
+        return [self.rows[idx] for idx in order]
@@ -5,5 +5,6 @@ Contains document processing and OCR capabilities
 
 from .document_processor import DocumentProcessor
 from .ocr_processor import OCRProcessor
+from .page_store import PageRecord, PageTextStore
 
-__all__ = ['DocumentProcessor', 'OCRProcessor']
+__all__ = ['DocumentProcessor', 'OCRProcessor', 'PageRecord', 'PageTextStore']
@@ -6,27 +6,51 @@ Extracts text from various document formats (PDF, Excel, Word, Images)
 import io
 import os
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterator, List, Optional, Tuple
 import logging
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+IMAGE_FORMATS = ['.png', '.jpg', '.jpeg']
+
+# Bump whenever a change to the extraction code changes its output, so cached
+# per-file extractions (CacheManager.get_extraction_cache) are not reused
+EXTRACTOR_VERSION = 2
+
 
 class DocumentProcessor:
     """Process and extract text from various document formats"""
     
-    def __init__(self):
-        """Initialize document processor"""
+    def __init__(self, workers: int = 1, file_timeout: float = 300, shard_min_pages: int = 100,
+                 shard_pages: int = 50, excel_text_rows: int = 1000):
+        """
+        Initialize document processor
+        
+        Args:
+            workers: Worker processes used to extract a folder's files in parallel (1 = in this process)
+            file_timeout: Seconds one file (or PDF shard) may take in a worker process before it is abandoned
+            shard_min_pages: PDFs with at least this many pages are split into page ranges across workers
+            shard_pages: Pages per PDF shard
+            excel_text_rows: Rows of each Excel sheet included in its text
+        """
+        self.workers = max(1, workers)
+        self.file_timeout = file_timeout
+        self.shard_min_pages = shard_min_pages
+        self.shard_pages = max(1, shard_pages)
+        self.excel_text_rows = excel_text_rows
+        self._pool = None
         self.supported_formats = ['.pdf', '.xlsx', '.xls', '.docx', '.doc', '.png', '.jpg', '.jpeg', '.txt']
     
-    def process_folder(self, folder_path) -> Dict[str, any]:
+    def process_folder(self, folder_path, cache=None) -> Dict[str, any]:
         """
         Process all documents in a folder
         
         Args:
             folder_path: Path to folder containing tender documents (str or Path)
+            cache: CacheManager to reuse per-file extractions from (keyed on file content),
+                so only new or changed files are extracted
             
         Returns:
             Dict with extracted content organized by file type
@@ -61,68 +85,188 @@ class DocumentProcessor:
         result['total_files'] = len(files)
         logger.info(f"Found {len(files)} files to process")
         
-        # Process each file
-        for file_path in files:
-            try:
-                file_ext = file_path.suffix.lower()
-                
-                if file_ext == '.pdf':
-                    content = self._process_pdf(file_path)
-                    if content:
-                        result['pdfs'].append({
-                            'filename': file_path.name,
-                            'content': content,
-                            'length': len(content)
-                        })
-                        result['total_text_length'] += len(content)
-                
-                elif file_ext in ['.xlsx', '.xls']:
-                    content = self._process_excel(file_path)
-                    if content:
-                        result['excel_files'].append({
-                            'filename': file_path.name,
-                            'content': content,
-                            'length': len(str(content))
-                        })
-                        result['total_text_length'] += len(str(content))
-                
-                elif file_ext in ['.docx', '.doc']:
-                    content = self._process_word(file_path)
-                    if content:
-                        result['word_docs'].append({
-                            'filename': file_path.name,
-                            'content': content,
-                            'length': len(content)
-                        })
-                        result['total_text_length'] += len(content)
-                
-                elif file_ext in ['.png', '.jpg', '.jpeg']:
-                    # Will be processed by OCR module
-                    result['images'].append({
-                        'filename': file_path.name,
-                        'path': str(file_path)
-                    })
-                
-                elif file_ext == '.txt':
-                    content = self._process_text(file_path)
-                    if content:
-                        result['text_files'].append({
-                            'filename': file_path.name,
-                            'content': content,
-                            'length': len(content)
-                        })
-                        result['total_text_length'] += len(content)
-                
+        # Extract each file (in worker processes when parallel mode is on) and
+        # merge the results in file order, so the output does not depend on the mode
+        outcomes = self._extract_files_cached(folder_path, files, cache) if cache else self._extract_files(files)
+        for file_path, (outcome, value) in zip(files, outcomes):
+            if outcome == 'ok':
+                category, entry = value
+                if entry:
+                    result[category].append(entry)
+                    result['total_text_length'] += entry.get('length', 0)
                 logger.info(f"✅ Processed: {file_path.name}")
-                
-            except Exception as e:
-                error_msg = f"Error processing {file_path.name}: {str(e)}"
+            else:
+                error_msg = f"Error processing {file_path.name}: {value}"
                 logger.error(f"❌ {error_msg}")
                 result['errors'].append(error_msg)
         
         logger.info(f"✅ Processing complete: {result['total_text_length']} characters extracted")
         return result
     
+    def _extract_files_cached(self, folder_path: Path, files: List[Path], cache) -> List[Tuple[str, object]]:
+        """
+        _extract_files() that takes files already extracted (same content, same
+        EXTRACTOR_VERSION and settings) from the cache and caches the ones it extracts
+        """
+        cacheable = [f for f in files if f.suffix.lower() not in IMAGE_FORMATS]
+        hashes = cache.get_file_hashes(folder_path, cacheable)
+        
+        outcomes = {}
+        for file_path, file_hash in hashes.items():
+            cached = cache.get_extraction_cache(file_hash, file_path.suffix.lower(), self._cache_version(file_path))
+            if cached:
+                entry = cached['entry'] and {'filename': file_path.name, **cached['entry']}
+                outcomes[file_path] = ('ok', (cached['category'], entry))
+        
+        missing = [f for f in files if f not in outcomes]
+        if outcomes:
+            logger.info(f"♻️ Reusing cached extraction of {len(outcomes)} files, extracting {len(missing)}")
+        
+        for file_path, outcome in zip(missing, self._extract_files(missing)):
+            outcomes[file_path] = outcome
+            if outcome[0] == 'ok' and file_path in hashes:
+                category, entry = outcome[1]
+                if entry:
+                    entry = {k: v for k, v in entry.items() if k != 'filename'}
+                cache.set_extraction_cache(hashes[file_path], file_path.suffix.lower(),
+                                           self._cache_version(file_path), category, entry)
+        
+        return [outcomes[f] for f in files]
+    
+    def _cache_version(self, file_path: Path) -> str:
+        """Cache key part for everything besides the content that shapes a file's extraction"""
+        if file_path.suffix.lower() in ['.xlsx', '.xls']:
+            return f"{EXTRACTOR_VERSION}-rows{self.excel_text_rows}"
+        return str(EXTRACTOR_VERSION)
+    
+    def _extract_files(self, files: List[Path]) -> List[Tuple[str, object]]:
+        """
+        Extract every file, in parallel if the processor has more than one worker
+        
+        Large PDFs are split into page ranges (shards) that are extracted by different
+        workers and put back together in page order.
+        
+        Returns:
+            One ('ok', (category, entry)) or ('error', message) per file, in the order of `files`
+        """
+        extractable = [f for f in files if f.suffix.lower() not in IMAGE_FORMATS]
+        if self.workers <= 1:
+            return [self._extract_file_safely(f) for f in files]
+        
+        # One job per file, or per page range of a large PDF: (path, pages or None)
+        jobs = [(f, pages) for f in extractable for pages in self._pdf_shards(f)]
+        if len(jobs) < 2:
+            return [self._extract_file_safely(f) for f in files]
+        
+        logger.info(f"⚡ Extracting {len(extractable)} files ({len(jobs)} jobs) with {self.workers} worker processes")
+        extracted = {}
+        shards = {}
+        for (file_path, pages), (outcome, value) in zip(jobs, self._get_pool().map(jobs)):
+            if pages is None:
+                extracted[file_path] = (outcome, value)
+            else:
+                shards.setdefault(file_path, []).append((pages, outcome, value))
+        retry = []
+        for file_path, results in shards.items():
+            joined = self._join_pdf_shards(file_path, results)
+            if joined is None:
+                retry.append(file_path)
+            else:
+                extracted[file_path] = joined
+        
+        # A PDF with a failed shard is extracted again whole, so it goes through
+        # _process_pdf's fallbacks and error handling like an unsharded PDF
+        if retry:
+            for file_path, outcome in zip(retry, self._get_pool().map([(f, None) for f in retry])):
+                extracted[file_path] = outcome
+        
+        return [extracted[f] if f in extracted else self._extract_file_safely(f) for f in files]
+    
+    def _pdf_shards(self, file_path: Path) -> List[Optional[List[int]]]:
+        """Page numbers (1-based) of each shard of a large PDF, or [None] to extract the file whole"""
+        if file_path.suffix.lower() != '.pdf':
+            return [None]
+        page_count = self._pdf_page_count(file_path)
+        if page_count < max(self.shard_min_pages, 2):
+            return [None]
+        return [list(range(first, min(first + self.shard_pages, page_count + 1)))
+                for first in range(1, page_count + 1, self.shard_pages)]
+    
+    def _pdf_page_count(self, file_path: Path) -> int:
+        """Number of pages of a PDF (0 if it cannot be read)"""
+        try:
+            from PyPDF2 import PdfReader
+            return len(PdfReader(str(file_path)).pages)
+        except Exception:
+            return 0
+    
+    def _join_pdf_shards(self, file_path: Path, results: List[Tuple]) -> Optional[Tuple[str, object]]:
+        """
+        Put a sharded PDF back together as _extract_file would have returned it
+        
+        Returns:
+            The file's outcome, or None if a shard failed and the file must be extracted whole
+        """
+        text_parts = []
+        for pages, outcome, value in results:
+            if outcome != 'ok':
+                logger.warning(f"Pages {pages[0]}-{pages[-1]} of {file_path.name} failed ({value}), "
+                               f"extracting the whole file instead")
+                return None
+            text_parts.extend(value)
+        
+        content = "\n\n".join(text_parts)
+        if not content:
+            return 'ok', ('pdfs', None)
+        return 'ok', ('pdfs', {'filename': file_path.name, 'content': content, 'length': len(content)})
+    
+    def _get_pool(self):
+        if self._pool is None:
+            from .extraction_pool import create_pool
+            self._pool = create_pool(self.workers, self.file_timeout,
+                                     processor_options={'excel_text_rows': self.excel_text_rows})
+        return self._pool
+    
+    def _extract_file_safely(self, file_path: Path) -> Tuple[str, object]:
+        try:
+            return 'ok', self._extract_file(file_path)
+        except Exception as e:
+            return 'error', str(e)
+    
+    def _extract_file(self, file_path: Path) -> Tuple[str, Optional[Dict]]:
+        """
+        Extract one file
+        
+        Args:
+            file_path: Path to a supported file
+            
+        Returns:
+            (result key, entry) - entry is None if nothing was extracted
+        """
+        file_ext = file_path.suffix.lower()
+        
+        if file_ext == '.pdf':
+            content = self._process_pdf(file_path)
+            category, length = 'pdfs', len(content)
+        elif file_ext in ['.xlsx', '.xls']:
+            content = self._process_excel(file_path)
+            category, length = 'excel_files', len(str(content))
+        elif file_ext in ['.docx', '.doc']:
+            content = self._process_word(file_path)
+            category, length = 'word_docs', len(content)
+        elif file_ext in IMAGE_FORMATS:
+            # Will be processed by OCR module
+            return 'images', {'filename': file_path.name, 'path': str(file_path)}
+        elif file_ext == '.txt':
+            content = self._process_text(file_path)
+            category, length = 'text_files', len(content)
+        else:
+            return None, None
+        
+        if not content:
+            return category, None
+        return category, {'filename': file_path.name, 'content': content, 'length': length}
+    
     def _process_pdf(self, file_path: Path) -> str:
         """
         Extract text from PDF file
@@ -134,16 +278,7 @@ class DocumentProcessor:
             Extracted text
         """
         try:
-            import pdfplumber
-            
-            text_parts = []
-            with pdfplumber.open(file_path) as pdf:
-                for page_num, page in enumerate(pdf.pages, 1):
-                    page_text = page.extract_text()
-                    if page_text:
-                        text_parts.append(f"--- Page {page_num} ---\n{page_text}")
-            
-            return "\n\n".join(text_parts)
+            return "\n\n".join(self._pdf_page_texts(file_path))
         
         except ImportError:
             logger.warning("pdfplumber not installed, trying PyPDF2")
@@ -153,6 +288,28 @@ class DocumentProcessor:
             logger.error(f"Error extracting PDF text: {e}")
             return ""
     
+    def _pdf_page_texts(self, file_path: Path, pages: Optional[List[int]] = None) -> List[str]:
+        """
+        Extract PDF pages with pdfplumber
+        
+        Args:
+            file_path: Path to PDF file
+            pages: Page numbers (1-based) to extract (default: all)
+            
+        Returns:
+            "--- Page N ---" blocks of the pages that have text, in page order
+        """
+        import pdfplumber
+        
+        text_parts = []
+        with pdfplumber.open(file_path, pages=pages) as pdf:
+            for page in pdf.pages:
+                page_text = page.extract_text()
+                if page_text:
+                    text_parts.append(f"--- Page {page.page_number} ---\n{page_text}")
+        
+        return text_parts
+    
     def _process_pdf_pypdf2(self, file_path: Path) -> str:
         """Fallback PDF processing with PyPDF2"""
         try:
@@ -176,12 +333,29 @@ class DocumentProcessor:
         """
         Extract data from Excel file
         
+        .xlsx workbooks are streamed once in read-only mode (see excel_reader);
+        legacy .xls files are read with pandas.
+        
         Args:
             file_path: Path to Excel file
             
         Returns:
             Dict with sheet data
         """
+        if file_path.suffix.lower() != '.xls':
+            try:
+                from .excel_reader import read_workbook
+                return read_workbook(file_path, max_text_rows=self.excel_text_rows)
+            except ImportError:
+                logger.warning("openpyxl not installed, reading Excel with pandas")
+            except Exception as e:
+                logger.error(f"Error processing Excel: {e}")
+                return {}
+        
+        return self._process_excel_pandas(file_path)
+    
+    def _process_excel_pandas(self, file_path: Path) -> Dict:
+        """Excel processing with pandas (.xls, or when openpyxl is missing)"""
         try:
             import pandas as pd
             
@@ -193,7 +367,7 @@ class DocumentProcessor:
             }
             
             for sheet_name in excel_file.sheet_names:
-                df = pd.read_excel(file_path, sheet_name=sheet_name)
+                df = excel_file.parse(sheet_name)
                 
                 # Convert to text representation
                 sheet_text = f"Sheet: {sheet_name}\n"
@@ -270,6 +444,80 @@ class DocumentProcessor:
                 logger.error(f"Error reading text file: {e}")
                 return ""
     
+    def iter_pages(self, folder_path, store=None) -> Iterator['PageRecord']:
+        """
+        Stream the text of a folder's documents page by page
+        
+        Unlike process_folder(), nothing is accumulated: each page is yielded as
+        soon as it is extracted, so chunkers and indexers can work with flat memory
+        whatever the size of the tender. PDFs yield one record per page with text,
+        Excel files one per sheet, Word and text files a single page 1. Images are
+        skipped (they are handled by the OCR module).
+        
+        Args:
+            folder_path: Path to folder containing tender documents (str or Path)
+            store: PageTextStore that also receives every record, to read texts
+                back later from disk instead of keeping them
+            
+        Yields:
+            PageRecord(file, page, text)
+        """
+        from .page_store import PageRecord
+        
+        folder_path = Path(folder_path)
+        files = []
+        for ext in self.supported_formats:
+            if ext not in IMAGE_FORMATS:
+                files.extend(folder_path.glob(f'*{ext}'))
+                files.extend(folder_path.glob(f'*{ext.upper()}'))
+        
+        for file_path in files:
+            try:
+                for page, text in self._iter_file_pages(file_path):
+                    record = PageRecord(file_path.name, page, text)
+                    if store is not None:
+                        store.add(record)
+                    yield record
+            except Exception as e:
+                logger.error(f"❌ Error streaming {file_path.name}: {e}")
+    
+    def _iter_file_pages(self, file_path: Path) -> Iterator[Tuple[int, str]]:
+        """(page number, text) of one file, extracted as they are read"""
+        file_ext = file_path.suffix.lower()
+        
+        if file_ext == '.pdf':
+            try:
+                import pdfplumber
+            except ImportError:
+                from PyPDF2 import PdfReader
+                for page_num, page in enumerate(PdfReader(str(file_path)).pages, 1):
+                    page_text = page.extract_text()
+                    if page_text:
+                        yield page_num, page_text
+                return
+            
+            with pdfplumber.open(file_path) as pdf:
+                for page in pdf.pages:
+                    page_text = page.extract_text()
+                    page.close()  # Drop the page's parsed objects before moving on
+                    if page_text:
+                        yield page.page_number, page_text
+        
+        elif file_ext in ['.xlsx', '.xls']:
+            content = self._process_excel(file_path)
+            for sheet_num, sheet_text in enumerate(content.get('text_summary', []), 1):
+                yield sheet_num, sheet_text
+        
+        elif file_ext in ['.docx', '.doc']:
+            content = self._process_word(file_path)
+            if content:
+                yield 1, content
+        
+        elif file_ext == '.txt':
+            content = self._process_text(file_path)
+            if content:
+                yield 1, content
+    
     def get_combined_text(self, processed_data: Dict) -> str:
         """
         Combine all extracted text into single string
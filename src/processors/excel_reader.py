@@ -0,0 +1,125 @@
+"""
+Streaming Excel Reader
+Reads .xlsx workbooks (BOQs, price schedules) in a single pass with openpyxl's
+read-only mode: rows are parsed lazily, sheet text stops after a row cap and
+the summary statistics are gathered along the way
+"""
+
+from datetime import date, datetime, time
+from pathlib import Path
+from typing import Dict, List
+
+
+def read_workbook(file_path: Path, max_records: int = 100, max_text_rows: int = 1000) -> Dict:
+    """
+    Read every worksheet of a workbook, opening the file once
+
+    Args:
+        file_path: Path to .xlsx / .xlsm file
+        max_records: Rows of each sheet kept as records in 'data'
+        max_text_rows: Rows of each sheet rendered into its 'text'
+
+    Returns:
+        Dict with 'sheets' ({name: {'rows', 'columns', 'data', 'text', 'stats'}})
+        and 'text_summary' (the sheet texts), as DocumentProcessor._process_excel
+    """
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        result = {
+            'sheets': {},
+            'text_summary': []
+        }
+        for sheet in workbook.worksheets:
+            sheet_data = _read_sheet(sheet, max_records, max_text_rows)
+            result['sheets'][sheet.title] = sheet_data
+            result['text_summary'].append(sheet_data['text'])
+        return result
+    finally:
+        workbook.close()
+
+
+def _read_sheet(sheet, max_records: int, max_text_rows: int) -> Dict:
+    """One pass over a sheet's rows; the first non-empty row is the header"""
+    columns = None
+    records = []
+    text_lines = [f"Sheet: {sheet.title}"]
+    rows = 0
+    numeric = {}  # column -> {'count', 'sum', 'min', 'max'}
+
+    for values in sheet.iter_rows(values_only=True):
+        if all(value is None or (isinstance(value, str) and not value.strip()) for value in values):
+            continue
+        values = _trim(values)
+
+        if columns is None:
+            columns = _column_names(values)
+            text_lines.append(' | '.join(columns))
+            continue
+
+        while len(columns) < len(values):
+            columns.append(f"Unnamed: {len(columns)}")
+        rows += 1
+
+        if rows <= max_text_rows:
+            text_lines.append(' | '.join('' if value is None else str(value) for value in values))
+        if len(records) < max_records:
+            records.append({column: _json_value(value) for column, value in zip(columns, values)})
+
+        for column, value in zip(columns, values):
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                stats = numeric.get(column)
+                if stats is None:
+                    numeric[column] = {'count': 1, 'sum': value, 'min': value, 'max': value}
+                else:
+                    stats['count'] += 1
+                    stats['sum'] += value
+                    stats['min'] = min(stats['min'], value)
+                    stats['max'] = max(stats['max'], value)
+
+    if rows > max_text_rows:
+        text_lines.append(f"... {rows - max_text_rows} more rows")
+
+    columns = columns or []
+    return {
+        'rows': rows,
+        'columns': columns,
+        'data': [{column: record.get(column) for column in columns} for record in records],
+        'text': "\n".join(text_lines),
+        'stats': {
+            'text_rows': min(rows, max_text_rows),
+            'truncated': rows > max_text_rows,
+            'numeric_columns': numeric,
+        }
+    }
+
+
+def _trim(values) -> List:
+    """Row values without trailing empty cells"""
+    values = list(values)
+    while values and values[-1] is None:
+        values.pop()
+    return values
+
+
+def _column_names(header: List) -> List[str]:
+    """Header cells as unique column names (pandas-style 'Unnamed: N' and 'name.1')"""
+    columns = []
+    seen = {}
+    for index, value in enumerate(header):
+        name = f"Unnamed: {index}" if value is None or str(value).strip() == '' else str(value).strip()
+        if name in seen:
+            seen[name] += 1
+            name = f"{name}.{seen[name]}"
+        else:
+            seen[name] = 0
+        columns.append(name)
+    return columns
+
+
+def _json_value(value):
+    """Dates and times as ISO strings, so records can be cached as JSON"""
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    return value
@@ -0,0 +1,201 @@
+"""
+Extraction Pool
+Runs DocumentProcessor file extraction in separate worker processes, so a tender's
+PDFs, workbooks and Word files (and the page ranges of a large PDF) are extracted
+on several cores at once
+
+Each worker is a long-lived Python process (see _worker_main) that reads jobs
+from its stdin and answers with the extracted entry. A job that runs past the
+timeout gets its worker killed and replaced; the other jobs are unaffected.
+"""
+
+import atexit
+import logging
+import os
+import pickle
+import queue
+import subprocess
+import sys
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+
+OK = 'ok'
+ERROR = 'error'
+
+
+class ExtractionPool:
+    """Fixed set of extraction worker processes shared by every process_folder() call"""
+
+    def __init__(self, workers: int = 2, timeout: float = 300, processor_options: Optional[Dict] = None):
+        """
+        Initialize the pool (worker processes start with the first job)
+
+        Args:
+            workers: Worker processes (jobs run at the same time)
+            timeout: Seconds one job may take before its worker is killed
+            processor_options: DocumentProcessor arguments the workers extract with
+                (settings that change the output, e.g. excel_text_rows)
+        """
+        self.workers = max(1, workers)
+        self.timeout = timeout
+        self.processor_options = dict(processor_options or {})
+        self._idle = []
+        self._processes = set()
+        self._leases = threading.BoundedSemaphore(self.workers)
+        self._lock = threading.Lock()
+        self.stats = {'jobs': 0, 'errors': 0, 'timeouts': 0, 'workers_started': 0}
+
+    def map(self, jobs: List[Tuple[Path, Optional[List[int]]]]) -> List[Tuple[str, object]]:
+        """
+        Run extraction jobs in parallel
+
+        Args:
+            jobs: (file, None) to extract a whole file, or (pdf file, page numbers) for a PDF shard
+
+        Returns:
+            One result per job, in the order of `jobs`: (OK, (category, entry)) for a file,
+            (OK, ["--- Page N ---" blocks]) for a shard, or (ERROR, message)
+        """
+        results = [None] * len(jobs)
+        pending = queue.Queue()
+        for index, job in enumerate(jobs):
+            pending.put((index, job))
+
+        threads = [threading.Thread(target=self._drain, args=(pending, results), daemon=True)
+                   for _ in range(min(self.workers, len(jobs)))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
+
+    def shutdown(self):
+        """Stop every worker process"""
+        with self._lock:
+            processes, self._idle = list(self._processes), []
+        for process in processes:
+            self._retire(process)
+
+    def _drain(self, pending: queue.Queue, results: list):
+        """Run queued jobs on one leased worker process until the queue is empty"""
+        with self._leases:
+            process = self._checkout()
+            try:
+                while True:
+                    try:
+                        index, job = pending.get_nowait()
+                    except queue.Empty:
+                        break
+                    if process is None or process.poll() is not None:
+                        if process is not None:
+                            self._retire(process)
+                        process = self._spawn()
+                    results[index], healthy = self._extract(process, job)
+                    if not healthy:
+                        self._retire(process)
+                        process = None
+            finally:
+                if process is not None:
+                    with self._lock:
+                        self._idle.append(process)
+
+    def _extract(self, process: subprocess.Popen, job: Tuple[Path, Optional[List[int]]]):
+        """Send one job to a worker; returns (result, worker still usable)"""
+        timed_out = threading.Event()
+
+        def kill_worker():
+            timed_out.set()
+            process.kill()
+
+        timer = threading.Timer(self.timeout, kill_worker)
+        timer.start()
+        try:
+            path, pages = job
+            pickle.dump((str(path), pages), process.stdin)
+            process.stdin.flush()
+            result = pickle.load(process.stdout)
+            healthy = True
+        except (EOFError, OSError, pickle.UnpicklingError):
+            if timed_out.is_set():
+                result = (ERROR, f"extraction took longer than {self.timeout}s")
+            else:
+                result = (ERROR, 'extraction worker exited unexpectedly')
+            healthy = False
+        finally:
+            timer.cancel()
+
+        with self._lock:
+            self.stats['jobs'] += 1
+            if result[0] != OK:
+                self.stats['timeouts' if timed_out.is_set() else 'errors'] += 1
+        return result, healthy
+
+    def _checkout(self):
+        with self._lock:
+            return self._idle.pop() if self._idle else None
+
+    def _spawn(self) -> subprocess.Popen:
+        process = subprocess.Popen(
+            [sys.executable, '-c', 'from src.processors.extraction_pool import _worker_main; _worker_main()'],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, cwd=str(PROJECT_ROOT)
+        )
+        try:
+            # First message: how the worker builds its DocumentProcessor
+            pickle.dump(self.processor_options, process.stdin)
+            process.stdin.flush()
+        except OSError:
+            pass  # A dead worker is detected on its first job
+        with self._lock:
+            self._processes.add(process)
+            self.stats['workers_started'] += 1
+        return process
+
+    def _retire(self, process: subprocess.Popen):
+        process.kill()
+        process.wait()
+        with self._lock:
+            self._processes.discard(process)
+
+
+def create_pool(workers: int, timeout: float, processor_options: Optional[Dict] = None) -> ExtractionPool:
+    """New pool whose workers are stopped when the interpreter exits"""
+    pool = ExtractionPool(workers=workers, timeout=timeout, processor_options=processor_options)
+    atexit.register(pool.shutdown)
+    return pool
+
+
+def _worker_main():
+    """Worker process: run extraction jobs read from stdin, answer on stdout"""
+    # Keep stdout for results only; anything printed while extracting goes to stderr
+    channel_out = os.fdopen(os.dup(1), 'wb')
+    os.dup2(2, 1)
+    channel_in = sys.stdin.buffer
+
+    from src.processors.document_processor import DocumentProcessor
+    try:
+        processor = DocumentProcessor(**pickle.load(channel_in))
+    except EOFError:
+        return
+
+    while True:
+        try:
+            path, pages = pickle.load(channel_in)
+        except EOFError:
+            return
+
+        try:
+            if pages is None:
+                extracted = processor._extract_file(Path(path))
+            else:
+                extracted = processor._pdf_page_texts(Path(path), pages)
+            data = pickle.dumps((OK, extracted))
+        except Exception as e:
+            data = pickle.dumps((ERROR, str(e)))
+
+        channel_out.write(data)
+        channel_out.flush()
@@ -0,0 +1,90 @@
+"""
+Page Text Store
+Spill-to-disk store for page texts streamed by DocumentProcessor.iter_pages(),
+so a tender's full text does not have to stay in memory
+"""
+
+import os
+import tempfile
+import threading
+from pathlib import Path
+from typing import Iterator, List, NamedTuple, Optional
+
+
+class PageRecord(NamedTuple):
+    """One extracted page: file name, page number (1-based) and its text"""
+    file: str
+    page: int
+    text: str
+
+
+class PageTextStore:
+    """
+    Append-only file of page texts with a small in-memory index
+
+    Only (file, page, offset, length) is kept per page; texts are read back from
+    disk when iterated. Without a path the store lives in a temporary file that
+    is deleted on close().
+    """
+
+    def __init__(self, path=None):
+        """
+        Args:
+            path: File to store the texts in (default: a temporary file)
+        """
+        if path is None:
+            fd, path = tempfile.mkstemp(prefix='pages-', suffix='.txt')
+            os.close(fd)
+            self._temporary = True
+        else:
+            self._temporary = False
+        self.path = Path(path)
+        self._writer = open(self.path, 'wb')
+        self._index = []
+        self._lock = threading.Lock()
+        self.chars = 0
+
+    def add(self, record: PageRecord):
+        """Append one page"""
+        data = record.text.encode('utf-8')
+        with self._lock:
+            offset = self._writer.tell()
+            self._writer.write(data)
+            self._index.append((record.file, record.page, offset, len(data)))
+            self.chars += len(record.text)
+
+    def files(self) -> List[str]:
+        """Names of the files with stored pages, in the order they were added"""
+        with self._lock:
+            return list(dict.fromkeys(file for file, _, _, _ in self._index))
+
+    def pages(self, file: Optional[str] = None) -> Iterator[PageRecord]:
+        """Stored pages (of one file, or all of them) in the order they were added"""
+        with self._lock:
+            self._writer.flush()
+            index = [entry for entry in self._index if file is None or entry[0] == file]
+        with open(self.path, 'rb') as reader:
+            for name, page, offset, length in index:
+                reader.seek(offset)
+                yield PageRecord(name, page, reader.read(length).decode('utf-8'))
+
+    def text(self, file: str) -> str:
+        """Whole text of one file, pages separated by blank lines"""
+        return "\n\n".join(record.text for record in self.pages(file))
+
+    def __len__(self):
+        return len(self._index)
+
+    def close(self):
+        """Close the store (and delete it if it is a temporary file)"""
+        with self._lock:
+            if not self._writer.closed:
+                self._writer.close()
+        if self._temporary and self.path.exists():
+            self.path.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
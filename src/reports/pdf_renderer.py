@@ -0,0 +1,326 @@
+"""
+PDF Rendering Service
+Renders HTML to PDF with WeasyPrint in separate worker processes, so CPU-heavy
+Arabic layouts never hold the Flask process's GIL
+
+Each worker is a long-lived Python process (see _worker_main) that loads
+WeasyPrint and one FontConfiguration once and renders jobs sent over its
+stdin. Jobs wait in a bounded queue; a job that runs past its timeout gets
+its worker killed and replaced.
+"""
+
+import atexit
+import logging
+import os
+import pickle
+import queue
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import config
+
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+
+QUEUED = 'queued'
+RUNNING = 'running'
+COMPLETED = 'completed'
+FAILED = 'failed'
+TIMEOUT = 'timeout'
+
+
+class RenderError(Exception):
+    """A PDF job failed or timed out"""
+
+
+class RenderQueueFull(RenderError):
+    """The render queue is at capacity; retry later"""
+
+
+class PdfRenderService:
+    """Bounded queue of HTML-to-PDF jobs served by a fixed set of worker processes"""
+
+    def __init__(self, workers: int = 2, max_queue: int = 16, timeout: float = 120, max_jobs: int = 200):
+        """
+        Initialize the render service (worker processes start with the first job)
+
+        Args:
+            workers: Worker processes (PDFs rendered at the same time)
+            max_queue: Jobs allowed to wait for a worker before submit() is refused
+            timeout: Default seconds a job may run before its worker is killed
+            max_jobs: Finished jobs kept for the status API
+        """
+        self.workers = max(1, workers)
+        self.timeout = timeout
+        self.max_jobs = max_jobs
+        self._queue = queue.Queue(maxsize=max(1, max_queue))
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+        self._slots = []
+        self._processes = set()
+        self.stats = {'completed': 0, 'failed': 0, 'timeout': 0, 'rejected': 0, 'workers_started': 0}
+
+    def submit(self, html: str, output_path, css: Optional[str] = None, base_url: Optional[str] = None,
+               timeout: Optional[float] = None) -> str:
+        """
+        Queue a render job
+
+        Args:
+            html: HTML document
+            output_path: Where the PDF is written (only once it is complete)
+            css: Extra stylesheet
+            base_url: Base URL for relative links in the HTML
+            timeout: Seconds the job may run (default: service timeout)
+
+        Returns:
+            Job id
+
+        Raises:
+            RenderQueueFull: If `max_queue` jobs are already waiting
+        """
+        return self._enqueue(html, output_path, css, base_url, timeout)['id']
+
+    def _enqueue(self, html, output_path, css, base_url, timeout) -> Dict:
+        """Create and queue a job; returns the job itself (it may be trimmed from _jobs once done)"""
+        self._start_workers()
+        job_id = uuid.uuid4().hex[:12]
+        job = {
+            'id': job_id,
+            'status': QUEUED,
+            'output_path': str(output_path),
+            'timeout': timeout or self.timeout,
+            'error': None,
+            'size': None,
+            'submitted_at': time.time(),
+            'started_at': None,
+            'finished_at': None,
+            'done': threading.Event(),
+            'payload': {'html': html, 'output_path': str(output_path), 'css': css, 'base_url': base_url},
+        }
+        with self._lock:
+            self._jobs[job_id] = job
+            self._trim()
+        try:
+            self._queue.put_nowait(job_id)
+        except queue.Full:
+            with self._lock:
+                self._jobs.pop(job_id, None)
+                self.stats['rejected'] += 1
+            raise RenderQueueFull(f"PDF render queue is full ({self._queue.maxsize} jobs waiting)")
+        return job
+
+    def render(self, html: str, output_path, css: Optional[str] = None, base_url: Optional[str] = None,
+               timeout: Optional[float] = None) -> Path:
+        """
+        Render and wait for the result
+
+        Returns:
+            Path of the written PDF
+
+        Raises:
+            RenderError: If the job failed, timed out or could not be queued
+        """
+        job = self._enqueue(html, output_path, css, base_url, timeout)
+        job['done'].wait()
+        if job['status'] != COMPLETED:
+            raise RenderError(job['error'])
+        return Path(job['output_path'])
+
+    def status(self, job_id: str) -> Optional[Dict]:
+        """Status of one job, or None if the id is unknown"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is None:
+            return None
+        started, finished = job['started_at'], job['finished_at']
+        return {
+            'job_id': job['id'],
+            'status': job['status'],
+            'output_path': job['output_path'],
+            'size': job['size'],
+            'error': job['error'],
+            'submitted_at': datetime.fromtimestamp(job['submitted_at']).isoformat(),
+            'queued_seconds': round((started or time.time()) - job['submitted_at'], 2),
+            'render_seconds': round((finished or time.time()) - started, 2) if started else None,
+        }
+
+    def snapshot(self) -> Dict:
+        """Queue depth, job counts and counters for the status endpoint"""
+        with self._lock:
+            jobs = list(self._jobs.values())
+        return {
+            'workers': self.workers,
+            'workers_alive': len(self._processes),
+            'queued': sum(1 for job in jobs if job['status'] == QUEUED),
+            'running': sum(1 for job in jobs if job['status'] == RUNNING),
+            'max_queue': self._queue.maxsize,
+            'timeout': self.timeout,
+            'stats': dict(self.stats),
+        }
+
+    def recent_jobs(self) -> List[Dict]:
+        """Status of the known jobs, newest first"""
+        with self._lock:
+            job_ids = list(self._jobs)
+        return [status for status in map(self.status, reversed(job_ids)) if status]
+
+    def shutdown(self):
+        """Stop the workers (queued jobs are dropped)"""
+        for _ in self._slots:
+            try:
+                self._queue.put_nowait(None)
+            except queue.Full:
+                break
+        for process in list(self._processes):
+            process.kill()
+
+    def _trim(self):
+        """Forget the oldest finished jobs beyond max_jobs (caller holds the lock)"""
+        finished = [job_id for job_id, job in self._jobs.items() if job['done'].is_set()]
+        for job_id in finished[:max(0, len(self._jobs) - self.max_jobs)]:
+            del self._jobs[job_id]
+
+    def _start_workers(self):
+        with self._lock:
+            if self._slots:
+                return
+            for n in range(self.workers):
+                slot = threading.Thread(target=self._slot_loop, name=f'pdf-render-{n}', daemon=True)
+                self._slots.append(slot)
+                slot.start()
+
+    def _spawn(self) -> subprocess.Popen:
+        process = subprocess.Popen(
+            [sys.executable, '-c', 'from src.reports.pdf_renderer import _worker_main; _worker_main()'],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, cwd=str(PROJECT_ROOT)
+        )
+        with self._lock:
+            self._processes.add(process)
+            self.stats['workers_started'] += 1
+        return process
+
+    def _retire(self, process: subprocess.Popen):
+        process.kill()
+        process.wait()
+        with self._lock:
+            self._processes.discard(process)
+
+    def _slot_loop(self):
+        """Feed queued jobs to one worker process, replacing it after a timeout or crash"""
+        process = None
+        while True:
+            job_id = self._queue.get()
+            if job_id is None:
+                break
+            with self._lock:
+                job = self._jobs.get(job_id)
+            if job is None:
+                continue
+
+            if process is None or process.poll() is not None:
+                if process is not None:
+                    self._retire(process)
+                process = self._spawn()
+
+            job['status'] = RUNNING
+            job['started_at'] = time.time()
+            timed_out = threading.Event()
+
+            def kill_worker(process=process):
+                timed_out.set()
+                process.kill()
+
+            timer = threading.Timer(job['timeout'], kill_worker)
+            timer.start()
+            try:
+                pickle.dump(job.pop('payload'), process.stdin)
+                process.stdin.flush()
+                outcome, value = pickle.load(process.stdout)
+            except (EOFError, OSError, pickle.UnpicklingError):
+                if timed_out.is_set():
+                    outcome, value = TIMEOUT, f"Rendering took longer than {job['timeout']}s"
+                else:
+                    outcome, value = FAILED, 'PDF worker process exited unexpectedly'
+                self._retire(process)
+                process = None
+            finally:
+                timer.cancel()
+
+            job['finished_at'] = time.time()
+            if outcome == 'ok':
+                job['status'], job['size'] = COMPLETED, value
+            else:
+                job['status'], job['error'] = (outcome if outcome == TIMEOUT else FAILED), value
+            with self._lock:
+                self.stats[job['status']] += 1
+            if job['status'] != COMPLETED:
+                logger.error(f"PDF job {job_id} {job['status']}: {job['error']}")
+            job['done'].set()
+
+
+_service = None
+_service_lock = threading.Lock()
+
+
+def get_pdf_service() -> PdfRenderService:
+    """Return the process-wide PDF rendering service"""
+    global _service
+    with _service_lock:
+        if _service is None:
+            _service = PdfRenderService(
+                workers=getattr(config, 'PDF_RENDER_WORKERS', 2),
+                max_queue=getattr(config, 'PDF_RENDER_QUEUE', 16),
+                timeout=getattr(config, 'PDF_RENDER_TIMEOUT', 120),
+            )
+            atexit.register(_service.shutdown)
+        return _service
+
+
+def _worker_main():
+    """Worker process: render jobs read from stdin, answer on stdout"""
+    # Keep stdout for results only; anything printed while rendering goes to stderr
+    channel_out = os.fdopen(os.dup(1), 'wb')
+    os.dup2(2, 1)
+    channel_in = sys.stdin.buffer
+
+    try:
+        from weasyprint import CSS, HTML
+        from weasyprint.text.fonts import FontConfiguration
+        font_config = FontConfiguration()  # Loaded once, reused for every job of this worker
+        import_error = None
+    except Exception as e:
+        import_error = f"WeasyPrint is not available: {e}"
+
+    while True:
+        try:
+            job = pickle.load(channel_in)
+        except EOFError:
+            return
+
+        if import_error:
+            result = (FAILED, import_error)
+        else:
+            tmp_path = job['output_path'] + '.tmp'
+            try:
+                stylesheets = [CSS(string=job['css'], font_config=font_config)] if job.get('css') else []
+                HTML(string=job['html'], base_url=job.get('base_url')).write_pdf(
+                    tmp_path, stylesheets=stylesheets, font_config=font_config
+                )
+                os.replace(tmp_path, job['output_path'])
+                result = ('ok', os.path.getsize(job['output_path']))
+            except Exception as e:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                result = (FAILED, f"{type(e).__name__}: {e}")
+
+        pickle.dump(result, channel_out)
+        channel_out.flush()
+
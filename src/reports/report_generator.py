@@ -11,8 +11,8 @@ from datetime import datetime
 import json
 
 from jinja2 import Environment, FileSystemLoader, select_autoescape
-from weasyprint import HTML, CSS
-from weasyprint.text.fonts import FontConfiguration
+
+from .pdf_renderer import get_pdf_service
 
 # Load environment variables
 from dotenv import load_dotenv
@@ -26,12 +26,13 @@ logger = logging.getLogger(__name__)
 class ReportGenerator:
     """Generate professional PDF reports from analysis data"""
     
-    def __init__(self, template_dir: Optional[str] = None):
+    def __init__(self, template_dir: Optional[str] = None, pdf_service=None):
         """
         Initialize Report Generator
         
         Args:
             template_dir: Directory containing Jinja2 templates
+            pdf_service: PdfRenderService used for PDFs (default: the shared service)
         """
         if template_dir is None:
             # Default to data/analysis_templates
@@ -47,8 +48,8 @@ class ReportGenerator:
             autoescape=select_autoescape(['html', 'xml'])
         )
         
-        # Font configuration for Arabic support
-        self.font_config = FontConfiguration()
+        # PDFs are rendered in worker processes (each keeps its own FontConfiguration for Arabic)
+        self.pdf_service = pdf_service or get_pdf_service()
         
         logger.info("✅ Report Generator initialized")
     
@@ -311,18 +312,11 @@ class ReportGenerator:
             return self._generate_simple_html(data)
     
     def _generate_pdf(self, html_content: str, output_path: Path):
-        """Convert HTML to PDF using WeasyPrint"""
+        """Convert HTML to PDF using WeasyPrint (in the PDF rendering service)"""
         
         try:
             # Add CSS for better PDF rendering
-            css = CSS(string=self._get_pdf_css(), font_config=self.font_config)
-            
-            # Generate PDF
-            HTML(string=html_content).write_pdf(
-                output_path,
-                stylesheets=[css],
-                font_config=self.font_config
-            )
+            self.pdf_service.render(html_content, output_path, css=self._get_pdf_css())
             
         except Exception as e:
             logger.error(f"PDF generation failed: {e}")
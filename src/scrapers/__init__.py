@@ -6,5 +6,7 @@ Contains tender scraping, attachment downloading, and cookie management
 from .tender_scraper import TenderScraper
 from .attachment_downloader import TenderAttachmentDownloader
 from .cookie_manager import EtimadBrowserAutomation
+from .http_client import EtimadHttpClient, get_http_client
 
-__all__ = ['TenderScraper', 'TenderAttachmentDownloader', 'EtimadBrowserAutomation']
+__all__ = ['TenderScraper', 'TenderAttachmentDownloader', 'EtimadBrowserAutomation',
+           'EtimadHttpClient', 'get_http_client']
@@ -0,0 +1,472 @@
+"""
+Asyncio Tender Scraper
+Alternative backend to TenderScraper for large, I/O-bound sweeps (listing pages,
+classification lookups and attachment downloads) using aiohttp
+"""
+import asyncio
+import hashlib
+import os
+import threading
+import time
+
+try:
+    import aiohttp
+    AIOHTTP_AVAILABLE = True
+except ImportError:
+    aiohttp = None
+    AIOHTTP_AVAILABLE = False
+
+from .attachment_manifest import AttachmentManifest, conditional_headers
+from .blob_store import file_sha256
+from .circuit_breaker import CircuitOpenError, auth_failure_reason
+from .http_client import SLOT_WAIT_TIMEOUT
+from .rate_limiter import ERROR, classify_status, parse_retry_after
+from .tender_scraper import DOWNLOAD_ATTEMPTS, PART_SUFFIX, IncompleteDownloadError, TenderScraper
+
+
+class AsyncTenderScraper(TenderScraper):
+    """
+    Async version of TenderScraper
+
+    fetch_page, fetch_all_tenders, get_tender_classification and
+    download_tender_documents are coroutines; every request waits on one
+    semaphore so at most `concurrency` requests are in flight. Parsing,
+    filtering and formatting are inherited from TenderScraper.
+    """
+
+    def __init__(self, cookies=None, use_api=False, concurrency=8, http_client=None, store=None):
+        if not AIOHTTP_AVAILABLE:
+            raise ImportError("aiohttp is required for the async scraper. Install it with: pip install aiohttp")
+
+        super().__init__(cookies=cookies, use_api=use_api, fetch_concurrency=concurrency,
+                         request_delay=0, http_client=http_client, store=store)
+        self.concurrency = max(1, int(concurrency))
+        self._semaphore = None
+        self._session = None
+
+    async def _get_session(self):
+        """Create the aiohttp session (and semaphore) on the running loop"""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.concurrency, limit_per_host=self.concurrency)
+            # Credentials are injected per request from the shared pool, like the sync client
+            self._session = aiohttp.ClientSession(connector=connector, cookie_jar=aiohttp.DummyCookieJar())
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+        return self._session
+
+    async def close(self):
+        """Close the aiohttp session"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    async def _send(self, method, url, timeout, **kwargs):
+        session = await self._get_session()
+        async with self._semaphore:
+            async with session.request(method, url, headers=self.headers, cookies=self.cookies,
+                                       timeout=aiohttp.ClientTimeout(total=timeout), **kwargs) as response:
+                text = await response.text(errors='replace')
+                return response.status, response.headers, text, str(response.url)
+
+    def _record_response(self, status, headers, final_url, expect_json):
+        """Report a response to the shared circuit breaker"""
+        breaker = self.http.breaker
+        if breaker is None:
+            return
+        if status >= 500:
+            breaker.record_failure(f'HTTP {status}')
+            return
+        reason = auth_failure_reason(status, url=final_url, content_type=headers.get('Content-Type', ''),
+                                     location=headers.get('Location', ''), expect_json=expect_json)
+        if reason:
+            breaker.record_failure(reason)
+        else:
+            breaker.record_success()
+
+    async def _request(self, method, url, timeout, expect_json=False, **kwargs):
+        """
+        Send one request under the concurrency limit and return (status, headers, text)
+
+        Goes through the shared client's circuit breaker and rate limiter (if
+        any), with backoff and retries on 429/5xx/timeouts like the sync client.
+        """
+        breaker = self.http.breaker
+        limiter = self.http.rate_limiter
+
+        attempt = 0
+        while True:
+            if breaker is not None:
+                breaker.before_request()
+            if limiter is not None:
+                await limiter.acquire_async(timeout=SLOT_WAIT_TIMEOUT)
+
+            try:
+                status, headers, text, final_url = await self._send(method, url, timeout, **kwargs)
+            except (asyncio.TimeoutError, aiohttp.ClientConnectionError) as e:
+                if breaker is not None:
+                    breaker.record_failure(type(e).__name__)
+                if limiter is None:
+                    raise
+                delay = limiter.release(ERROR)
+                if attempt >= self.http.max_retries:
+                    raise
+            except BaseException:
+                # Invalid URL, redirect loop, payload error, cancelled task...: the slot must come back
+                if limiter is not None:
+                    limiter.cancel()
+                raise
+            else:
+                self._record_response(status, headers, final_url, expect_json)
+                if limiter is None:
+                    return status, headers, text
+                delay = limiter.release(classify_status(status),
+                                        retry_after=parse_retry_after(headers.get('Retry-After')))
+                if not delay or attempt >= self.http.max_retries:
+                    return status, headers, text
+
+            attempt += 1
+            print(f"⏳ Etimad backoff {delay:.1f}s before retry {attempt}/{self.http.max_retries}: {method} {url}")
+            await asyncio.sleep(delay)
+
+    async def fetch_page(self, page_number):
+        """
+        Fetch a single page of tenders from Etimad API
+        """
+        try:
+            params = self._page_params(page_number)
+
+            print(f"Fetching page {page_number}...")
+            status, headers, text = await self._request('GET', self.api_url, timeout=30, params=params,
+                                                        expect_json=True)
+
+            return self._parse_page_response(
+                page_number,
+                status,
+                headers.get('Content-Type', ''),
+                text,
+                headers.get('Location', 'N/A')
+            )
+        except CircuitOpenError as e:
+            print(f"⛔ Skipping page {page_number}: {e}")
+            return [], 0
+        except Exception as e:
+            print(f"✗ Error fetching page {page_number}: {e}")
+            return [], 0
+
+    async def fetch_all_tenders(self, max_pages=100):
+        """
+        Fetch all tenders - page 1 first for totalCount, then every other page concurrently
+        """
+        if not self.use_api:
+            return self._fetch_from_store()
+
+        print(f"\n{'='*60}")
+        print(f"Starting to fetch tenders from Etimad API (async, {self.concurrency} in flight)...")
+        print(f"{'='*60}\n")
+
+        first_page, total_count = await self.fetch_page(1)
+
+        if not first_page:
+            print(f"\n⚠ No tenders found. Falling back to local tender store...\n")
+            return self._fetch_from_store()
+
+        total_pages = self._total_pages(first_page, total_count, max_pages)
+        print(f"📄 {total_count} tenders → {total_pages} pages to fetch")
+
+        page_numbers = list(range(2, total_pages + 1))
+        results = await asyncio.gather(*(self.fetch_page(page) for page in page_numbers))
+
+        pages = {1: first_page}
+        for page, (tenders, _) in zip(page_numbers, results):
+            pages[page] = tenders
+
+        all_tenders = self._merge_pages(pages)
+        self._save_to_store(all_tenders)
+
+        print(f"\n{'='*60}")
+        print(f"Finished! Total tenders collected: {len(all_tenders)}/{total_count}")
+        print(f"{'='*60}\n")
+
+        return all_tenders
+
+    async def get_tender_classification(self, tender_id_str):
+        """
+        Get tender classification (التصنيف) from relations details endpoint
+        Returns: dict with classification info or None
+        """
+        try:
+            url = f"{self.base_url}/Tender/GetRelationsDetailsViewComponenet"
+            print(f"🔍 Fetching classification for tender: {tender_id_str}")
+
+            status, _, text = await self._request('GET', url, timeout=10, params={'tenderIdStr': tender_id_str})
+
+            if status == 200:
+                return self._parse_classification_html(text)
+
+            print(f"Failed to fetch classification for {tender_id_str}: {status}")
+            return None
+        except Exception as e:
+            print(f"Error fetching classification for {tender_id_str}: {e}")
+            return None
+
+    async def get_tender_classifications(self, tender_id_strs):
+        """
+        Fetch classifications for many tenders concurrently
+
+        Returns:
+            {tender_id_str: classification dict or None}
+        """
+        results = await asyncio.gather(*(self.get_tender_classification(tid) for tid in tender_id_strs))
+        return dict(zip(tender_id_strs, results))
+
+    async def _download_file(self, link_info, downloads_folder, idx, total, claim_filename, result, manifest=None):
+        """Download one attachment, filling in the same result dict as TenderScraper._download_attachment"""
+        file_url = link_info['url']
+        file_text = link_info['text']
+        result['status'] = 'downloading'
+        start = time.time()
+
+        if not file_url.startswith('http'):
+            file_url = self.base_url + file_url
+
+        print(f"\n📄 [{idx}/{total}] Downloading: {file_text}")
+
+        try:
+            await self._fetch_attachment_async(link_info, file_url, downloads_folder, claim_filename, result, manifest)
+            if result['unchanged']:
+                print(f"   ⏭️  [{idx}/{total}] Unchanged: {result['filename']}")
+            elif result['status'] == 'ok':
+                print(f"   ✅ [{idx}/{total}] Saved: {result['filename']} ({result['bytes']:,} bytes)")
+            else:
+                print(f"   ❌ [{idx}/{total}] Failed: {result['error']}")
+        except Exception as e:
+            print(f"   ❌ [{idx}/{total}] Error downloading file: {e}")
+            result.update(status='failed', error=str(e))
+        finally:
+            result['seconds'] = round(time.time() - start, 2)
+        return result
+
+    async def _fetch_attachment_async(self, link_info, file_url, downloads_folder, claim_filename, result,
+                                      manifest=None):
+        """
+        Same .part / Range resume / verify-then-rename and conditional request scheme as
+        TenderScraper._fetch_attachment, with up to DOWNLOAD_ATTEMPTS transfers
+        """
+        name = claim_filename(link_info['text'])
+        part_path = os.path.join(downloads_folder, name + PART_SUFFIX)
+        previous = manifest.current(name) if manifest is not None else None
+
+        for attempt in range(1, DOWNLOAD_ATTEMPTS + 1):
+            offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+            conditional = conditional_headers(previous) if not offset else {}
+            try:
+                response_headers = await self._transfer_attachment_async(link_info, file_url, part_path, offset,
+                                                                         result, conditional)
+                break
+            except (asyncio.TimeoutError, aiohttp.ClientConnectionError, aiohttp.ClientPayloadError,
+                    IncompleteDownloadError) as e:
+                if attempt == DOWNLOAD_ATTEMPTS:
+                    raise
+                print(f"   ⚠️  Transfer interrupted at {result['bytes']:,} bytes ({e or type(e).__name__}), "
+                      f"resuming ({attempt}/{DOWNLOAD_ATTEMPTS - 1})")
+
+        if response_headers is None:
+            return
+        if result['unchanged']:
+            result.update(filename=previous['filename'], status='ok', bytes=previous['size'],
+                          sha256=previous['sha256'])
+            return
+
+        filename = self._resolve_filename(name, response_headers)
+        self._store_attachment(part_path, os.path.join(downloads_folder, filename), result)
+        result.update(filename=filename, status='ok')
+        if manifest is not None:
+            manifest.record(name, filename, file_url, result['sha256'], response_headers)
+
+    async def _transfer_attachment_async(self, link_info, file_url, part_path, offset, result, conditional=None):
+        """
+        One request for the attachment, appending to the .part file from `offset`
+        (see TenderScraper._transfer_attachment for the return value)
+
+        Holds a rate limiter slot for the request only; a request that never reached
+        the server hands its slot back without counting as a failure.
+        """
+        session = await self._get_session()
+        request_headers = {**self.headers, **(conditional or {})}
+        if offset:
+            request_headers['Range'] = f'bytes={offset}-'
+
+        limiter = self.http.rate_limiter
+        if limiter is not None:
+            await limiter.acquire_async(timeout=SLOT_WAIT_TIMEOUT)
+        outcome = None
+        try:
+            if link_info.get('type') == 'form':
+                request = session.post(file_url.split('?')[0], data=link_info.get('post_data', {}),
+                                       headers=request_headers, cookies=self.cookies,
+                                       timeout=aiohttp.ClientTimeout(total=60))
+            else:
+                request = session.get(file_url, headers=request_headers, cookies=self.cookies,
+                                      timeout=aiohttp.ClientTimeout(total=60))
+
+            async with self._semaphore:
+                async with request as response:
+                    outcome = classify_status(response.status)
+                    if response.status == 304 and conditional:
+                        result['unchanged'] = True
+                        return response.headers
+
+                    if response.status == 416 and offset:
+                        # Nothing left to send: the .part file is either already whole or stale
+                        _, size = self._resume_position(416, response.headers, offset)
+                        if size == offset:
+                            result.update(bytes=offset, sha256=file_sha256(part_path).hexdigest())
+                            return response.headers
+                        os.remove(part_path)
+                        raise IncompleteDownloadError('stale partial file discarded')
+
+                    if response.status not in (200, 206):
+                        result.update(status='failed', error=f"HTTP {response.status}")
+                        return None
+
+                    position, expected = self._resume_position(response.status, response.headers, offset)
+                    if position is None:
+                        os.remove(part_path)
+                        raise IncompleteDownloadError('server returned a different range')
+                    if offset and not position:
+                        print("   ↩️  Server ignored the Range request, downloading from the start")
+
+                    hasher = file_sha256(part_path, limit=position) if position else hashlib.sha256()
+                    result['bytes'] = position
+                    with open(part_path, 'ab' if position else 'wb') as f:
+                        async for chunk in response.content.iter_chunked(8192):
+                            f.write(chunk)
+                            hasher.update(chunk)
+                            result['bytes'] += len(chunk)
+
+                    if expected is not None and result['bytes'] != expected:
+                        raise IncompleteDownloadError(f"received {result['bytes']:,} of {expected:,} bytes")
+                    result['sha256'] = hasher.hexdigest()
+                    return response.headers
+        except (asyncio.TimeoutError, aiohttp.ClientConnectionError, aiohttp.ClientPayloadError):
+            outcome = ERROR
+            raise
+        finally:
+            if limiter is not None:
+                if outcome is None:
+                    # Invalid URL, cancelled task...: the request was never answered
+                    limiter.cancel()
+                else:
+                    limiter.release(outcome)
+
+    async def download_tender_documents(self, tender_id, tender_name='', reference_number=''):
+        """
+        Download tender documents (كراسة، جدول الكميات، المرفقات), all attachments concurrently
+
+        Returns:
+            Path of the tender download folder
+        """
+        downloads_folder, _ = await self.download_tender_attachments(tender_id, tender_name, reference_number)
+        return downloads_folder
+
+    async def download_tender_attachments(self, tender_id, tender_name='', reference_number='', progress=None):
+        """
+        Download tender documents concurrently and report how each file went
+        (`progress` as in TenderScraper.download_tender_attachments)
+
+        Returns:
+            (downloads_folder, report) - see TenderScraper._download_report
+        """
+        print(f"\n📥 Downloading documents for tender: {tender_id}")
+
+        downloads_folder = self._tender_folder(tender_id, tender_name, reference_number)
+        print(f"📁 Created folder: {downloads_folder}")
+
+        try:
+            attachments_url = f"{self.base_url}/Tender/GetAttachmentsViewComponenet"
+            status, _, text = await self._request('GET', attachments_url, timeout=30,
+                                                  params={'tenderIdStr': tender_id})
+
+            if status != 200:
+                raise Exception(f"Failed to fetch attachments. Status: {status}")
+
+            download_links = self._parse_attachment_links(text, downloads_folder)
+
+            start = time.time()
+            claim_filename = self._filename_claimer()
+            manifest = AttachmentManifest(downloads_folder)
+            results = [self._new_file_result(link_info) for link_info in download_links]
+            if progress is not None:
+                progress.extend(results)
+            try:
+                await asyncio.gather(*(
+                    self._download_file(link_info, downloads_folder, idx, len(download_links), claim_filename,
+                                        result, manifest)
+                    for idx, (link_info, result) in enumerate(zip(download_links, results), 1)
+                ))
+            finally:
+                manifest.save()
+
+            report = self._download_report(results, time.time() - start)
+            print(f"\n✅ Download complete! {report['downloaded']} files saved to: {downloads_folder}")
+            return downloads_folder, report
+
+        except Exception as e:
+            print(f"❌ Error in download_tender_documents: {e}")
+            raise Exception(f"فشل تحميل المستندات: {str(e)}")
+
+
+class AsyncScraperFacade(TenderScraper):
+    """
+    Synchronous facade over AsyncTenderScraper
+
+    Drop-in replacement for TenderScraper in the Flask routes: the I/O methods
+    run on a private event loop thread and block until their coroutine is done.
+    """
+
+    def __init__(self, cookies=None, use_api=False, concurrency=8, http_client=None, store=None):
+        super().__init__(cookies=cookies, use_api=use_api, fetch_concurrency=concurrency,
+                         request_delay=0, http_client=http_client, store=store)
+        self.engine = AsyncTenderScraper(use_api=use_api, concurrency=concurrency, http_client=self.http,
+                                         store=self.store)
+
+        self._loop = asyncio.new_event_loop()
+        self._loop_thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+        self._loop_thread.start()
+
+    def _run(self, coroutine_fn, *args):
+        """Run an engine coroutine on the background loop and wait for its result"""
+        # Settings may have been changed on the facade since the engine was built
+        for attr in ('base_url', 'api_url', 'use_api', 'api_params', 'headers', 'blob_store'):
+            setattr(self.engine, attr, getattr(self, attr))
+        return asyncio.run_coroutine_threadsafe(coroutine_fn(*args), self._loop).result()
+
+    def fetch_page(self, page_number):
+        return self._run(self.engine.fetch_page, page_number)
+
+    def fetch_all_tenders(self, max_pages=100, incremental=False):
+        if self.use_api and incremental:
+            # Delta sync is a short sequential walk driven by fetch_page
+            tenders = self.sync_tenders(max_pages)
+        else:
+            tenders = self._run(self.engine.fetch_all_tenders, max_pages)
+        if self.use_api:
+            self._enrich(tenders)
+        return tenders
+
+    def get_tender_classification(self, tender_id_str):
+        return self._run(self.engine.get_tender_classification, tender_id_str)
+
+    def get_tender_classifications(self, tender_id_strs):
+        return self._run(self.engine.get_tender_classifications, tender_id_strs)
+
+    def download_tender_documents(self, tender_id, tender_name='', reference_number=''):
+        return self._run(self.engine.download_tender_documents, tender_id, tender_name, reference_number)
+
+    def download_tender_attachments(self, tender_id, tender_name='', reference_number='', progress=None):
+        return self._run(self.engine.download_tender_attachments, tender_id, tender_name, reference_number,
+                         progress)
+
+    def close(self):
+        """Close the aiohttp session and stop the loop thread"""
+        self._run(self.engine.close)
+        self._loop.call_soon_threadsafe(self._loop.stop)
@@ -8,20 +8,107 @@ import sys
 import json
 import re
 import shutil
+import threading
 import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
 from pathlib import Path
 
 # Add parent directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
 # Import from root config.py (not src.config package)
-from config import COOKIES
+from config import ATTACHMENT_DEBUG_HTML, COOKIES
+
+from .http_client import get_http_client
+
+# Candidate endpoints that may list a tender's attachments, in default probe order
+ENDPOINT_PATTERNS = [
+    # Attachments view component
+    ('GetAttachmentsViewComponenet', '/Tender/GetAttachmentsViewComponenet?tenderIdStr={tender_id_str}'),
+    # Tender details page (may have attachment links)
+    ('DetailsForSupplier', '/Tender/DetailsForSupplier?STenderId={tender_id_str}'),
+    # Direct attachment download patterns (common in Etimad)
+    ('DownloadTenderFiles', '/Tender/DownloadTenderFiles?tenderIdStr={tender_id_str}'),
+    ('GetAttachmentFile', '/Attachment/GetAttachmentFile?tenderIdStr={tender_id_str}'),
+]
+
+ENDPOINT_CACHE_FILE = Path(__file__).parent.parent.parent / 'data' / 'attachment_endpoints.json'
+
+
+class EndpointCache:
+    """
+    Which attachment endpoint patterns produced attachments, kept in a JSON file
+    so the productive one is tried first across runs
+    """
+    
+    def __init__(self, path=ENDPOINT_CACHE_FILE):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._dirty = False
+        self.stats = {}
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.stats = json.load(f).get('endpoints', {})
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            print(f"⚠️  Ignoring unreadable endpoint cache {self.path}: {e}")
+    
+    @property
+    def winner(self):
+        """Pattern with the most productive probes (None until one has produced attachments)"""
+        with self._lock:
+            best = max(self.stats.items(), key=lambda item: item[1].get('hits', 0), default=(None, {}))
+        return best[0] if best[1].get('hits') else None
+    
+    def ordered(self, names):
+        """Pattern names, most productive first (ties keep the given order)"""
+        with self._lock:
+            return sorted(names, key=lambda name: -self.stats.get(name, {}).get('hits', 0))
+    
+    def record(self, name, productive):
+        with self._lock:
+            entry = self.stats.setdefault(name, {'hits': 0, 'misses': 0})
+            entry['hits' if productive else 'misses'] += 1
+            self._dirty = True
+    
+    def save(self):
+        """Write the cache file if anything was recorded"""
+        with self._lock:
+            if not self._dirty:
+                return
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                tmp_path = self.path.with_suffix('.tmp')
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump({'updated_at': datetime.now().isoformat(), 'endpoints': self.stats}, f, indent=2)
+                os.replace(tmp_path, self.path)
+                self._dirty = False
+            except OSError as e:
+                print(f"⚠️  Could not save endpoint cache: {e}")
+
 
 class TenderAttachmentDownloader:
     """Downloads tender attachments from Etimad"""
     
-    def __init__(self, cookies=None):
-        self.cookies = cookies or COOKIES
+    def __init__(self, cookies=None, http_client=None, debug_html=None, endpoint_cache=None):
+        """
+        Args:
+            cookies: Etimad cookies (default: keep the shared pool's, or config.COOKIES)
+            http_client: Shared EtimadHttpClient
+            debug_html: Save each fetched HTML page under downloads/<tender>/ for
+                        inspection (default: config.ATTACHMENT_DEBUG_HTML)
+            endpoint_cache: EndpointCache remembering the productive endpoint pattern
+        """
+        self.debug_html = ATTACHMENT_DEBUG_HTML if debug_html is None else debug_html
+        self.endpoint_cache = endpoint_cache or EndpointCache()
+        # All requests go through the shared keep-alive pool
+        self.http = http_client or get_http_client()
+        if cookies is not None:
+            self.http.set_cookies(cookies)
+        elif not self.http.cookies:
+            self.http.set_cookies(COOKIES)
         self.base_url = "https://tenders.etimad.sa"
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
@@ -31,6 +118,11 @@ class TenderAttachmentDownloader:
             'Connection': 'keep-alive',
         }
     
+    @property
+    def cookies(self):
+        """Cookies currently used by the shared HTTP pool"""
+        return self.http.cookies
+    
     def get_tender_attachments(self, tender_id_str):
         """
         Get list of attachments for a tender
@@ -39,120 +131,140 @@ class TenderAttachmentDownloader:
         - Booklet (كراسة الشروط والمواصفات)
         - BOQ (جدول الكميات)  
         - Other attachments (مرفقات أخرى)
+        
+        The endpoint that produced attachments last time is tried first on its own;
+        only if it finds nothing are the other candidates probed (concurrently).
         """
         
         print(f"\n🔍 Fetching attachments for tender: {tender_id_str}")
         
-        # Common Etimad attachment endpoints
-        endpoints_to_try = [
-            # Attachments view component
-            f"{self.base_url}/Tender/GetAttachmentsViewComponenet?tenderIdStr={tender_id_str}",
-            
-            # Tender details page (may have attachment links)
-            f"{self.base_url}/Tender/DetailsForSupplier?STenderId={tender_id_str}",
-            
-            # Direct attachment download patterns (common in Etimad)
-            f"{self.base_url}/Tender/DownloadTenderFiles?tenderIdStr={tender_id_str}",
-            f"{self.base_url}/Attachment/GetAttachmentFile?tenderIdStr={tender_id_str}",
-        ]
+        candidates = self.endpoint_cache.ordered([name for name, _ in ENDPOINT_PATTERNS])
+        winner = self.endpoint_cache.winner
+        
+        if winner in candidates:
+            attachments = self._probe_endpoint(winner, tender_id_str)
+            self.endpoint_cache.record(winner, bool(attachments))
+            if attachments:
+                self.endpoint_cache.save()
+                return attachments
+            candidates.remove(winner)
+        
+        # Probe the remaining candidates at the same time
+        with ThreadPoolExecutor(max_workers=max(1, len(candidates))) as pool:
+            results = list(pool.map(lambda name: self._probe_endpoint(name, tender_id_str), candidates))
         
         attachments = []
+        for name, found in zip(candidates, results):
+            self.endpoint_cache.record(name, bool(found))
+            attachments.extend(found)
+        self.endpoint_cache.save()
         
-        for endpoint in endpoints_to_try:
-            try:
-                response = requests.get(
-                    endpoint, 
-                    cookies=self.cookies, 
-                    headers=self.headers,
-                    timeout=15,
-                    allow_redirects=True
-                )
+        return attachments
+    
+    def _probe_endpoint(self, name, tender_id_str):
+        """
+        Fetch one candidate endpoint and parse the attachments it lists
+        
+        Returns:
+            List of attachment dicts (empty if the endpoint gave nothing usable)
+        """
+        endpoint = f"{self.base_url}{dict(ENDPOINT_PATTERNS)[name].format(tender_id_str=tender_id_str)}"
+        attachments = []
+        
+        try:
+            response = self.http.get(
+                endpoint, 
+                headers=self.headers,
+                timeout=15,
+                allow_redirects=True
+            )
+            
+            if response.status_code == 200:
+                print(f"   ✅ {name}: {response.status_code}")
                 
-                if response.status_code == 200:
-                    print(f"   ✅ {endpoint.split('/')[-1].split('?')[0]}: {response.status_code}")
-                    
-                    # Check content type
-                    content_type = response.headers.get('Content-Type', '')
-                    
-                    # If it's a file download, save it
-                    if 'application/' in content_type and 'html' not in content_type:
-                        filename = self._extract_filename(response) or "attachment"
-                        attachments.append({
-                            'name': filename,
-                            'url': endpoint,
-                            'content': response.content,
-                            'content_type': content_type
-                        })
-                        print(f"      📎 Found file: {filename} ({content_type})")
+                # Check content type
+                content_type = response.headers.get('Content-Type', '')
+                
+                # If it's a file download, save it
+                if 'application/' in content_type and 'html' not in content_type:
+                    filename = self._extract_filename(response) or "attachment"
+                    attachments.append({
+                        'name': filename,
+                        'url': endpoint,
+                        'content': response.content,
+                        'content_type': content_type
+                    })
+                    print(f"      📎 Found file: {filename} ({content_type})")
+                
+                # If HTML, parse for download links
+                elif 'html' in content_type:
+                    from bs4 import BeautifulSoup
+                    soup = BeautifulSoup(response.text, 'html.parser')
                     
-                    # If HTML, parse for download links
-                    elif 'html' in content_type:
-                        from bs4 import BeautifulSoup
-                        soup = BeautifulSoup(response.text, 'html.parser')
-                        
-                        # Debug: save HTML for inspection
-                        debug_file = Path("downloads") / tender_id_str / f"{endpoint.split('/')[-1].split('?')[0]}_debug.html"
+                    # Debug: save HTML for inspection
+                    if self.debug_html:
+                        debug_file = Path("downloads") / tender_id_str / f"{name}_debug.html"
                         debug_file.parent.mkdir(parents=True, exist_ok=True)
                         with open(debug_file, 'w', encoding='utf-8') as f:
                             f.write(response.text)
                         print(f"      🐛 Saved debug HTML: {debug_file}")
 
-                        # 1) Find download links (common patterns in Etimad)
-                        download_links = soup.find_all('a', href=True)
-                        for link in download_links:
-                            href = link['href']
-                            text = link.get_text(strip=True)
-
-                            # Check if it's a download link
-                            if any(keyword in href.lower() for keyword in ['download', 'attachment', 'file']):
-                                full_url = href if href.startswith('http') else f"{self.base_url}{href}"
-                                attachments.append({
-                                    'name': text or 'Unnamed',
-                                    'url': full_url,
-                                    'content': None  # Will download later
-                                })
-                                print(f"      🔗 Found link: {text} → {href[:80]}")
+                    # 1) Find download links (common patterns in Etimad)
+                    download_links = soup.find_all('a', href=True)
+                    for link in download_links:
+                        href = link['href']
+                        text = link.get_text(strip=True)
 
-                        # 2) Find forms that trigger print/view pages, e.g. PrintConditionsTemplateRfp
-                        forms = soup.find_all('form', action=True)
-                        for form in forms:
-                            action = form.get('action', '')
-                            if 'PrintConditionsTemplateRfp' in action:
-                                # Usually the form has a hidden input STenderId
-                                st_input = form.find('input', {'name': 'STenderId'})
-                                if st_input and st_input.get('value'):
-                                    st_val = st_input['value']
-                                    # Build full URL (GET form)
-                                    q = urllib.parse.quote_plus(st_val)
-                                    full_url = f"{self.base_url}/Tender/PrintConditionsTemplateRfp?STenderId={q}"
-                                    attachments.append({
-                                        'name': 'print_conditions.html',
-                                        'url': full_url,
-                                        'content': None,
-                                        'type': 'print_html'
-                                    })
-                                    print(f"      🖨️ Found printable HTML form -> {full_url}")
+                        # Check if it's a download link
+                        if any(keyword in href.lower() for keyword in ['download', 'attachment', 'file']):
+                            full_url = href if href.startswith('http') else f"{self.base_url}{href}"
+                            attachments.append({
+                                'name': text or 'Unnamed',
+                                'url': full_url,
+                                'content': None  # Will download later
+                            })
+                            print(f"      🔗 Found link: {text} → {href[:80]}")
 
-                        # 3) Find JS RedirectURL(...) calls which point to /Upload/getfile/{id}:{name}
-                        onclick_links = soup.find_all(attrs={"onclick": True})
-                        for el in onclick_links:
-                            onclick = el.get('onclick', '')
-                            m = re.search(r"RedirectURL\('\s*([^']+?)\s*','\s*([^']+?)\s*'\)", onclick)
-                            if m:
-                                file_id = m.group(1)
-                                file_name = m.group(2)
-                                # Encode file name safely
-                                enc_name = urllib.parse.quote(file_name)
-                                full_url = f"{self.base_url}/Upload/getfile/{file_id}:{enc_name}"
+                    # 2) Find forms that trigger print/view pages, e.g. PrintConditionsTemplateRfp
+                    forms = soup.find_all('form', action=True)
+                    for form in forms:
+                        action = form.get('action', '')
+                        if 'PrintConditionsTemplateRfp' in action:
+                            # Usually the form has a hidden input STenderId
+                            st_input = form.find('input', {'name': 'STenderId'})
+                            if st_input and st_input.get('value'):
+                                st_val = st_input['value']
+                                # Build full URL (GET form)
+                                q = urllib.parse.quote_plus(st_val)
+                                full_url = f"{self.base_url}/Tender/PrintConditionsTemplateRfp?STenderId={q}"
                                 attachments.append({
-                                    'name': file_name,
+                                    'name': 'print_conditions.html',
                                     'url': full_url,
-                                    'content': None
+                                    'content': None,
+                                    'type': 'print_html'
                                 })
-                                print(f"      🔗 Found RedirectURL link: {file_name} -> {full_url}")
-                    
-            except Exception as e:
-                print(f"   ❌ Error with {endpoint.split('/')[-1]}: {str(e)[:100]}")
+                                print(f"      🖨️ Found printable HTML form -> {full_url}")
+
+                    # 3) Find JS RedirectURL(...) calls which point to /Upload/getfile/{id}:{name}
+                    onclick_links = soup.find_all(attrs={"onclick": True})
+                    for el in onclick_links:
+                        onclick = el.get('onclick', '')
+                        m = re.search(r"RedirectURL\('\s*([^']+?)\s*','\s*([^']+?)\s*'\)", onclick)
+                        if m:
+                            file_id = m.group(1)
+                            file_name = m.group(2)
+                            # Encode file name safely
+                            enc_name = urllib.parse.quote(file_name)
+                            full_url = f"{self.base_url}/Upload/getfile/{file_id}:{enc_name}"
+                            attachments.append({
+                                'name': file_name,
+                                'url': full_url,
+                                'content': None
+                            })
+                            print(f"      🔗 Found RedirectURL link: {file_name} -> {full_url}")
+                
+        except Exception as e:
+            print(f"   ❌ Error with {name}: {str(e)[:100]}")
         
         return attachments
     
@@ -170,9 +282,8 @@ class TenderAttachmentDownloader:
         """Download a single attachment"""
         try:
             print(f"   ⬇️  Downloading: {os.path.basename(save_path)}")
-            response = requests.get(
+            response = self.http.get(
                 url,
-                cookies=self.cookies,
                 headers=self.headers,
                 timeout=30,
                 stream=True
@@ -203,9 +314,8 @@ class TenderAttachmentDownloader:
         """
         try:
             print(f"   🖨️  Downloading HTML from: {url[:80]}...")
-            response = requests.get(
+            response = self.http.get(
                 url,
-                cookies=self.cookies,
                 headers=self.headers,
                 timeout=30
             )
@@ -0,0 +1,91 @@
+"""
+Attachment Manifest
+Per-tender-folder manifest.json recording where every attachment came from
+(source URL, ETag / Last-Modified) and what was saved (size, mtime, SHA-256)
+"""
+import json
+import os
+import threading
+from datetime import datetime
+
+MANIFEST_NAME = 'manifest.json'
+
+
+class AttachmentManifest:
+    """
+    manifest.json of one tender folder
+
+    {"updated_at": ..., "files": {<attachment name>: {"filename", "url", "size",
+    "mtime", "sha256", "etag", "last_modified", "downloaded_at"}}}
+
+    Entries are keyed by the attachment name from the attachments page; `filename`
+    is the name on disk (an extension may have been added).
+    """
+
+    def __init__(self, folder):
+        self.path = os.path.join(folder, MANIFEST_NAME)
+        self.folder = folder
+        self._lock = threading.Lock()
+        self.files = {}
+        self._dirty = False
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.files = json.load(f).get('files', {})
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            print(f"⚠️  Ignoring unreadable manifest {self.path}: {e}")
+
+    def current(self, name):
+        """
+        Manifest entry of an attachment whose file is still on disk unchanged
+        (same size and mtime), or None
+        """
+        entry = self.files.get(name)
+        if not entry:
+            return None
+        try:
+            stat = os.stat(os.path.join(self.folder, entry['filename']))
+        except OSError:
+            return None
+        if stat.st_size != entry.get('size') or stat.st_mtime != entry.get('mtime'):
+            return None
+        return entry
+
+    def record(self, name, filename, url, sha256, headers):
+        """Record a freshly saved attachment"""
+        stat = os.stat(os.path.join(self.folder, filename))
+        with self._lock:
+            self.files[name] = {
+                'filename': filename,
+                'url': url,
+                'size': stat.st_size,
+                'mtime': stat.st_mtime,
+                'sha256': sha256,
+                'etag': headers.get('etag'),
+                'last_modified': headers.get('last-modified'),
+                'downloaded_at': datetime.now().isoformat(),
+            }
+            self._dirty = True
+
+    def save(self):
+        """Write manifest.json atomically if anything was recorded"""
+        with self._lock:
+            if not self._dirty:
+                return
+            tmp_path = self.path + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'updated_at': datetime.now().isoformat(), 'files': self.files},
+                          f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self.path)
+            self._dirty = False
+
+
+def conditional_headers(entry):
+    """If-None-Match / If-Modified-Since headers for a manifest entry ({} if it has no validators)"""
+    headers = {}
+    if entry and entry.get('etag'):
+        headers['If-None-Match'] = entry['etag']
+    if entry and entry.get('last_modified'):
+        headers['If-Modified-Since'] = entry['last_modified']
+    return headers
@@ -0,0 +1,116 @@
+"""
+Attachment Blob Store
+Content-addressed storage for downloaded attachments: each distinct file is kept
+once under data/blobs/<sha256[:2]>/<sha256> and tender folders hold hardlinks to it
+"""
+import hashlib
+import os
+import shutil
+import threading
+from pathlib import Path
+
+
+def file_sha256(path, limit=None):
+    """
+    SHA-256 hasher over a file (or its first `limit` bytes), ready to be updated
+    with more data - used to resume hashing a partially downloaded file
+    """
+    hasher = hashlib.sha256()
+    remaining = limit
+    with open(path, 'rb') as f:
+        while remaining is None or remaining > 0:
+            chunk = f.read(1024 * 1024 if remaining is None else min(1024 * 1024, remaining))
+            if not chunk:
+                break
+            hasher.update(chunk)
+            if remaining is not None:
+                remaining -= len(chunk)
+    return hasher
+
+
+class BlobStore:
+    """
+    Stores every attachment once, keyed by the SHA-256 of its content
+
+    Tender folders keep normal-looking files (hardlinks), so DocumentProcessor and
+    the downloads listing are unaffected. Where hardlinks are not possible (other
+    drive, unsupported filesystem) the blob is copied instead.
+    """
+
+    def __init__(self, root):
+        """
+        Args:
+            root: Directory of the blob store
+        """
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self.stats = {'stored': 0, 'deduplicated': 0, 'bytes_saved': 0}
+
+    def path(self, digest):
+        return self.root / digest[:2] / digest
+
+    def ingest(self, src_path, digest, dest_path):
+        """
+        Move a downloaded file into the store and link it to its final name
+
+        Args:
+            src_path: Complete downloaded file (consumed)
+            digest: SHA-256 hex digest of its content
+            dest_path: Final path inside the tender folder
+
+        Returns:
+            True if an identical blob already existed (the download was a duplicate)
+        """
+        blob = self.path(digest)
+        with self._lock:
+            duplicate = blob.exists()
+            if duplicate:
+                size = os.path.getsize(src_path)
+                os.remove(src_path)
+                self.stats['deduplicated'] += 1
+                self.stats['bytes_saved'] += size
+            else:
+                blob.parent.mkdir(exist_ok=True)
+                shutil.move(src_path, blob)
+                self.stats['stored'] += 1
+
+            if os.path.lexists(dest_path):
+                os.remove(dest_path)
+            try:
+                os.link(blob, dest_path)
+            except OSError:
+                shutil.copy2(blob, dest_path)
+        return duplicate
+
+    def prune(self):
+        """
+        Delete blobs no tender folder links to any more (e.g. after a folder was deleted)
+
+        Returns:
+            (blobs removed, bytes freed)
+        """
+        removed, freed = 0, 0
+        with self._lock:
+            for blob in self.root.glob('*/*'):
+                try:
+                    stat = blob.stat()
+                except OSError:
+                    continue
+                if blob.is_file() and stat.st_nlink <= 1:
+                    blob.unlink()
+                    removed += 1
+                    freed += stat.st_size
+        if removed:
+            print(f"🧹 Blob store: removed {removed} unreferenced blobs ({freed / 1024 / 1024:.1f} MB)")
+        return removed, freed
+
+    def snapshot(self):
+        """Blob count, size on disk and dedup counters"""
+        blobs = [blob for blob in self.root.glob('*/*') if blob.is_file()]
+        with self._lock:
+            return {
+                'blobs': len(blobs),
+                'size_mb': round(sum(blob.stat().st_size for blob in blobs) / 1024 / 1024, 2),
+                **self.stats,
+            }
@@ -0,0 +1,154 @@
+"""
+Circuit Breaker
+Fails Etimad calls fast while the portal is down or the session has expired
+"""
+import threading
+import time
+from datetime import datetime
+
+CLOSED = 'closed'        # Requests flow normally
+OPEN = 'open'            # Requests fail immediately with CircuitOpenError
+HALF_OPEN = 'half_open'  # A background probe is checking whether Etimad is back
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of sending a request while the circuit is open"""
+
+
+def auth_failure_reason(status_code, url='', content_type='', location='', expect_json=False):
+    """
+    Detect responses that mean the Etimad session is not valid
+
+    Returns:
+        Short reason string, or None if the response looks authenticated
+    """
+    if status_code in (401, 403):
+        return f'HTTP {status_code}'
+    if 300 <= status_code < 400 and 'login' in (location or '').lower():
+        return 'redirected to login'
+    if 'login' in (url or '').lower():
+        return 'redirected to login'
+    if expect_json and 'text/html' in (content_type or '').lower():
+        return 'HTML instead of JSON (session expired)'
+    return None
+
+
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` consecutive failures (5xx, timeouts,
+    connection errors, auth redirects). While open every call raises
+    CircuitOpenError at once; a background thread runs `probe` every
+    `reset_timeout` seconds and closes the circuit when it succeeds.
+    """
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0, probe=None):
+        """
+        Args:
+            failure_threshold: Consecutive failures that open the circuit
+            reset_timeout: Seconds between background probes while open
+            probe: Zero-argument callable returning True when Etimad is healthy
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.probe = probe
+
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._consecutive_failures = 0
+        self._last_failure = None
+        self._opened_at = None
+        self._generation = 0
+        self.stats = {'opened': 0, 'rejected': 0, 'probes': 0}
+
+    @property
+    def state(self):
+        return self._state
+
+    @property
+    def is_open(self):
+        return self._state != CLOSED
+
+    def before_request(self):
+        """Raise CircuitOpenError if calls are currently blocked"""
+        with self._lock:
+            if self._state == CLOSED:
+                return
+            self.stats['rejected'] += 1
+            retry_in = max(0, int(self._opened_at + self.reset_timeout - time.time()))
+            raise CircuitOpenError(
+                f"Etimad circuit is {self._state} ({self._last_failure}); next probe in {retry_in}s"
+            )
+
+    def record_success(self):
+        with self._lock:
+            self._consecutive_failures = 0
+
+    def record_failure(self, reason):
+        with self._lock:
+            self._consecutive_failures += 1
+            self._last_failure = reason
+            if self._state == CLOSED and self._consecutive_failures >= self.failure_threshold:
+                self._open()
+
+    def reset(self):
+        """Close the circuit (e.g. after new cookies were saved)"""
+        with self._lock:
+            self._close()
+
+    def _open(self):
+        """Open the circuit and start the background prober (caller holds the lock)"""
+        self._state = OPEN
+        self._opened_at = time.time()
+        self.stats['opened'] += 1
+        print(f"⛔ Etimad circuit opened after {self._consecutive_failures} failures: {self._last_failure}")
+
+        if self.probe is not None:
+            # A prober left over from an earlier opening sees the new generation and exits
+            self._generation += 1
+            threading.Thread(target=self._probe_loop, args=(self._generation,), daemon=True).start()
+
+    def _close(self):
+        if self._state != CLOSED:
+            print("✅ Etimad circuit closed")
+        self._state = CLOSED
+        self._consecutive_failures = 0
+        self._opened_at = None
+        self._generation += 1  # Stops a running prober
+
+    def _probe_loop(self, generation):
+        """Probe Etimad in the background until the circuit closes"""
+        while True:
+            time.sleep(self.reset_timeout)
+            with self._lock:
+                if generation != self._generation or self._state == CLOSED:
+                    return
+                self._state = HALF_OPEN
+                self.stats['probes'] += 1
+
+            try:
+                healthy, reason = bool(self.probe()), None
+            except Exception as e:
+                healthy, reason = False, str(e)
+
+            with self._lock:
+                if generation != self._generation:
+                    return
+                if healthy:
+                    self._close()
+                    return
+                self._state = OPEN
+                self._opened_at = time.time()
+                self._last_failure = reason or self._last_failure
+
+    def snapshot(self):
+        """Current breaker state for the status endpoint"""
+        with self._lock:
+            return {
+                'state': self._state,
+                'consecutive_failures': self._consecutive_failures,
+                'failure_threshold': self.failure_threshold,
+                'last_failure': self._last_failure,
+                'opened_at': datetime.fromtimestamp(self._opened_at).isoformat() if self._opened_at else None,
+                'reset_timeout': self.reset_timeout,
+                'stats': dict(self.stats),
+            }
@@ -0,0 +1,193 @@
+"""
+Download Jobs
+Background queue for multi-tender attachment downloads, with per-tender progress
+(files done, bytes transferred, throughput) for the status endpoint
+"""
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime
+from urllib.parse import urlparse
+
+QUEUED = 'queued'
+RUNNING = 'running'
+COMPLETED = 'completed'
+FAILED = 'failed'
+
+
+class DownloadLimits:
+    """
+    Caps on attachment transfers in flight: `max_connections` in total and
+    `per_host` against any single host
+    """
+
+    def __init__(self, max_connections=8, per_host=4):
+        self.max_connections = max(1, max_connections)
+        self.per_host = max(1, per_host)
+        self._global = threading.BoundedSemaphore(self.max_connections)
+        self._hosts = {}
+        self._lock = threading.Lock()
+
+    def _host_slot(self, host):
+        with self._lock:
+            if host not in self._hosts:
+                self._hosts[host] = threading.BoundedSemaphore(self.per_host)
+            return self._hosts[host]
+
+    @contextmanager
+    def slot(self, url):
+        """Hold one global and one per-host transfer slot for `url`"""
+        host_slot = self._host_slot(urlparse(url).netloc)
+        with host_slot, self._global:
+            yield
+
+
+class DownloadJobManager:
+    """
+    Runs submitted tenders on a bounded worker pool and keeps their progress
+
+    Each job is a list of tenders; `workers` tenders are downloaded at the same
+    time (each with the scraper's own per-tender file pool), and every file
+    transfer waits on the shared DownloadLimits.
+    """
+
+    def __init__(self, scraper, workers=2, max_connections=8, per_host=4, max_jobs=100):
+        """
+        Args:
+            scraper: TenderScraper used for the downloads
+            workers: Tenders downloaded at the same time
+            max_connections: File transfers in flight across all jobs
+            per_host: File transfers in flight against one host
+            max_jobs: Finished jobs kept for the status endpoint
+        """
+        self.scraper = scraper
+        self.limits = DownloadLimits(max_connections=max_connections, per_host=per_host)
+        scraper.download_limits = self.limits
+        self.max_jobs = max_jobs
+        self._pool = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix='download')
+        self._lock = threading.Lock()
+        self._jobs = OrderedDict()
+
+    def submit(self, tenders):
+        """
+        Queue a download job
+
+        Args:
+            tenders: List of {'tenderId', 'tenderName', 'referenceNumber'} dicts (or tender ids)
+
+        Returns:
+            Job id
+        """
+        job_id = uuid.uuid4().hex[:12]
+        entries = []
+        for tender in tenders:
+            if not isinstance(tender, dict):
+                tender = {'tenderId': tender}
+            entries.append({
+                'tender_id': str(tender.get('tenderId') or ''),
+                'tender_name': tender.get('tenderName') or '',
+                'reference_number': tender.get('referenceNumber') or '',
+                'status': QUEUED,
+                'folder': None,
+                'error': None,
+                'files': [],
+                'started': None,
+                'finished': None,
+            })
+        entries = [entry for entry in entries if entry['tender_id']]
+        if not entries:
+            raise ValueError('No tender ids given')
+
+        with self._lock:
+            self._jobs[job_id] = {'id': job_id, 'created_at': datetime.now().isoformat(), 'tenders': entries}
+            self._trim()
+
+        for entry in entries:
+            self._pool.submit(self._run, entry)
+
+        print(f"📦 Download job {job_id}: queued {len(entries)} tenders")
+        return job_id
+
+    def _trim(self):
+        """Forget the oldest finished jobs beyond max_jobs (caller holds the lock)"""
+        finished = [job_id for job_id, job in self._jobs.items()
+                    if all(entry['status'] in (COMPLETED, FAILED) for entry in job['tenders'])]
+        for job_id in finished[:max(0, len(self._jobs) - self.max_jobs)]:
+            del self._jobs[job_id]
+
+    def _run(self, entry):
+        entry['status'] = RUNNING
+        entry['started'] = time.time()
+        try:
+            entry['folder'], _ = self.scraper.download_tender_attachments(
+                entry['tender_id'], entry['tender_name'], entry['reference_number'], progress=entry['files']
+            )
+            entry['status'] = COMPLETED
+        except Exception as e:
+            entry['status'] = FAILED
+            entry['error'] = str(e)
+        finally:
+            entry['finished'] = time.time()
+
+    @staticmethod
+    def _tender_snapshot(entry):
+        files = list(entry['files'])
+        transferred = sum(f['bytes'] for f in files if not f.get('unchanged'))
+        started, finished = entry['started'], entry['finished']
+        elapsed = ((finished or time.time()) - started) if started else 0
+        return {
+            'tender_id': entry['tender_id'],
+            'reference_number': entry['reference_number'],
+            'status': entry['status'],
+            'files_total': len(files),
+            'files_done': sum(1 for f in files if f['status'] == 'ok'),
+            'files_failed': sum(1 for f in files if f['status'] == 'failed'),
+            'files_unchanged': sum(1 for f in files if f.get('unchanged')),
+            'bytes': transferred,
+            'seconds': round(elapsed, 2),
+            'throughput_bps': round(transferred / elapsed) if elapsed > 0 else 0,
+            'folder': entry['folder'],
+            'error': entry['error'],
+            'files': [{k: f[k] for k in ('file', 'filename', 'status', 'bytes', 'error')} for f in files],
+        }
+
+    def status(self, job_id):
+        """Progress of one job, or None if the id is unknown"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is None:
+            return None
+
+        tenders = [self._tender_snapshot(entry) for entry in job['tenders']]
+        statuses = {t['status'] for t in tenders}
+        if statuses <= {COMPLETED, FAILED}:
+            status = FAILED if statuses == {FAILED} else COMPLETED
+        else:
+            status = RUNNING if statuses - {QUEUED} else QUEUED
+        return {
+            'job_id': job_id,
+            'status': status,
+            'created_at': job['created_at'],
+            'tenders_done': sum(1 for t in tenders if t['status'] in (COMPLETED, FAILED)),
+            'tenders_total': len(tenders),
+            'bytes': sum(t['bytes'] for t in tenders),
+            'tenders': tenders,
+        }
+
+    def jobs(self):
+        """Summary of every known job, newest first"""
+        with self._lock:
+            job_ids = list(self._jobs)
+        summaries = []
+        for job_id in reversed(job_ids):
+            job = self.status(job_id)
+            if job is not None:
+                job.pop('tenders')
+                summaries.append(job)
+        return summaries
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
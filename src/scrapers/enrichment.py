@@ -0,0 +1,101 @@
+"""
+Classification Enrichment
+Background stage of the listing pipeline that fetches the classification (التصنيف)
+of newly listed tenders and stores it next to the tender record
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+class ClassificationEnricher:
+    """
+    Bounded worker pool that classifies tenders in the background
+
+    submit() returns at once; tenders that already have a stored classification
+    or are already queued are skipped. Results go to the scraper's TenderStore,
+    where filter_tenders picks them up.
+    """
+
+    def __init__(self, scraper, max_workers=4, on_drain=None):
+        """
+        Args:
+            scraper: TenderScraper (or facade) used for lookups and storage
+            max_workers: Classification requests in flight
+            on_drain: Callback run when the queue empties after new results were stored
+        """
+        self.scraper = scraper
+        self.on_drain = on_drain
+        self._pool = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix='enrich')
+        self._lock = threading.Lock()
+        self._pending = set()
+        self._stored_since_drain = 0
+        self.stats = {'queued': 0, 'classified': 0, 'requires_classification': 0, 'failed': 0}
+
+    def submit(self, tenders):
+        """
+        Queue classification lookups for tenders that don't have one yet
+
+        Args:
+            tenders: Listing records (dicts with tenderIdString) or tenderIdString values
+
+        Returns:
+            Number of tenders queued
+        """
+        tender_ids = [t.get('tenderIdString') if isinstance(t, dict) else t for t in tenders]
+        tender_ids = [tid for tid in dict.fromkeys(tender_ids) if tid]
+        if not tender_ids:
+            return 0
+
+        known = self.scraper.store.get_classifications(tender_ids)
+        with self._lock:
+            new_ids = [tid for tid in tender_ids if tid not in known and tid not in self._pending]
+            self._pending.update(new_ids)
+            self.stats['queued'] += len(new_ids)
+
+        for tender_id_str in new_ids:
+            self._pool.submit(self._classify, tender_id_str)
+
+        if new_ids:
+            print(f"🏷️  Enrichment: queued classification of {len(new_ids)} new tenders")
+        return len(new_ids)
+
+    def _classify(self, tender_id_str):
+        try:
+            classification_info = self.scraper.get_tender_classification(tender_id_str)
+        except Exception as e:
+            print(f"⚠️  Enrichment failed for {tender_id_str}: {e}")
+            classification_info = None
+
+        if classification_info:
+            self.scraper.store.save_classification(tender_id_str, classification_info)
+
+        with self._lock:
+            self._pending.discard(tender_id_str)
+            if classification_info:
+                self.stats['classified'] += 1
+                self._stored_since_drain += 1
+                if classification_info.get('requires_classification'):
+                    self.stats['requires_classification'] += 1
+            else:
+                self.stats['failed'] += 1
+            drained = not self._pending and self._stored_since_drain > 0
+            if drained:
+                self._stored_since_drain = 0
+
+        if drained:
+            print("✅ Enrichment: queue drained")
+            if self.on_drain is not None:
+                self.on_drain()
+
+    @property
+    def pending(self):
+        with self._lock:
+            return len(self._pending)
+
+    def snapshot(self):
+        """Queue size and counters for status endpoints"""
+        with self._lock:
+            return {'pending': len(self._pending), **self.stats}
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,191 @@
+"""
+HTML Extraction
+Pluggable, targeted extraction of the few elements read from Etimad view components
+(classification list items, the RFP booklet form, RedirectURL attachment links)
+
+Backends, fastest first: selectolax, lxml, BeautifulSoup (html.parser). Every
+backend returns exactly the same values as the original BeautifulSoup walks.
+"""
+import html as html_lib
+import logging
+import re
+from abc import ABC, abstractmethod
+
+from bs4 import BeautifulSoup
+
+try:
+    from selectolax.lexbor import LexborHTMLParser as SelectolaxParser
+    SELECTOLAX_AVAILABLE = True
+except ImportError:
+    SelectolaxParser = None
+    SELECTOLAX_AVAILABLE = False
+
+try:
+    import lxml.html
+    LXML_AVAILABLE = True
+except ImportError:
+    LXML_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# onclick="RedirectURL('idd_XXX','filename.pdf')" - matched on the raw page, no parse needed
+REDIRECT_URL_RE = re.compile(r"RedirectURL\('([^']+)','([^']+)'\)")
+
+# Markers checked before parsing, so pages without the element are never parsed
+LIST_ITEM_MARKER = 'list-group-item'
+RFP_FORM_ACTION = 'PrintConditionsTemplateRfp'
+
+
+class BaseExtractor(ABC):
+    """Common fast paths; subclasses implement the parser-specific lookups"""
+
+    name = 'base'
+
+    def list_items(self, html):
+        """
+        (title, value) text of every li.list-group-item that has both a
+        div.etd-item-title and a div.etd-item-info
+        """
+        if LIST_ITEM_MARKER not in html:
+            return []
+        return self._list_items(html)
+
+    def rfp_tender_id(self, html):
+        """STenderId value of the first form[action=PrintConditionsTemplateRfp], or None"""
+        if RFP_FORM_ACTION not in html:
+            return None
+        return self._rfp_tender_id(html)
+
+    def redirect_links(self, html):
+        """(file_id, file_name) of every RedirectURL('id','name') link, in page order"""
+        if 'RedirectURL(' not in html:
+            return []
+        # Attribute values are entity-encoded in the raw page (e.g. &amp; in file names)
+        return [(html_lib.unescape(file_id), html_lib.unescape(file_name))
+                for file_id, file_name in REDIRECT_URL_RE.findall(html)]
+
+    @abstractmethod
+    def _list_items(self, html):
+        """list_items() on a page known to contain list items"""
+
+    @abstractmethod
+    def _rfp_tender_id(self, html):
+        """rfp_tender_id() on a page known to contain the RFP form"""
+
+
+class BeautifulSoupExtractor(BaseExtractor):
+    """Reference backend (always available)"""
+
+    name = 'bs4'
+
+    def _list_items(self, html):
+        soup = BeautifulSoup(html, 'html.parser')
+        items = []
+        for item in soup.find_all('li', class_='list-group-item'):
+            title_div = item.find('div', class_='etd-item-title')
+            info_div = item.find('div', class_='etd-item-info')
+            if title_div and info_div:
+                items.append((title_div.get_text(strip=True), info_div.get_text(strip=True)))
+        return items
+
+    def _rfp_tender_id(self, html):
+        soup = BeautifulSoup(html, 'html.parser')
+        form = soup.find('form', action=RFP_FORM_ACTION)
+        if form:
+            tender_id_input = form.find('input', {'name': 'STenderId'})
+            if tender_id_input:
+                return tender_id_input.get('value', '')
+        return None
+
+
+def _has_class(class_name):
+    return f'contains(concat(" ", normalize-space(@class), " "), " {class_name} ")'
+
+
+class LxmlExtractor(BaseExtractor):
+    """libxml2-based backend"""
+
+    name = 'lxml'
+
+    _LIST_ITEMS = f'//li[{_has_class(LIST_ITEM_MARKER)}]'
+    _TITLE = f'.//div[{_has_class("etd-item-title")}]'
+    _INFO = f'.//div[{_has_class("etd-item-info")}]'
+
+    @staticmethod
+    def _text(element):
+        # Same as BeautifulSoup's get_text(strip=True)
+        return ''.join(part.strip() for part in element.itertext())
+
+    def _list_items(self, html):
+        root = lxml.html.fromstring(html)
+        items = []
+        for item in root.xpath(self._LIST_ITEMS):
+            title_div = item.xpath(self._TITLE)
+            info_div = item.xpath(self._INFO)
+            if title_div and info_div:
+                items.append((self._text(title_div[0]), self._text(info_div[0])))
+        return items
+
+    def _rfp_tender_id(self, html):
+        root = lxml.html.fromstring(html)
+        forms = root.xpath(f'//form[@action="{RFP_FORM_ACTION}"]')
+        if forms:
+            inputs = forms[0].xpath('.//input[@name="STenderId"]')
+            if inputs:
+                return inputs[0].get('value', '')
+        return None
+
+
+class SelectolaxExtractor(BaseExtractor):
+    """Lexbor-based backend (pip install selectolax)"""
+
+    name = 'selectolax'
+
+    @staticmethod
+    def _text(node):
+        return node.text(deep=True, separator='', strip=True)
+
+    def _list_items(self, html):
+        tree = SelectolaxParser(html)
+        items = []
+        for item in tree.css('li.list-group-item'):
+            title_div = item.css_first('div.etd-item-title')
+            info_div = item.css_first('div.etd-item-info')
+            if title_div and info_div:
+                items.append((self._text(title_div), self._text(info_div)))
+        return items
+
+    def _rfp_tender_id(self, html):
+        tree = SelectolaxParser(html)
+        form = tree.css_first(f'form[action="{RFP_FORM_ACTION}"]')
+        if form:
+            tender_id_input = form.css_first('input[name="STenderId"]')
+            if tender_id_input:
+                return tender_id_input.attributes.get('value') or ''
+        return None
+
+
+EXTRACTORS = {
+    'selectolax': SelectolaxExtractor,
+    'lxml': LxmlExtractor,
+    'bs4': BeautifulSoupExtractor,
+}
+
+
+def available_backends():
+    """Names of the backends that can be used here, fastest first"""
+    available = {'selectolax': SELECTOLAX_AVAILABLE, 'lxml': LXML_AVAILABLE, 'bs4': True}
+    return [name for name in EXTRACTORS if available[name]]
+
+
+def get_extractor(backend='auto'):
+    """
+    Args:
+        backend: 'auto' (fastest available), 'selectolax', 'lxml' or 'bs4'
+    """
+    if backend in (None, 'auto'):
+        backend = available_backends()[0]
+    if backend not in available_backends():
+        logger.warning(f"HTML backend '{backend}' not available, falling back to {available_backends()[0]}")
+        backend = available_backends()[0]
+    return EXTRACTORS[backend]()
@@ -0,0 +1,216 @@
+"""
+Shared HTTP Client for Etimad
+One pooled keep-alive session used by every outbound request to tenders.etimad.sa,
+paced by a shared adaptive rate limiter and guarded by a circuit breaker
+"""
+import threading
+import time
+from http.cookiejar import DefaultCookiePolicy
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import config
+
+from .circuit_breaker import CircuitBreaker, auth_failure_reason
+from .rate_limiter import AdaptiveRateLimiter, ERROR, classify_status, parse_retry_after
+
+# Headers sent with every request (call sites may add or override their own)
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Accept-Language': 'ar,en-US;q=0.9,en;q=0.8',
+    'Connection': 'keep-alive',
+}
+
+# Cheap authenticated request used to check whether Etimad is back (circuit breaker probe)
+PROBE_URL = 'https://tenders.etimad.sa/Tender/AllSupplierTendersAsync?PageSize=1&PageNumber=1'
+
+# Longest wait for a rate-limiter slot before a request gives up (safety net
+# against slots that are never released)
+SLOT_WAIT_TIMEOUT = 300
+
+# Keep-alive connections kept open per host
+DEFAULT_HOST_POOL_SIZES = {
+    'tenders.etimad.sa': 20,
+}
+
+
+class EtimadHttpClient:
+    """Thread-safe pooled HTTP client with cookie injection and adaptive rate limiting"""
+
+    def __init__(self, cookies=None, headers=None, host_pool_sizes=None,
+                 pool_connections=10, pool_maxsize=10, rate_limiter=None, max_retries=3,
+                 breaker=None):
+        """
+        Args:
+            cookies: Etimad authentication cookies injected into every request
+            headers: Extra default headers
+            host_pool_sizes: {host: max keep-alive connections} for specific hosts
+            pool_connections: Number of host pools kept by the default adapter
+            pool_maxsize: Connections per host for hosts not listed above
+            rate_limiter: AdaptiveRateLimiter pacing every request (None = unlimited)
+            max_retries: Retries after a 429/5xx/timeout (only with a rate limiter)
+            breaker: CircuitBreaker that fails requests fast during outages (None = disabled);
+                     it is given this client's probe() if it has none
+        """
+        self._lock = threading.RLock()
+        self._cookies = dict(cookies or {})
+        self.rate_limiter = rate_limiter
+        self.max_retries = max_retries
+        self.breaker = breaker
+        if breaker is not None and breaker.probe is None:
+            breaker.probe = self.probe
+
+        self.session = requests.Session()
+        self.session.headers.update(DEFAULT_HEADERS)
+        if headers:
+            self.session.headers.update(headers)
+
+        # Credentials come only from set_cookies(): never persist Set-Cookie
+        # responses in the shared session so one caller can't leak into another
+        self.session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+
+        default_adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+        self.session.mount('https://', default_adapter)
+        self.session.mount('http://', default_adapter)
+
+        self.host_pool_sizes = dict(DEFAULT_HOST_POOL_SIZES if host_pool_sizes is None else host_pool_sizes)
+        for host, size in self.host_pool_sizes.items():
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=size)
+            self.session.mount(f'https://{host}', adapter)
+            self.session.mount(f'http://{host}', adapter)
+
+    @property
+    def cookies(self):
+        """Copy of the cookies currently injected into requests"""
+        with self._lock:
+            return dict(self._cookies)
+
+    def set_cookies(self, cookies):
+        """Swap credentials on the live pool (open connections are kept)"""
+        with self._lock:
+            self._cookies = dict(cookies or {})
+        # New credentials: give Etimad another chance right away
+        if self.breaker is not None:
+            self.breaker.reset()
+
+    def request(self, method, url, cookies=None, expect_json=False, **kwargs):
+        """
+        Send a request through the shared pool
+
+        Args:
+            method: HTTP method
+            url: Target URL
+            cookies: Cookies to use instead of the pool credentials (e.g. to test new
+                     cookies); such requests bypass the circuit breaker
+            expect_json: An HTML response means the session expired (counts as a breaker failure)
+            **kwargs: Passed to requests (params, headers, data, timeout, stream, ...)
+
+        Raises:
+            CircuitOpenError: Etimad is currently considered down or logged out
+        """
+        breaker = self.breaker if cookies is None else None
+        if cookies is None:
+            cookies = self.cookies
+
+        attempt = 0
+        while True:
+            if breaker is not None:
+                breaker.before_request()
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire(timeout=SLOT_WAIT_TIMEOUT)
+
+            try:
+                response = self.session.request(method, url, cookies=cookies, **kwargs)
+            except (requests.Timeout, requests.ConnectionError) as e:
+                if breaker is not None:
+                    breaker.record_failure(type(e).__name__)
+                if self.rate_limiter is None:
+                    raise
+                delay = self.rate_limiter.release(ERROR)
+                if attempt >= self.max_retries:
+                    raise
+            except BaseException:
+                # Invalid URL, redirect loop, broken body...: not retried, but the slot must come back
+                if self.rate_limiter is not None:
+                    self.rate_limiter.cancel()
+                raise
+            else:
+                if breaker is not None:
+                    self._record_response(breaker, response, expect_json)
+                if self.rate_limiter is None:
+                    return response
+                delay = self.rate_limiter.release(
+                    classify_status(response.status_code),
+                    retry_after=parse_retry_after(response.headers.get('Retry-After'))
+                )
+                if not delay or attempt >= self.max_retries:
+                    return response
+                response.close()
+
+            attempt += 1
+            print(f"⏳ Etimad backoff {delay:.1f}s before retry {attempt}/{self.max_retries}: {method} {url}")
+            time.sleep(delay)
+
+    @staticmethod
+    def _record_response(breaker, response, expect_json):
+        """Report a response to the circuit breaker"""
+        if response.status_code >= 500:
+            breaker.record_failure(f'HTTP {response.status_code}')
+            return
+        reason = auth_failure_reason(
+            response.status_code,
+            url=response.url,
+            content_type=response.headers.get('Content-Type', ''),
+            location=response.headers.get('Location', ''),
+            expect_json=expect_json,
+        )
+        if reason:
+            breaker.record_failure(reason)
+        else:
+            breaker.record_success()
+
+    def probe(self):
+        """Authenticated one-row listing request used by the breaker's half-open probe"""
+        response = self.session.get(PROBE_URL, cookies=self.cookies, timeout=10)
+        return response.status_code < 500 and not auth_failure_reason(
+            response.status_code,
+            url=response.url,
+            content_type=response.headers.get('Content-Type', ''),
+            location=response.headers.get('Location', ''),
+            expect_json=True,
+        )
+
+    def get(self, url, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request('POST', url, **kwargs)
+
+    def close(self):
+        self.session.close()
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_http_client():
+    """Return the process-wide Etimad HTTP client"""
+    global _client
+    with _client_lock:
+        if _client is None:
+            limiter = AdaptiveRateLimiter(
+                rate=getattr(config, 'RATE_LIMIT_INITIAL_RPS', 2.0),
+                max_rate=getattr(config, 'RATE_LIMIT_MAX_RPS', 20.0),
+                concurrency=getattr(config, 'FETCH_CONCURRENCY', 4),
+                max_concurrency=getattr(config, 'RATE_LIMIT_MAX_CONCURRENCY', 16),
+            )
+            breaker = CircuitBreaker(
+                failure_threshold=getattr(config, 'CIRCUIT_FAILURE_THRESHOLD', 5),
+                reset_timeout=getattr(config, 'CIRCUIT_RESET_TIMEOUT', 30),
+            )
+            _client = EtimadHttpClient(rate_limiter=limiter,
+                                       max_retries=getattr(config, 'HTTP_MAX_RETRIES', 3),
+                                       breaker=breaker)
+        return _client
@@ -0,0 +1,208 @@
+"""
+Adaptive Rate Limiter
+Token bucket + AIMD concurrency limit shared by every Etimad request
+"""
+import asyncio
+import random
+import threading
+import time
+
+# Request outcomes reported back to the limiter
+SUCCESS = 'success'
+THROTTLED = 'throttled'  # 429
+ERROR = 'error'          # 5xx, timeout, connection error
+
+# Seconds to wait before re-checking when every concurrency slot is busy
+_SLOT_POLL_INTERVAL = 0.05
+
+
+def classify_status(status_code):
+    """Map an HTTP status code to a limiter outcome"""
+    if status_code == 429:
+        return THROTTLED
+    if status_code >= 500:
+        return ERROR
+    return SUCCESS
+
+
+class AdaptiveRateLimiter:
+    """
+    Paces requests to the fastest rate the portal tolerates
+
+    - Token bucket: at most `rate` requests per second (bursts up to `burst`)
+    - Concurrency: at most `concurrency` requests in flight
+    - Healthy responses raise both additively; a 429/5xx/timeout halves both
+      and blocks new requests for an exponential backoff with full jitter
+      (or the server's Retry-After)
+    """
+
+    def __init__(self, rate=2.0, min_rate=0.2, max_rate=20.0, rate_step=1.0,
+                 concurrency=4, min_concurrency=1, max_concurrency=16,
+                 backoff_base=1.0, backoff_max=60.0):
+        """
+        Args:
+            rate: Initial requests per second
+            min_rate / max_rate: Bounds for the adaptive rate
+            rate_step: Requests per second added per second of healthy responses
+            concurrency: Initial number of requests allowed in flight
+            min_concurrency / max_concurrency: Bounds for the adaptive concurrency
+            backoff_base: First backoff ceiling in seconds (doubles per consecutive failure)
+            backoff_max: Backoff ceiling in seconds
+        """
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.rate_step = rate_step
+        self.min_concurrency = min_concurrency
+        self.max_concurrency = max_concurrency
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+        self._cond = threading.Condition()
+        self._rate = float(rate)
+        self._concurrency = float(concurrency)
+        self._tokens = 1.0
+        self._refilled_at = time.monotonic()
+        self._in_flight = 0
+        self._blocked_until = 0.0
+        self._last_decrease = 0.0
+        self._consecutive_failures = 0
+
+        self.stats = {'requests': 0, 'successes': 0, 'throttled': 0, 'errors': 0, 'backoffs': 0}
+
+    @property
+    def burst(self):
+        return max(1.0, self._rate)
+
+    def _refill(self, now):
+        self._tokens = min(self.burst, self._tokens + (now - self._refilled_at) * self._rate)
+        self._refilled_at = now
+
+    def _try_acquire(self):
+        """Take a slot and a token if possible; returns 0 or the seconds to wait (caller holds the lock)"""
+        now = time.monotonic()
+        if now < self._blocked_until:
+            return self._blocked_until - now
+        if self._in_flight >= int(self._concurrency):
+            return _SLOT_POLL_INTERVAL
+        self._refill(now)
+        if self._tokens < 1:
+            return (1 - self._tokens) / self._rate
+
+        self._tokens -= 1
+        self._in_flight += 1
+        self.stats['requests'] += 1
+        return 0
+
+    def acquire(self, timeout=None):
+        """
+        Block until a request may be sent
+
+        Raises:
+            TimeoutError: If no slot was free within `timeout` seconds
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while True:
+                wait = self._try_acquire()
+                if not wait:
+                    return
+                if deadline is not None:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise TimeoutError(f"No Etimad request slot free after {timeout}s")
+                    wait = min(wait, remaining)
+                self._cond.wait(wait)
+
+    async def acquire_async(self, timeout=None):
+        """Async version of acquire() for the aiohttp backend"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._cond:
+                wait = self._try_acquire()
+            if not wait:
+                return
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError(f"No Etimad request slot free after {timeout}s")
+                wait = min(wait, remaining)
+            await asyncio.sleep(wait)
+
+    def cancel(self):
+        """
+        Give back a slot taken with acquire() without reporting an outcome, for a
+        request that failed before the portal answered (invalid URL, cancelled task...)
+        """
+        with self._cond:
+            self._in_flight = max(0, self._in_flight - 1)
+            self._cond.notify_all()
+
+    def release(self, outcome=SUCCESS, retry_after=None):
+        """
+        Report the outcome of a request acquired with acquire()
+
+        Args:
+            outcome: SUCCESS, THROTTLED or ERROR
+            retry_after: Server-requested delay in seconds (429 Retry-After)
+
+        Returns:
+            Backoff delay in seconds (0 on success)
+        """
+        with self._cond:
+            self._in_flight = max(0, self._in_flight - 1)
+            now = time.monotonic()
+
+            if outcome == SUCCESS:
+                self.stats['successes'] += 1
+                self._consecutive_failures = 0
+                # Additive increase: about +rate_step req/s and +1 slot per window of responses
+                self._rate = min(self.max_rate, self._rate + self.rate_step / max(self._rate, 1.0))
+                self._concurrency = min(self.max_concurrency, self._concurrency + 1.0 / self._concurrency)
+                self._cond.notify_all()
+                return 0
+
+            self.stats['throttled' if outcome == THROTTLED else 'errors'] += 1
+            self._consecutive_failures += 1
+
+            # Multiplicative decrease, at most once per backoff window so a burst of
+            # failures from requests already in flight does not collapse the rate
+            if now >= self._last_decrease + 1.0 / self._rate:
+                self._rate = max(self.min_rate, self._rate / 2)
+                self._concurrency = max(self.min_concurrency, self._concurrency / 2)
+                self._tokens = min(self._tokens, 0.0)
+                self._last_decrease = now
+
+            ceiling = min(self.backoff_max, self.backoff_base * 2 ** (self._consecutive_failures - 1))
+            delay = retry_after if retry_after is not None else random.uniform(0, ceiling)
+            delay = min(self.backoff_max, max(0.0, delay))
+            self._blocked_until = max(self._blocked_until, now + delay)
+            self.stats['backoffs'] += 1
+            self._cond.notify_all()
+            return delay
+
+    def snapshot(self):
+        """Current limiter state for the status endpoint"""
+        with self._cond:
+            now = time.monotonic()
+            self._refill(now)
+            return {
+                'rate_per_second': round(self._rate, 2),
+                'concurrency_limit': int(self._concurrency),
+                'in_flight': self._in_flight,
+                'tokens': round(self._tokens, 2),
+                'backoff_remaining': round(max(0.0, self._blocked_until - now), 2),
+                'consecutive_failures': self._consecutive_failures,
+                'bounds': {
+                    'rate': [self.min_rate, self.max_rate],
+                    'concurrency': [self.min_concurrency, self.max_concurrency],
+                },
+                'stats': dict(self.stats),
+            }
+
+
+def parse_retry_after(value):
+    """Retry-After header in seconds (HTTP-date form is ignored)"""
+    try:
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
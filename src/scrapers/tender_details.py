@@ -0,0 +1,98 @@
+"""
+Tender Details Index
+Tender detail records (data/tender_info.json) loaded once and indexed by tender id,
+with the classification (تصنيف) requirement precomputed per tender
+"""
+import json
+import os
+import threading
+from collections import defaultdict
+
+
+def _is_classification_name(name):
+    return 'تصنيف' in name or 'classification' in name.lower()
+
+
+def _criteria_require_classification(criteria):
+    """Walk a tenderCriteria list, including nested childCriteria"""
+    for criterion in criteria or []:
+        if _is_classification_name(criterion.get('name') or ''):
+            return True
+        if _criteria_require_classification(criterion.get('childCriteria')):
+            return True
+    return False
+
+
+def details_require_classification(details):
+    """
+    Classification requirement from a tender's detail records
+
+    An explicit `requiresClassification` field wins; otherwise any criterion
+    (or child criterion) named after تصنيف / classification means it is required.
+    """
+    for detail in details:
+        if 'requiresClassification' in detail:
+            return bool(detail['requiresClassification'])
+        if _criteria_require_classification(detail.get('tenderCriteria')):
+            return True
+    return False
+
+
+class TenderDetailIndex:
+    """
+    In-memory index of tender detail records keyed by tenderIdStr
+
+    The file is parsed once and re-parsed only when its modification time
+    changes, so per-tender lookups on the request path are dict lookups.
+    """
+
+    def __init__(self, details_file):
+        """
+        Args:
+            details_file: Path of the JSON list of tender detail records
+        """
+        self.details_file = details_file
+        self._lock = threading.Lock()
+        self._mtime = None
+        self._details = {}
+        self._flags = {}
+
+    def _refresh(self):
+        """(Re)build the index if the file changed since it was last loaded"""
+        try:
+            mtime = os.path.getmtime(self.details_file)
+        except OSError:
+            mtime = None
+
+        with self._lock:
+            if mtime == self._mtime:
+                return
+            details = defaultdict(list)
+            if mtime is not None:
+                try:
+                    with open(self.details_file, 'r', encoding='utf-8') as f:
+                        records = json.load(f)
+                except (OSError, ValueError) as e:
+                    print(f"⚠️  Could not load tender details from {self.details_file}: {e}")
+                    records = []
+                for record in records:
+                    details[record.get('tenderIdStr', '')].append(record)
+
+            self._details = dict(details)
+            self._flags = {tid: details_require_classification(recs) for tid, recs in self._details.items()}
+            self._mtime = mtime
+
+    def details(self, tender_id):
+        """Detail records of one tender ([] if unknown)"""
+        self._refresh()
+        return self._details.get(tender_id, [])
+
+    def requires_classification(self, tender_id):
+        """Precomputed classification flag of one tender (False if unknown)"""
+        self._refresh()
+        return self._flags.get(tender_id, False)
+
+    def flags(self):
+        """{tenderIdStr: requires classification} for every indexed tender"""
+        self._refresh()
+        return self._flags
@@ -1,3 +1,4 @@
+import hashlib
 import json
 import os
 import sys
@@ -5,15 +6,76 @@ import requests
 from datetime import datetime, timedelta
 import time
 import re
-from bs4 import BeautifulSoup
+import math
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import nullcontext
 from pathlib import Path
 
+# Import from root config.py (not src.config package)
+from config import ATTACHMENT_DEBUG_HTML
+
+from .attachment_manifest import AttachmentManifest, conditional_headers
+from .blob_store import file_sha256
+from .circuit_breaker import CircuitOpenError
+from .http_client import get_http_client
+from .enrichment import ClassificationEnricher
+from .html_extract import get_extractor
+from .tender_details import TenderDetailIndex
+from .tender_store import TenderStore
+
+# Attachments are streamed into "<name>.part" and renamed once complete
+PART_SUFFIX = '.part'
+
+# Transfer attempts per attachment; each retry resumes the .part file with a Range request
+DOWNLOAD_ATTEMPTS = 3
+
+CONTENT_RANGE_RE = re.compile(r'bytes\s+(?:(\d+)-\d+|\*)/(\d+|\*)')
+
+
+class IncompleteDownloadError(Exception):
+    """The attachment body ended before the size announced by the server"""
+
+
 class TenderScraper:
-    def __init__(self, cookies=None, use_api=False):
+    def __init__(self, cookies=None, use_api=False, fetch_concurrency=1, request_delay=0, http_client=None,
+                 store=None, html_backend='auto', download_concurrency=4):
         self.base_url = "https://tenders.etimad.sa"
         self.api_url = "https://tenders.etimad.sa/Tender/AllSupplierTendersAsync"
         self.use_api = use_api
-        self.cookies = cookies or {}
+        
+        # All requests go through the shared keep-alive pool
+        self.http = http_client or get_http_client()
+        if cookies is not None:
+            self.http.set_cookies(cookies)
+        
+        # Number of pages fetched at the same time (1 = original sequential walk)
+        self.fetch_concurrency = max(1, int(fetch_concurrency or 1))
+        # Extra fixed delay (seconds) between two requests of the same worker; normal
+        # pacing is done by the shared client's adaptive rate limiter
+        self.request_delay = request_delay
+        # Attachments of one tender downloaded at the same time
+        self.download_concurrency = max(1, int(download_concurrency or 1))
+        # Optional DownloadLimits (global/per-host transfer caps), set by DownloadJobManager
+        self.download_limits = None
+        # Optional BlobStore that keeps identical attachments once across tender folders
+        self.blob_store = None
+        
+        # Project data/ folder (tender store, tender details)
+        self.data_dir = Path(__file__).parent.parent.parent / 'data'
+        self.tenders_file = self.data_dir / 'all_tenders.json'  # Seeds an empty store
+        self.details_index = TenderDetailIndex(self.data_dir / 'tender_info.json')
+        
+        # Targeted HTML extraction for Etimad view components (selectolax > lxml > bs4)
+        self.html_extractor = get_extractor(html_backend)
+        
+        # Local SQLite copy of the listing, read and written by every fetch
+        self.store = store or TenderStore(self.data_dir / 'tenders.db')
+        self.last_sync_stats = None
+        
+        # Background classification of new tenders (off until enable_enrichment())
+        self.enricher = None
         
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
@@ -42,94 +104,174 @@ class TenderScraper:
             'PageSize': '24',
             'TenderTabId': '1'
         }
+    
+    @property
+    def cookies(self):
+        """Cookies currently used by the shared HTTP pool"""
+        return self.http.cookies
+    
+    @cookies.setter
+    def cookies(self, cookies):
+        self.http.set_cookies(cookies)
+    
+    def update_cookies(self, cookies):
+        """
+        Swap authentication cookies on the live connection pool
+        """
+        self.http.set_cookies(cookies)
         
+    def _page_params(self, page_number):
+        """
+        Query parameters for one listing page
+        """
+        params = self.api_params.copy()
+        params['PageNumber'] = str(page_number)
+        params['_'] = str(int(time.time() * 1000))  # Timestamp
+        return params
+    
     def fetch_page(self, page_number):
         """
         Fetch a single page of tenders from Etimad API
         """
         try:
-            params = self.api_params.copy()
-            params['PageNumber'] = str(page_number)
-            params['_'] = str(int(time.time() * 1000))  # Timestamp
+            params = self._page_params(page_number)
             
             print(f"Fetching page {page_number}...")
-            response = requests.get(self.api_url, params=params, headers=self.headers, 
-                                  cookies=self.cookies, timeout=30)
-            
-            print(f"Status Code: {response.status_code}")
+            response = self.http.get(self.api_url, params=params, headers=self.headers, timeout=30,
+                                     expect_json=True)
             
-            if response.status_code == 200:
-                # Check if response is HTML (login page) or JSON
-                content_type = response.headers.get('Content-Type', '').lower()
-                
-                if 'text/html' in content_type or response.text.strip().startswith('<!DOCTYPE') or response.text.strip().startswith('<html'):
-                    print(f"✗ Page {page_number}: Received HTML instead of JSON - Authentication required")
-                    print(f"   Response starts with: {response.text[:100]}")
-                    print(f"\n⚠️  Your cookies have expired! Please update them:")
-                    print(f"   1. Click '🍪 تحديث الكوكيز' button in the UI")
-                    print(f"   2. Paste fresh cookies from the browser extension")
-                    print(f"   3. Try fetching tenders again\n")
-                    return [], 0
-                
-                try:
-                    data = response.json()
-                    tenders = data.get('data', [])
-                    total_count = data.get('totalCount', 0)
-                    print(f"✓ Page {page_number}: {len(tenders)} tenders (Total: {total_count})")
-                    return tenders, total_count
-                except json.JSONDecodeError as je:
-                    print(f"✗ JSON Error on page {page_number}: {je}")
-                    print(f"   Response type: {content_type}")
-                    print(f"   Response preview: {response.text[:500]}")
-                    print(f"\n⚠️  Response is not valid JSON. Cookies may be expired.")
-                    return [], 0
-            elif response.status_code == 302:
-                print(f"✗ Page {page_number}: Redirect detected - Authentication required")
-                print(f"Location: {response.headers.get('Location', 'N/A')[:100]}")
-                return [], 0
-            else:
-                print(f"✗ Page {page_number}: HTTP {response.status_code}")
-                print(f"Response: {response.text[:200]}")
-                return [], 0
+            return self._parse_page_response(
+                page_number,
+                response.status_code,
+                response.headers.get('Content-Type', ''),
+                response.text,
+                response.headers.get('Location', 'N/A')
+            )
                 
+        except CircuitOpenError as e:
+            print(f"⛔ Skipping page {page_number}: {e}")
+            return [], 0
         except Exception as e:
             print(f"✗ Error fetching page {page_number}: {e}")
             import traceback
             traceback.print_exc()
             return [], 0
     
-    def fetch_all_tenders(self, max_pages=100):
+    def _parse_page_response(self, page_number, status_code, content_type, text, location='N/A'):
+        """
+        Parse a listing page response (shared by the sync and async backends)
+        
+        Returns:
+            (tenders, total_count) - ([], 0) on authentication or HTTP errors
+        """
+        print(f"Status Code: {status_code}")
+        
+        if status_code == 200:
+            # Check if response is HTML (login page) or JSON
+            content_type = (content_type or '').lower()
+            
+            if 'text/html' in content_type or text.strip().startswith('<!DOCTYPE') or text.strip().startswith('<html'):
+                print(f"✗ Page {page_number}: Received HTML instead of JSON - Authentication required")
+                print(f"   Response starts with: {text[:100]}")
+                print(f"\n⚠️  Your cookies have expired! Please update them:")
+                print(f"   1. Click '🍪 تحديث الكوكيز' button in the UI")
+                print(f"   2. Paste fresh cookies from the browser extension")
+                print(f"   3. Try fetching tenders again\n")
+                return [], 0
+            
+            try:
+                data = json.loads(text)
+                tenders = data.get('data', [])
+                total_count = data.get('totalCount', 0)
+                print(f"✓ Page {page_number}: {len(tenders)} tenders (Total: {total_count})")
+                return tenders, total_count
+            except json.JSONDecodeError as je:
+                print(f"✗ JSON Error on page {page_number}: {je}")
+                print(f"   Response type: {content_type}")
+                print(f"   Response preview: {text[:500]}")
+                print(f"\n⚠️  Response is not valid JSON. Cookies may be expired.")
+                return [], 0
+        elif status_code == 302:
+            print(f"✗ Page {page_number}: Redirect detected - Authentication required")
+            print(f"Location: {(location or 'N/A')[:100]}")
+            return [], 0
+        else:
+            print(f"✗ Page {page_number}: HTTP {status_code}")
+            print(f"Response: {text[:200]}")
+            return [], 0
+    
+    def fetch_all_tenders(self, max_pages=100, incremental=False):
         """
-        Fetch all tenders - either from Etimad API with pagination or from local JSON
+        Fetch all tenders - either from Etimad API with pagination or from the local store
+        
+        Args:
+            max_pages: Maximum number of listing pages to request
+            incremental: Only fetch pages until one is made entirely of known tenders
+                         and merge the delta into the local store (see sync_tenders)
         """
+        if not incremental:
+            self.last_sync_stats = None
+        
         # Try to use API if enabled and authenticated
         if self.use_api:
-            return self._fetch_from_api(max_pages)
+            if incremental:
+                tenders = self.sync_tenders(max_pages)
+            else:
+                tenders = self._fetch_from_api(max_pages)
+                self._save_to_store(tenders)
+            self._enrich(tenders)
+            return tenders
         else:
-            return self._fetch_from_json()
+            return self._fetch_from_store()
+    
+    def enable_enrichment(self, max_workers=4, on_drain=None):
+        """
+        Classify newly listed tenders in the background after every API fetch
+        (see ClassificationEnricher); filter_tenders then excludes the ones that
+        require classification
+        """
+        self.enricher = ClassificationEnricher(self, max_workers=max_workers, on_drain=on_drain)
+        return self.enricher
+    
+    def _enrich(self, tenders):
+        """Hand fetched tenders to the enrichment stage, if enabled"""
+        if self.enricher is not None and tenders:
+            self.enricher.submit(tenders)
     
-    def _fetch_from_json(self):
+    def _fetch_from_store(self):
         """
-        Fetch tenders from local JSON file
+        Fetch tenders from the local tender store (seeded from all_tenders.json when empty)
         """
         try:
-            data_file = Path(__file__).parent.parent / 'data' / 'all_tenders.json'
-            with open(data_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                tenders = data.get('data', [])
-                print(f"✓ Loaded {len(tenders)} tenders from local JSON file")
-                return tenders
-        except FileNotFoundError:
-            print("✗ all_tenders.json not found in data/ folder")
-            return []
+            if self.store.count() == 0 and self.tenders_file.exists():
+                imported = self.store.import_json(self.tenders_file)
+                print(f"✓ Seeded tender store with {imported} tenders from all_tenders.json")
+            
+            tenders = self.store.all()
+            print(f"✓ Loaded {len(tenders)} tenders from local store")
+            return tenders
         except Exception as e:
-            print(f"✗ Error reading JSON file: {e}")
+            print(f"✗ Error reading tender store: {e}")
             return []
     
+    def _save_to_store(self, tenders):
+        """
+        Upsert fetched tenders into the local store
+        """
+        try:
+            new_count, changed_count = self.store.upsert_many(tenders)
+            if new_count or changed_count:
+                print(f"💾 Tender store: {new_count} new, {changed_count} changed")
+        except Exception as e:
+            print(f"✗ Error writing tender store: {e}")
+    
     def _fetch_from_api(self, max_pages=100):
         """
         Fetch all tenders from Etimad API with pagination (1 to max_pages)
         """
+        if self.fetch_concurrency > 1:
+            return self._fetch_from_api_parallel(max_pages)
+        
         all_tenders = []
         total_count = 0
         
@@ -146,8 +288,8 @@ class TenderScraper:
                     print(f"  - Missing authentication cookies")
                     print(f"  - API access restrictions")
                     print(f"  - Network issues")
-                    print(f"\nFalling back to local JSON file...\n")
-                    return self._fetch_from_json()
+                    print(f"\nFalling back to local tender store...\n")
+                    return self._fetch_from_store()
                 else:
                     print(f"\nNo more tenders found at page {page}. Stopping.")
                 break
@@ -155,8 +297,9 @@ class TenderScraper:
             all_tenders.extend(tenders)
             total_count = count
             
-            # Small delay to avoid overwhelming the server
-            time.sleep(1)
+            # Optional fixed delay on top of the rate limiter
+            if self.request_delay:
+                time.sleep(self.request_delay)
             
             # Stop if we've fetched all available tenders
             if len(all_tenders) >= total_count:
@@ -169,6 +312,222 @@ class TenderScraper:
         
         return all_tenders
     
+    def _fetch_from_api_parallel(self, max_pages=100):
+        """
+        Fetch all tenders from Etimad API using a bounded pool of workers
+        
+        Page 1 is fetched first to read totalCount, the remaining pages are
+        shared between `fetch_concurrency` workers, paced by the shared rate
+        limiter (plus `request_delay` seconds per worker if set).
+        """
+        print(f"\n{'='*60}")
+        print(f"Starting to fetch tenders from Etimad API ({self.fetch_concurrency} workers)...")
+        print(f"{'='*60}\n")
+        
+        first_page, total_count = self.fetch_page(1)
+        
+        if not first_page:
+            print(f"\n⚠ No tenders found. This might be due to:")
+            print(f"  - Missing authentication cookies")
+            print(f"  - API access restrictions")
+            print(f"  - Network issues")
+            print(f"\nFalling back to local tender store...\n")
+            return self._fetch_from_store()
+        
+        total_pages = self._total_pages(first_page, total_count, max_pages)
+        print(f"📄 {total_count} tenders → {total_pages} pages to fetch")
+        
+        pages = {1: first_page}
+        
+        page_queue = queue.Queue()
+        for page in range(2, total_pages + 1):
+            page_queue.put(page)
+        
+        def worker():
+            fetched = {}
+            first_request = True
+            while True:
+                try:
+                    page = page_queue.get_nowait()
+                except queue.Empty:
+                    return fetched
+                
+                # Optional fixed delay, per worker, on top of the rate limiter
+                if not first_request and self.request_delay:
+                    time.sleep(self.request_delay)
+                first_request = False
+                
+                tenders, _ = self.fetch_page(page)
+                fetched[page] = tenders
+        
+        workers = min(self.fetch_concurrency, max(1, total_pages - 1))
+        if total_pages > 1:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                futures = [pool.submit(worker) for _ in range(workers)]
+                for future in futures:
+                    pages.update(future.result())
+        
+        all_tenders = self._merge_pages(pages)
+        
+        print(f"\n{'='*60}")
+        print(f"Finished! Total tenders collected: {len(all_tenders)}/{total_count}")
+        print(f"{'='*60}\n")
+        
+        return all_tenders
+    
+    def _total_pages(self, first_page, total_count, max_pages):
+        """
+        Exact number of pages to fetch, from page 1's totalCount
+        """
+        page_size = int(self.api_params.get('PageSize') or len(first_page)) or len(first_page)
+        return min(max_pages, max(1, math.ceil(total_count / page_size)))
+    
+    def _merge_pages(self, pages):
+        """
+        Merge {page_number: tenders} in page order, dropping duplicate tenderIdStrings
+        (tenders can shift between pages while the sweep is running)
+        """
+        all_tenders = []
+        seen_ids = set()
+        for page in sorted(pages):
+            for tender in pages[page]:
+                tender_id = tender.get('tenderIdString')
+                if tender_id:
+                    if tender_id in seen_ids:
+                        continue
+                    seen_ids.add(tender_id)
+                all_tenders.append(tender)
+        
+        empty_pages = [page for page in sorted(pages) if not pages[page]]
+        if empty_pages:
+            print(f"⚠ {len(empty_pages)} page(s) returned no tenders: {empty_pages[:10]}")
+        
+        return all_tenders
+    
+    def sync_tenders(self, max_pages=100):
+        """
+        Incremental delta sync of the listing (sorted by SubmitionDate DESC)
+        
+        The tender store knows every tenderIdString already seen (with a content
+        hash) and the newest submission date. Pages are fetched newest-first and
+        pagination stops as soon as a page is made entirely of known tenders.
+        Only new or changed records are written to the store.
+        
+        Returns:
+            The current listing (newest first): the tenders seen in this crawl plus
+            stored tenders still open for offers, capped to max_pages pages
+        """
+        fingerprints = self.store.fingerprints()
+        newest_date = self.store.get_meta('newest_submission_date') or ''
+        
+        # First sync: nothing known yet, do a full crawl (it fills the store)
+        if not fingerprints:
+            print("🔄 Tender store is empty - running a full crawl")
+            if not self.use_api:
+                return self._fetch_from_store()
+            tenders = self._fetch_from_api(max_pages)
+            self._save_to_store(tenders)
+            if tenders:
+                newest_date = max((t.get('submitionDate') or '' for t in tenders), default='')
+                self.store.set_meta('newest_submission_date', newest_date)
+                self.store.set_meta('last_sync', datetime.now().isoformat())
+                self.last_sync_stats = {'mode': 'full', 'pages': None, 'new': len(tenders), 'changed': 0}
+            return tenders
+        
+        print(f"\n🔄 Incremental sync ({len(fingerprints)} known tenders, newest: {newest_date or 'N/A'})")
+        
+        delta = []
+        seen_ids = set()
+        new_count = 0
+        pages_fetched = 0
+        seen_count = 0
+        
+        for page in range(1, max_pages + 1):
+            tenders, total_count = self.fetch_page(page)
+            pages_fetched += 1
+            seen_count += len(tenders)
+            
+            if not tenders:
+                if page == 1:
+                    print("⚠ Sync failed on page 1 - serving the local store")
+                    return self._fetch_from_store()
+                break
+            
+            page_all_known = True
+            for tender in tenders:
+                tender_id = tender.get('tenderIdString')
+                if not tender_id:
+                    continue
+                if tender_id not in fingerprints:
+                    page_all_known = False
+                    new_count += 1
+                    fingerprints[tender_id] = None
+                seen_ids.add(tender_id)
+                delta.append(tender)
+                newest_date = max(newest_date, tender.get('submitionDate') or '')
+            
+            if page_all_known:
+                print(f"✓ Page {page} contains only known tenders - stopping")
+                break
+            if seen_count >= total_count:
+                break
+            
+            if self.request_delay:
+                time.sleep(self.request_delay)
+        
+        # The store skips records whose content hash did not change
+        stored_new, stored_changed = self.store.upsert_many(delta)
+        self.store.set_meta('newest_submission_date', newest_date)
+        self.store.set_meta('last_sync', datetime.now().isoformat())
+        
+        self.last_sync_stats = {
+            'mode': 'incremental',
+            'pages': pages_fetched,
+            'new': stored_new,
+            'changed': stored_changed
+        }
+        
+        listing = self._current_listing(seen_ids, max_pages)
+        print(f"✓ Sync done: {pages_fetched} page(s), {stored_new} new, {stored_changed} changed, "
+              f"{len(listing)} tenders listed")
+        
+        return listing
+    
+    def _current_listing(self, seen_ids, max_pages):
+        """
+        Stored tenders that are still on the listing: the ones seen in this crawl and
+        the ones whose last offer date has not passed (pages the sync did not re-fetch),
+        newest first and capped to max_pages pages
+        """
+        now = datetime.now()
+        listing = [
+            tender for tender in self.store.all()
+            if tender.get('tenderIdString') in seen_ids
+            or self._is_open(tender.get('lastOfferPresentationDate'), now)
+        ]
+        page_size = int(self.api_params.get('PageSize') or 0)
+        if page_size:
+            listing = listing[:max_pages * page_size]
+        return listing
+    
+    @staticmethod
+    def _parse_date(date_str):
+        """Parse an Etimad date ("/Date(1728950400000)/" or ISO); None if it can't be read"""
+        if not date_str:
+            return None
+        try:
+            if '/Date(' in date_str:
+                timestamp = int(date_str.split('(')[1].split(')')[0]) / 1000
+                return datetime.fromtimestamp(timestamp)
+            return datetime.fromisoformat(date_str.replace('Z', ''))
+        except (ValueError, IndexError, OverflowError, OSError):
+            return None
+    
+    def _is_open(self, end_date_str, now):
+        """Whether a tender still accepts offers (unknown dates count as closed)"""
+        end_date = self._parse_date(end_date_str)
+        return end_date is not None and end_date >= now
+    
     def get_tender_classification(self, tender_id_str):
         """
         Get tender classification (التصنيف) from relations details endpoint
@@ -182,71 +541,12 @@ class TenderScraper:
             print(f"   URL: {url}")
             print(f"   Params: {params}")
             
-            response = requests.get(url, params=params, headers=self.headers, 
-                                  cookies=self.cookies, timeout=10)
+            response = self.http.get(url, params=params, headers=self.headers, timeout=10)
             
             print(f"   Status: {response.status_code}")
             
             if response.status_code == 200:
-                soup = BeautifulSoup(response.text, 'html.parser')
-                
-                # Find ALL "مجال التصنيف" sections (can be multiple)
-                classifications = []
-                bundles = []
-                
-                # Find all list items
-                all_items = soup.find_all('li', class_='list-group-item')
-                print(f"   Found {len(all_items)} list items")
-                
-                for item in all_items:
-                    title_div = item.find('div', class_='etd-item-title')
-                    info_div = item.find('div', class_='etd-item-info')
-                    
-                    if title_div and info_div:
-                        title = title_div.get_text(strip=True)
-                        value = info_div.get_text(strip=True)
-                        
-                        # Debug: print what we find
-                        if 'التصنيف' in title or 'الحزمة' in title:
-                            print(f"   📋 {title}: {value}")
-                        
-                        # Collect classification fields
-                        if 'مجال التصنيف' in title:
-                            if value and value not in classifications:
-                                classifications.append(value)
-                                print(f"   ✅ Added classification: {value}")
-                        
-                        # Collect bundle names
-                        elif 'الحزمة' in title:
-                            if value and value not in bundles:
-                                bundles.append(value)
-                                print(f"   ✅ Added bundle: {value}")
-                
-                # Build response
-                print(f"   📊 Total classifications found: {len(classifications)}")
-                print(f"   📦 Total bundles found: {len(bundles)}")
-                
-                if classifications:
-                    # Join all unique classifications
-                    classification_text = ', '.join(classifications)
-                    requires_classification = 'غير مطلوب' not in classification_text
-                    
-                    result = {
-                        'classification': classification_text,
-                        'requires_classification': requires_classification,
-                        'bundles': bundles if bundles else []
-                    }
-                    
-                    print(f"   ✅ Returning: {result}")
-                    return result
-                else:
-                    # No classification found - check if it says "غير مطلوب"
-                    print(f"   ⚠️  No classifications found")
-                    return {
-                        'classification': 'غير محدد',
-                        'requires_classification': False,
-                        'bundles': []
-                    }
+                return self._parse_classification_html(response.text)
             else:
                 print(f"Failed to fetch classification for {tender_id_str}: {response.status_code}")
                 return None
@@ -257,68 +557,140 @@ class TenderScraper:
             traceback.print_exc()
             return None
     
+    def iter_tender_classifications(self, tender_id_strs, concurrency=8, refresh=False):
+        """
+        Classifications for many tenders, yielded as they become available
+        
+        Stored classifications are yielded first (a published tender's
+        classification rarely changes), the rest are fetched by `concurrency`
+        workers and stored as they complete.
+        
+        Args:
+            tender_id_strs: tenderIdString values
+            concurrency: Number of classification requests in flight
+            refresh: Ignore stored classifications and fetch every tender again
+        
+        Yields:
+            (tender_id_str, classification dict or None, cached)
+        """
+        tender_id_strs = list(dict.fromkeys(tender_id_strs))
+        cached = {} if refresh else self.store.get_classifications(tender_id_strs)
+        
+        for tender_id_str in tender_id_strs:
+            if tender_id_str in cached:
+                yield tender_id_str, cached[tender_id_str], True
+        
+        missing = [tid for tid in tender_id_strs if tid not in cached]
+        if not missing:
+            return
+        
+        pool = ThreadPoolExecutor(max_workers=max(1, min(concurrency, len(missing))))
+        try:
+            futures = {pool.submit(self.get_tender_classification, tid): tid for tid in missing}
+            for future in as_completed(futures):
+                tender_id_str = futures[future]
+                classification_info = future.result()
+                if classification_info:
+                    self.store.save_classification(tender_id_str, classification_info)
+                yield tender_id_str, classification_info, False
+        finally:
+            # Consumer stopped early (e.g. client disconnected): drop the queued lookups
+            pool.shutdown(wait=False, cancel_futures=True)
+    
+    def _parse_classification_html(self, html):
+        """
+        Parse the GetRelationsDetailsViewComponenet HTML into classification info
+        (shared by the sync and async backends)
+        """
+        # Find ALL "مجال التصنيف" sections (can be multiple)
+        classifications = []
+        bundles = []
+        
+        # Title/info text of every list item (targeted extraction, see html_extract)
+        all_items = self.html_extractor.list_items(html)
+        print(f"   Found {len(all_items)} list items")
+        
+        for title, value in all_items:
+            # Debug: print what we find
+            if 'التصنيف' in title or 'الحزمة' in title:
+                print(f"   📋 {title}: {value}")
+            
+            # Collect classification fields
+            if 'مجال التصنيف' in title:
+                if value and value not in classifications:
+                    classifications.append(value)
+                    print(f"   ✅ Added classification: {value}")
+            
+            # Collect bundle names
+            elif 'الحزمة' in title:
+                if value and value not in bundles:
+                    bundles.append(value)
+                    print(f"   ✅ Added bundle: {value}")
+        
+        # Build response
+        print(f"   📊 Total classifications found: {len(classifications)}")
+        print(f"   📦 Total bundles found: {len(bundles)}")
+        
+        if classifications:
+            # Join all unique classifications
+            classification_text = ', '.join(classifications)
+            requires_classification = 'غير مطلوب' not in classification_text
+            
+            result = {
+                'classification': classification_text,
+                'requires_classification': requires_classification,
+                'bundles': bundles if bundles else []
+            }
+            
+            print(f"   ✅ Returning: {result}")
+            return result
+        else:
+            # No classification found - check if it says "غير مطلوب"
+            print(f"   ⚠️  No classifications found")
+            return {
+                'classification': 'غير محدد',
+                'requires_classification': False,
+                'bundles': []
+            }
+    
     def get_tender_details(self, tender_id, group_id):
         """
         Get detailed information about a specific tender
         """
-        # For now, read from local JSON file
-        try:
-            data_file = Path(__file__).parent.parent / 'data' / 'tender_info.json'
-            with open(data_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except FileNotFoundError:
-            return []
+        # For now, read from the local tender_info.json (loaded once, indexed by tender id)
+        return self.details_index.details(tender_id)
     
     def requires_classification(self, tender_id, group_id):
         """
         Check if tender requires تصنيف (classification)
         Returns True if classification is required, False otherwise
         
-        TODO: Need to identify the correct field/API that indicates classification requirement
-        For now, returning False to show all tenders
+        The flag is precomputed per tender when tender_info.json is indexed: an explicit
+        requiresClassification field, or a تصنيف criterion in tenderCriteria/childCriteria.
+        A classification stored by the enrichment stage also counts. Tenders with
+        neither are not filtered out.
         """
-        try:
-            tender_details = self.get_tender_details(tender_id, group_id)
-            
-            # Search for classification indicators in the tender details
-            for detail in tender_details:
-                # Check if there's a field indicating classification requirement
-                if 'requiresClassification' in detail:
-                    return detail['requiresClassification']
-                
-                # Check in criteria names
-                if 'tenderCriteria' in detail:
-                    for criteria in detail.get('tenderCriteria', []):
-                        criteria_name = criteria.get('name', '')
-                        if 'تصنيف' in criteria_name or 'classification' in criteria_name.lower():
-                            return True
-                        
-                        # Check child criteria recursively
-                        for child in criteria.get('childCriteria', []):
-                            child_name = child.get('name', '')
-                            if 'تصنيف' in child_name or 'classification' in child_name.lower():
-                                return True
-            
-            # For testing: return False to show all tenders
-            # Change this logic once we know where the classification flag is
-            return False
-        except Exception as e:
-            print(f"Error checking classification for {tender_id}: {e}")
-            return False
+        if self.details_index.requires_classification(tender_id):
+            return True
+        stored = self.store.get_classifications([tender_id]).get(tender_id)
+        return bool(stored and stored.get('requires_classification'))
     
     def filter_tenders(self, tenders):
         """
         Filter out tenders that require classification
         """
+        # One flag lookup per tender - the details file is not re-read per record.
+        # Classifications scraped by the enrichment stage are read once per call too.
+        classification_flags = self.details_index.flags()
+        scraped_flags = self.store.classification_flags()
         filtered = []
         
         for tender in tenders:
             # Extract tender IDs from the actual API structure
             tender_id = tender.get('tenderIdString', '')
-            group_id = tender.get('groupIdStr', '')  # May not exist in main list
             
             # Skip if requires classification
-            if not self.requires_classification(tender_id, group_id):
+            if not (classification_flags.get(tender_id, False) or scraped_flags.get(tender_id, False)):
                 filtered.append(self.format_tender_data(tender))
         
         return filtered
@@ -327,14 +699,19 @@ class TenderScraper:
         """
         Format tender data for display using actual API field names
         """
-        # Use the pre-calculated remaining time from API
-        remaining_days = tender.get('remainingDays', 0)
-        remaining_hours = tender.get('remainingHours', 0)
+        # Records may come from the local store, so compute the remaining time from the
+        # offer deadline instead of the remainingDays snapshot taken when it was fetched
+        remaining_time = self.calculate_remaining_time(tender.get('lastOfferPresentationDate'))
         
-        if remaining_days or remaining_hours:
-            remaining_time = f'{remaining_days} يوم و {remaining_hours} ساعة'
-        else:
-            remaining_time = 'منتهي'
+        if remaining_time == 'N/A':
+            # Use the pre-calculated remaining time from API
+            remaining_days = tender.get('remainingDays', 0)
+            remaining_hours = tender.get('remainingHours', 0)
+            
+            if remaining_days or remaining_hours:
+                remaining_time = f'{remaining_days} يوم و {remaining_hours} ساعة'
+            else:
+                remaining_time = 'منتهي'
         
         return {
             'tenderName': tender.get('tenderName', 'N/A'),
@@ -358,13 +735,9 @@ class TenderScraper:
             return 'N/A'
         
         try:
-            # Parse date (adjust format based on actual API response)
-            # Common formats: "2025-10-15T23:59:59" or "/Date(1728950400000)/"
-            if '/Date(' in end_date_str:
-                timestamp = int(end_date_str.split('(')[1].split(')')[0]) / 1000
-                end_date = datetime.fromtimestamp(timestamp)
-            else:
-                end_date = datetime.fromisoformat(end_date_str.replace('Z', ''))
+            end_date = self._parse_date(end_date_str)
+            if end_date is None:
+                return 'N/A'
             
             now = datetime.now()
             delta = end_date - now
@@ -382,34 +755,36 @@ class TenderScraper:
     def download_tender_documents(self, tender_id, tender_name='', reference_number=''):
         """
         Download tender documents (كراسة، جدول الكميات، المرفقات)
-        1. Fetch attachments from GetAttachmentsViewComponenet API
-        2. Parse the HTML response to extract download links
-        3. Download each file to the tender folder
         
         Args:
             tender_id: The tender ID string
             tender_name: Optional tender name for folder naming
             reference_number: Optional reference number for folder naming
+        
+        Returns:
+            Path of the tender download folder
+        """
+        downloads_folder, _ = self.download_tender_attachments(tender_id, tender_name, reference_number)
+        return downloads_folder
+    
+    def download_tender_attachments(self, tender_id, tender_name='', reference_number='', progress=None):
         """
-        import re
-        from urllib.parse import urljoin, unquote
-        from bs4 import BeautifulSoup
+        Download tender documents and report how each file went
+        1. Fetch attachments from GetAttachmentsViewComponenet API
+        2. Parse the HTML response to extract download links
+        3. Download the files concurrently (`download_concurrency` at a time, through
+           the shared connection pool); a failed file does not stop the others
         
-        print(f"\n📥 Downloading documents for tender: {tender_id}")
+        Args:
+            progress: Optional list; the per-file result dicts are appended to it once the
+                      links are known and updated in place while the files download
         
-        # Create folder name with tender name and reference number if provided
-        if tender_name and reference_number:
-            # Clean the tender name to be filesystem-safe
-            safe_name = "".join(c if c.isalnum() or c in (' ', '-', '_', 'ا', 'ب', 'ت', 'ث', 'ج', 'ح', 'خ', 'د', 'ذ', 'ر', 'ز', 'س', 'ش', 'ص', 'ض', 'ط', 'ظ', 'ع', 'غ', 'ف', 'ق', 'ك', 'ل', 'م', 'ن', 'ه', 'و', 'ي', 'ى', 'أ', 'إ', 'آ', 'ة', 'ئ', 'ء', 'ؤ') else '_' for c in tender_name)
-            safe_name = safe_name.strip()[:100]  # Limit length to 100 chars
-            folder_name = f"{safe_name}_{reference_number}"
-        else:
-            folder_name = tender_id
+        Returns:
+            (downloads_folder, report) - see _download_report
+        """
+        print(f"\n📥 Downloading documents for tender: {tender_id}")
         
-        # Create downloads folder if it doesn't exist
-        root_dir = Path(__file__).parent.parent
-        downloads_folder = os.path.join(str(root_dir), 'downloads', folder_name)
-        os.makedirs(downloads_folder, exist_ok=True)
+        downloads_folder = self._tender_folder(tender_id, tender_name, reference_number)
         print(f"📁 Created folder: {downloads_folder}")
         
         try:
@@ -420,10 +795,9 @@ class TenderScraper:
             print(f"🌐 Fetching attachments from: {attachments_url}")
             print(f"   Parameters: {params}")
             
-            response = requests.get(
+            response = self.http.get(
                 attachments_url,
                 params=params,
-                cookies=self.cookies,
                 headers=self.headers,
                 timeout=30
             )
@@ -434,133 +808,361 @@ class TenderScraper:
             print(f"✅ Received attachments page ({len(response.text)} chars)")
             
             # Parse HTML to extract download links
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            download_links = []
-            
-            # 1. Find the main conditions booklet form (كراسة الشروط والمواصفات)
-            from urllib.parse import quote
-            form = soup.find('form', action='PrintConditionsTemplateRfp')
-            if form:
-                tender_id_input = form.find('input', {'name': 'STenderId'})
-                if tender_id_input:
-                    tender_id_value = tender_id_input.get('value', '')
-                    # URL encode the tender ID for the query parameter
-                    encoded_id = quote(tender_id_value)
-                    download_links.append({
-                        'url': f'/Tender/PrintConditionsTemplateRfp?STenderId={encoded_id}',
-                        'text': 'كراسة_الشروط_والمواصفات.pdf',
-                        'type': 'form',
-                        'post_data': {'STenderId': tender_id_value}  # Keep original for POST
-                    })
-            
-            # 2. Find all supporting files with onclick="RedirectURL(...)"
-            for link in soup.find_all('a', onclick=True):
-                onclick = link.get('onclick', '')
-                # Extract fileId and fileName from: RedirectURL('idd_XXX','filename.pdf')
-                match = re.search(r"RedirectURL\('([^']+)','([^']+)'\)", onclick)
-                if match:
-                    file_id = match.group(1)
-                    file_name = match.group(2)
-                    download_links.append({
-                        'url': f'/Upload/getfile/{file_id}:{file_name}',
-                        'text': file_name,
-                        'type': 'redirect'
-                    })
-            
-            print(f"🔗 Found {len(download_links)} potential download links")
-            
-            if not download_links:
-                print("⚠️  No download links found in attachments page")
-                # Save the HTML for debugging
-                debug_path = os.path.join(downloads_folder, 'attachments_page_debug.html')
-                with open(debug_path, 'w', encoding='utf-8') as f:
-                    f.write(response.text)
-                print(f"   Saved debug HTML to: {debug_path}")
-            
-            # Download each file
-            downloaded_files = []
-            for idx, link_info in enumerate(download_links, 1):
+            download_links = self._parse_attachment_links(response.text, downloads_folder)
+            
+            start = time.time()
+            claim_filename = self._filename_claimer()
+            manifest = AttachmentManifest(downloads_folder)
+            total = len(download_links)
+            results = [self._new_file_result(link_info) for link_info in download_links]
+            if progress is not None:
+                progress.extend(results)
+            
+            if download_links:
+                workers = min(self.download_concurrency, total)
                 try:
-                    file_url = link_info['url']
-                    file_text = link_info['text']
-                    link_type = link_info.get('type', 'unknown')
-                    
-                    # Make URL absolute if it's relative
-                    if not file_url.startswith('http'):
-                        file_url = self.base_url + file_url
-                    
-                    print(f"\n📄 [{idx}/{len(download_links)}] Downloading: {file_text}")
-                    print(f"   URL: {file_url}")
-                    
-                    # For form submissions, use POST
-                    if link_type == 'form':
-                        post_data = link_info.get('post_data', {})
-                        file_response = requests.post(
-                            file_url.split('?')[0] if '?' in file_url else file_url,  # Remove query string for POST
-                            data=post_data,
-                            cookies=self.cookies,
-                            headers=self.headers,
-                            timeout=60,
-                            stream=True
-                        )
-                    else:
-                        # For direct links, use GET
-                        file_response = requests.get(
-                            file_url,
-                            cookies=self.cookies,
-                            headers=self.headers,
-                            timeout=60,
-                            stream=True
-                        )
-                    
-                    if file_response.status_code != 200:
-                        print(f"   ❌ Failed: Status {file_response.status_code}")
-                        continue
-                    
-                    # Use the filename from link_info (already extracted from HTML)
-                    filename = file_text
-                    
-                    # If filename doesn't have extension, try to get from Content-Disposition
-                    if '.' not in filename:
-                        if 'content-disposition' in file_response.headers:
-                            cd = file_response.headers['content-disposition']
-                            filenames = re.findall(r'filename[*]?=([^;]+)', cd)
-                            if filenames:
-                                extracted = filenames[0].strip('"\'')
-                                if '.' in extracted:
-                                    filename = extracted
-                        
-                        # If still no extension, guess from content-type
-                        if '.' not in filename:
-                            content_type = file_response.headers.get('content-type', '')
-                            ext = '.pdf' if 'pdf' in content_type else \
-                                  '.doc' if 'word' in content_type else \
-                                  '.xls' if 'excel' in content_type else '.pdf'
-                            filename = filename + ext
-                    
-                    # Save the file
-                    file_path = os.path.join(downloads_folder, filename)
-                    
-                    # Write file in chunks
-                    with open(file_path, 'wb') as f:
-                        for chunk in file_response.iter_content(chunk_size=8192):
-                            f.write(chunk)
-                    
-                    file_size = os.path.getsize(file_path)
-                    print(f"   ✅ Saved: {filename} ({file_size:,} bytes)")
-                    downloaded_files.append(filename)
-                    
-                except Exception as e:
-                    print(f"   ❌ Error downloading file: {e}")
-                    continue
+                    with ThreadPoolExecutor(max_workers=workers) as pool:
+                        list(pool.map(
+                            lambda idx: self._download_attachment(download_links[idx], downloads_folder, idx + 1,
+                                                                  total, claim_filename, results[idx], manifest),
+                            range(total)
+                        ))
+                finally:
+                    manifest.save()
             
-            print(f"\n✅ Download complete! {len(downloaded_files)} files saved to: {downloads_folder}")
-            return downloads_folder
+            report = self._download_report(results, time.time() - start)
+            print(f"\n✅ Download complete! {report['downloaded']} files saved to: {downloads_folder}")
+            return downloads_folder, report
             
         except Exception as e:
             print(f"❌ Error in download_tender_documents: {e}")
             import traceback
             traceback.print_exc()
             raise Exception(f"فشل تحميل المستندات: {str(e)}")
+    
+    @staticmethod
+    def _new_file_result(link_info):
+        """Per-file result: status goes pending -> downloading -> ok / failed"""
+        return {'file': link_info['text'], 'filename': None, 'status': 'pending', 'bytes': 0, 'seconds': 0.0,
+                'sha256': None, 'deduplicated': False, 'unchanged': False, 'error': None}
+    
+    def _download_attachment(self, link_info, downloads_folder, idx, total, claim_filename, result=None,
+                             manifest=None):
+        """
+        Download one attachment, filling in `result` (see _new_file_result)
+        
+        Returns:
+            {'file', 'filename', 'status' ('ok' or 'failed'), 'bytes', 'seconds', 'error'}
+        """
+        file_url = link_info['url']
+        file_text = link_info['text']
+        if result is None:
+            result = self._new_file_result(link_info)
+        result['status'] = 'downloading'
+        start = time.time()
+        
+        # Make URL absolute if it's relative
+        if not file_url.startswith('http'):
+            file_url = self.base_url + file_url
+        
+        print(f"\n📄 [{idx}/{total}] Downloading: {file_text}")
+        print(f"   URL: {file_url}")
+        
+        try:
+            with (self.download_limits.slot(file_url) if self.download_limits else nullcontext()):
+                self._fetch_attachment(link_info, file_url, downloads_folder, claim_filename, result, manifest)
+            if result['unchanged']:
+                print(f"   ⏭️  [{idx}/{total}] Unchanged: {result['filename']}")
+            elif result['status'] == 'ok':
+                print(f"   ✅ [{idx}/{total}] Saved: {result['filename']} ({result['bytes']:,} bytes)")
+            else:
+                print(f"   ❌ [{idx}/{total}] Failed: {result['error']}")
+        except Exception as e:
+            print(f"   ❌ [{idx}/{total}] Error downloading file: {e}")
+            result['status'] = 'failed'
+            result['error'] = str(e)
+        finally:
+            result['seconds'] = round(time.time() - start, 2)
+        
+        return result
+    
+    def _fetch_attachment(self, link_info, file_url, downloads_folder, claim_filename, result, manifest=None):
+        """
+        Stream the attachment into "<name>.part", resuming with a Range request after a
+        dropped connection (or on a later run), and rename it to the final name only once
+        its size matches what the server announced
+        
+        A file already recorded in the folder manifest is requested conditionally
+        (If-None-Match / If-Modified-Since) and kept as is on 304 Not Modified.
+        """
+        name = claim_filename(link_info['text'])
+        part_path = os.path.join(downloads_folder, name + PART_SUFFIX)
+        previous = manifest.current(name) if manifest is not None else None
+        
+        for attempt in range(1, DOWNLOAD_ATTEMPTS + 1):
+            offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+            conditional = conditional_headers(previous) if not offset else {}
+            try:
+                response_headers = self._transfer_attachment(link_info, file_url, part_path, offset, result,
+                                                             conditional)
+                break
+            except (requests.exceptions.ConnectionError, requests.exceptions.ChunkedEncodingError,
+                    requests.exceptions.Timeout, IncompleteDownloadError) as e:
+                if attempt == DOWNLOAD_ATTEMPTS:
+                    raise
+                print(f"   ⚠️  Transfer interrupted at {result['bytes']:,} bytes ({e}), "
+                      f"resuming ({attempt}/{DOWNLOAD_ATTEMPTS - 1})")
+        
+        if response_headers is None:
+            return
+        if result['unchanged']:
+            result.update(filename=previous['filename'], status='ok', bytes=previous['size'],
+                          sha256=previous['sha256'])
+            return
+        
+        filename = self._resolve_filename(name, response_headers)
+        self._store_attachment(part_path, os.path.join(downloads_folder, filename), result)
+        result.update(filename=filename, status='ok')
+        if manifest is not None:
+            manifest.record(name, filename, file_url, result['sha256'], response_headers)
+    
+    def _store_attachment(self, part_path, file_path, result):
+        """
+        Give a complete .part file its final name: through the blob store when one is
+        configured (identical files across tenders are kept once), else a plain rename
+        """
+        if self.blob_store is not None:
+            result['deduplicated'] = self.blob_store.ingest(part_path, result['sha256'], file_path)
+        else:
+            os.replace(part_path, file_path)
+        result['bytes'] = os.path.getsize(file_path)
+    
+    def _transfer_attachment(self, link_info, file_url, part_path, offset, result, conditional=None):
+        """
+        One request for the attachment, appending to the .part file from `offset`
+        
+        Returns:
+            Response headers once the .part file is complete (or the server answered 304
+            to the `conditional` headers, flagged in result['unchanged']), or None on an
+            HTTP error (recorded in `result`)
+        """
+        request_headers = {**self.headers, **(conditional or {})}
+        if offset:
+            request_headers['Range'] = f'bytes={offset}-'
+        
+        # For form submissions, use POST
+        if link_info.get('type') == 'form':
+            post_data = link_info.get('post_data', {})
+            file_response = self.http.post(
+                file_url.split('?')[0] if '?' in file_url else file_url,  # Remove query string for POST
+                data=post_data,
+                headers=request_headers,
+                timeout=60,
+                stream=True
+            )
+        else:
+            # For direct links, use GET
+            file_response = self.http.get(
+                file_url,
+                headers=request_headers,
+                timeout=60,
+                stream=True
+            )
+        
+        with file_response:
+            if file_response.status_code == 304 and conditional:
+                result['unchanged'] = True
+                return file_response.headers
+            
+            if file_response.status_code == 416 and offset:
+                # Nothing left to send: the .part file is either already whole or stale
+                _, total = self._resume_position(416, file_response.headers, offset)
+                if total == offset:
+                    result.update(bytes=offset, sha256=file_sha256(part_path).hexdigest())
+                    return file_response.headers
+                os.remove(part_path)
+                raise IncompleteDownloadError('stale partial file discarded')
+            
+            if file_response.status_code not in (200, 206):
+                result.update(status='failed', error=f"HTTP {file_response.status_code}")
+                return None
+            
+            start, total = self._resume_position(file_response.status_code, file_response.headers, offset)
+            if start is None:
+                os.remove(part_path)
+                raise IncompleteDownloadError('server returned a different range')
+            if offset and not start:
+                print("   ↩️  Server ignored the Range request, downloading from the start")
+            
+            # Write file in chunks, hashing as we go (resumed files re-hash the bytes already on disk)
+            hasher = file_sha256(part_path, limit=start) if start else hashlib.sha256()
+            result['bytes'] = start
+            with open(part_path, 'ab' if start else 'wb') as f:
+                for chunk in file_response.iter_content(chunk_size=8192):
+                    f.write(chunk)
+                    hasher.update(chunk)
+                    result['bytes'] += len(chunk)
+            
+            if total is not None and result['bytes'] != total:
+                raise IncompleteDownloadError(f"received {result['bytes']:,} of {total:,} bytes")
+            result['sha256'] = hasher.hexdigest()
+            return file_response.headers
+    
+    @staticmethod
+    def _resume_position(status_code, headers, offset):
+        """
+        Where a (possibly ranged) response body starts in the file, and the full file size
+        
+        Returns:
+            (start, total): start is `offset` for a matching 206 and 0 for a full response
+            (None if the 206 covers some other range); total is None when the server did
+            not announce a usable size (no Content-Length, or a compressed body)
+        """
+        if status_code in (206, 416):
+            match = CONTENT_RANGE_RE.match(headers.get('content-range', ''))
+            total = int(match.group(2)) if match and match.group(2) != '*' else None
+            if status_code == 416:
+                return None, total
+            if match is None or match.group(1) is None or int(match.group(1)) != offset:
+                return None, None
+            return offset, total
+        
+        if headers.get('content-encoding', 'identity').lower() != 'identity':
+            return 0, None  # iter_content decompresses, so sizes can't be compared
+        length = headers.get('content-length', '')
+        return 0, int(length) if length.isdigit() else None
+    
+    def _filename_claimer(self):
+        """
+        Returns a thread-safe function that makes file names unique within one tender
+        download, so two attachments with the same name never write to the same file
+        """
+        claimed = set()
+        lock = threading.Lock()
+        
+        def claim(filename):
+            with lock:
+                stem, ext = os.path.splitext(filename)
+                candidate, n = filename, 2
+                while candidate in claimed:
+                    candidate = f"{stem} ({n}){ext}"
+                    n += 1
+                claimed.add(candidate)
+                return candidate
+        
+        return claim
+    
+    def _download_report(self, results, elapsed):
+        """
+        Per-file results plus totals for one tender download
+        
+        Returns:
+            {'files', 'downloaded', 'failed', 'deduplicated', 'unchanged', 'bytes', 'seconds', 'throughput_bps'}
+        """
+        total_bytes = sum(r['bytes'] for r in results if not r.get('unchanged'))
+        report = {
+            'files': results,
+            'downloaded': sum(1 for r in results if r['status'] == 'ok'),
+            'failed': sum(1 for r in results if r['status'] != 'ok'),
+            'deduplicated': sum(1 for r in results if r.get('deduplicated')),
+            'unchanged': sum(1 for r in results if r.get('unchanged')),
+            'bytes': total_bytes,
+            'seconds': round(elapsed, 2),
+            'throughput_bps': round(total_bytes / elapsed) if elapsed > 0 else 0,
+        }
+        print(f"📊 {report['downloaded']}/{len(results)} files, {total_bytes / 1024 / 1024:.1f} MB "
+              f"in {report['seconds']}s ({report['throughput_bps'] / 1024 / 1024:.2f} MB/s)")
+        return report
+    
+    def _tender_folder(self, tender_id, tender_name='', reference_number=''):
+        """
+        Create (if needed) and return the downloads/<name>_<ref> folder for a tender
+        """
+        # Create folder name with tender name and reference number if provided
+        if tender_name and reference_number:
+            # Clean the tender name to be filesystem-safe
+            safe_name = "".join(c if c.isalnum() or c in (' ', '-', '_', 'ا', 'ب', 'ت', 'ث', 'ج', 'ح', 'خ', 'د', 'ذ', 'ر', 'ز', 'س', 'ش', 'ص', 'ض', 'ط', 'ظ', 'ع', 'غ', 'ف', 'ق', 'ك', 'ل', 'م', 'ن', 'ه', 'و', 'ي', 'ى', 'أ', 'إ', 'آ', 'ة', 'ئ', 'ء', 'ؤ') else '_' for c in tender_name)
+            safe_name = safe_name.strip()[:100]  # Limit length to 100 chars
+            folder_name = f"{safe_name}_{reference_number}"
+        else:
+            folder_name = tender_id
+        
+        # Create downloads folder if it doesn't exist
+        root_dir = Path(__file__).parent.parent
+        downloads_folder = os.path.join(str(root_dir), 'downloads', folder_name)
+        os.makedirs(downloads_folder, exist_ok=True)
+        return downloads_folder
+    
+    def _parse_attachment_links(self, html, downloads_folder=None):
+        """
+        Extract download links from the GetAttachmentsViewComponenet HTML
+        (shared by the sync and async backends)
+        
+        Returns:
+            List of {'url', 'text', 'type'[, 'post_data']} dicts
+        """
+        from urllib.parse import quote
+        
+        download_links = []
+        
+        # 1. Find the main conditions booklet form (كراسة الشروط والمواصفات)
+        tender_id_value = self.html_extractor.rfp_tender_id(html)
+        if tender_id_value is not None:
+            # URL encode the tender ID for the query parameter
+            encoded_id = quote(tender_id_value)
+            download_links.append({
+                'url': f'/Tender/PrintConditionsTemplateRfp?STenderId={encoded_id}',
+                'text': 'كراسة_الشروط_والمواصفات.pdf',
+                'type': 'form',
+                'post_data': {'STenderId': tender_id_value}  # Keep original for POST
+            })
+        
+        # 2. Find all supporting files with onclick="RedirectURL(...)" (regex fast path, no parse)
+        for file_id, file_name in self.html_extractor.redirect_links(html):
+            download_links.append({
+                'url': f'/Upload/getfile/{file_id}:{file_name}',
+                'text': file_name,
+                'type': 'redirect'
+            })
+        
+        print(f"🔗 Found {len(download_links)} potential download links")
+        
+        if not download_links:
+            print("⚠️  No download links found in attachments page")
+        if not download_links and downloads_folder and ATTACHMENT_DEBUG_HTML:
+            # Save the HTML for debugging
+            debug_path = os.path.join(downloads_folder, 'attachments_page_debug.html')
+            with open(debug_path, 'w', encoding='utf-8') as f:
+                f.write(html)
+            print(f"   Saved debug HTML to: {debug_path}")
+        
+        return download_links
+    
+    def _resolve_filename(self, file_text, response_headers):
+        """
+        Final file name for an attachment: the name from the HTML, completed with an
+        extension from Content-Disposition or Content-Type when missing
+        """
+        # Use the filename from link_info (already extracted from HTML)
+        filename = file_text
+        
+        # If filename doesn't have extension, try to get from Content-Disposition
+        if '.' not in filename:
+            cd = response_headers.get('content-disposition')
+            if cd:
+                filenames = re.findall(r'filename[*]?=([^;]+)', cd)
+                if filenames:
+                    extracted = filenames[0].strip('"\'')
+                    if '.' in extracted:
+                        filename = extracted
+            
+            # If still no extension, guess from content-type
+            if '.' not in filename:
+                content_type = response_headers.get('content-type', '')
+                ext = '.pdf' if 'pdf' in content_type else \
+                      '.doc' if 'word' in content_type else \
+                      '.xls' if 'excel' in content_type else '.pdf'
+                filename = filename + ext
+        
+        return filename
 
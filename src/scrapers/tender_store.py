@@ -0,0 +1,233 @@
+"""
+Tender Store
+SQLite (WAL) store for tender listing records, upserted by tenderIdString,
+and for the classification (التصنيف) scraped for each tender
+"""
+import hashlib
+import json
+import sqlite3
+import threading
+import zlib
+from datetime import datetime
+from pathlib import Path
+
+# Listing fields that change on every request without the tender changing
+VOLATILE_TENDER_FIELDS = (
+    'currentDate', 'currentDateTime', 'currentTime',
+    'remainingDays', 'remainingHours', 'remainingMins',
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tenders (
+    tender_id_string TEXT PRIMARY KEY,
+    reference_number TEXT,
+    agency_code TEXT,
+    last_offer_presentation_date TEXT,
+    tender_type_id INTEGER,
+    submition_date TEXT,
+    fingerprint TEXT NOT NULL,
+    raw BLOB NOT NULL,
+    updated_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_tenders_reference_number ON tenders(reference_number);
+CREATE INDEX IF NOT EXISTS idx_tenders_agency_code ON tenders(agency_code);
+CREATE INDEX IF NOT EXISTS idx_tenders_last_offer_date ON tenders(last_offer_presentation_date);
+CREATE INDEX IF NOT EXISTS idx_tenders_tender_type_id ON tenders(tender_type_id);
+CREATE INDEX IF NOT EXISTS idx_tenders_submition_date ON tenders(submition_date);
+
+CREATE TABLE IF NOT EXISTS classifications (
+    tender_id_string TEXT PRIMARY KEY,
+    requires_classification INTEGER NOT NULL,
+    data TEXT NOT NULL,
+    fetched_at TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+def tender_fingerprint(tender):
+    """Hash of a listing record, ignoring fields that change on every request"""
+    stable = {k: v for k, v in tender.items() if k not in VOLATILE_TENDER_FIELDS}
+    payload = json.dumps(stable, sort_keys=True, ensure_ascii=False)
+    return hashlib.md5(payload.encode('utf-8')).hexdigest()
+
+
+def _pack(tender):
+    return zlib.compress(json.dumps(tender, ensure_ascii=False).encode('utf-8'))
+
+
+def _unpack(blob):
+    return json.loads(zlib.decompress(blob).decode('utf-8'))
+
+
+class TenderStore:
+    """Persistent, indexed local copy of the Etimad tender listing"""
+
+    def __init__(self, db_path):
+        """
+        Args:
+            db_path: Path of the SQLite database file
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+
+        conn = self._connect()
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.executescript(SCHEMA)
+        conn.commit()
+
+    def _connect(self):
+        """One connection per thread"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.db_path), timeout=30)
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def upsert_many(self, tenders):
+        """
+        Insert new tenders and update changed ones (unchanged records are not rewritten)
+
+        Returns:
+            (new_count, changed_count)
+        """
+        known = self.fingerprints()
+        now = datetime.now().isoformat()
+        rows = []
+        new_count = changed_count = 0
+
+        for tender in tenders:
+            tender_id = tender.get('tenderIdString')
+            if not tender_id:
+                continue
+            fingerprint = tender_fingerprint(tender)
+            if tender_id not in known:
+                new_count += 1
+            elif known[tender_id] != fingerprint:
+                changed_count += 1
+            else:
+                continue
+            known[tender_id] = fingerprint
+            rows.append((
+                tender_id,
+                tender.get('referenceNumber'),
+                tender.get('agencyCode'),
+                tender.get('lastOfferPresentationDate'),
+                tender.get('tenderTypeId'),
+                tender.get('submitionDate'),
+                fingerprint,
+                _pack(tender),
+                now,
+            ))
+
+        if rows:
+            with self._write_lock:
+                conn = self._connect()
+                conn.executemany("""
+                    INSERT INTO tenders (tender_id_string, reference_number, agency_code,
+                                         last_offer_presentation_date, tender_type_id,
+                                         submition_date, fingerprint, raw, updated_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT(tender_id_string) DO UPDATE SET
+                        reference_number = excluded.reference_number,
+                        agency_code = excluded.agency_code,
+                        last_offer_presentation_date = excluded.last_offer_presentation_date,
+                        tender_type_id = excluded.tender_type_id,
+                        submition_date = excluded.submition_date,
+                        fingerprint = excluded.fingerprint,
+                        raw = excluded.raw,
+                        updated_at = excluded.updated_at
+                """, rows)
+                conn.commit()
+
+        return new_count, changed_count
+
+    def fingerprints(self):
+        """{tenderIdString: fingerprint} for every stored tender"""
+        rows = self._connect().execute('SELECT tender_id_string, fingerprint FROM tenders')
+        return dict(rows.fetchall())
+
+    def count(self):
+        return self._connect().execute('SELECT COUNT(*) FROM tenders').fetchone()[0]
+
+    def all(self):
+        """All stored tenders, newest submission first"""
+        rows = self._connect().execute('SELECT raw FROM tenders ORDER BY submition_date DESC')
+        return [_unpack(raw) for (raw,) in rows]
+
+    def get(self, tender_id_string):
+        row = self._connect().execute(
+            'SELECT raw FROM tenders WHERE tender_id_string = ?', (tender_id_string,)
+        ).fetchone()
+        return _unpack(row[0]) if row else None
+
+    def find_by_reference(self, reference_number):
+        rows = self._connect().execute(
+            'SELECT raw FROM tenders WHERE reference_number = ?', (reference_number,)
+        )
+        return [_unpack(raw) for (raw,) in rows]
+
+    def get_classifications(self, tender_id_strings):
+        """{tenderIdString: classification info} for the ids that have a stored classification"""
+        ids = list(tender_id_strings)
+        found = {}
+        conn = self._connect()
+        # Stay well under SQLite's bound-parameter limit
+        for start in range(0, len(ids), 500):
+            chunk = ids[start:start + 500]
+            rows = conn.execute(
+                f"SELECT tender_id_string, data FROM classifications "
+                f"WHERE tender_id_string IN ({','.join('?' * len(chunk))})", chunk
+            )
+            for tender_id, data in rows:
+                found[tender_id] = json.loads(data)
+        return found
+
+    def classification_flags(self):
+        """{tenderIdString: requires classification} for every stored classification"""
+        rows = self._connect().execute(
+            'SELECT tender_id_string, requires_classification FROM classifications'
+        )
+        return {tender_id: bool(flag) for tender_id, flag in rows}
+
+    def save_classification(self, tender_id_string, classification_info):
+        """Store the classification scraped for one tender (replaces any previous one)"""
+        with self._write_lock:
+            conn = self._connect()
+            conn.execute(
+                'INSERT OR REPLACE INTO classifications '
+                '(tender_id_string, requires_classification, data, fetched_at) VALUES (?, ?, ?, ?)',
+                (tender_id_string, int(bool(classification_info.get('requires_classification'))),
+                 json.dumps(classification_info, ensure_ascii=False), datetime.now().isoformat())
+            )
+            conn.commit()
+
+    def get_meta(self, key, default=None):
+        row = self._connect().execute('SELECT value FROM meta WHERE key = ?', (key,)).fetchone()
+        return row[0] if row else default
+
+    def set_meta(self, key, value):
+        with self._write_lock:
+            conn = self._connect()
+            conn.execute('INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)', (key, value))
+            conn.commit()
+
+    def import_json(self, json_path):
+        """
+        Seed the store from an Etimad listing dump ({"data": [...]})
+
+        Returns:
+            Number of tenders imported
+        """
+        with open(json_path, 'r', encoding='utf-8') as f:
+            tenders = json.load(f).get('data', [])
+        new_count, changed_count = self.upsert_many(tenders)
+        return new_count + changed_count
@@ -57,7 +57,13 @@ document.addEventListener('DOMContentLoaded', function() {
                 const status = data.status;
                 const lastPing = data.last_ping;
                 
-                if (status === 'active') {
+                if (data.circuit ? data.circuit.state !== 'closed' : status === 'circuit_open') {
+                    keepAliveStatus.textContent = '⛔ اعتماد غير متاح - عرض آخر نسخة محفوظة';
+                    keepAliveStatus.style.background = '#ef4444';
+                    keepAliveStatus.title = data.circuit
+                        ? `آخر خطأ: ${data.circuit.last_failure}\nيتم إعادة المحاولة تلقائياً كل ${data.circuit.reset_timeout} ثانية`
+                        : '';
+                } else if (status === 'active') {
                     keepAliveStatus.textContent = `🔄 نشط - آخر تحديث: ${lastPing ? new Date(lastPing).toLocaleTimeString('ar-SA') : 'الآن'}`;
                     keepAliveStatus.style.background = '#10b981';
                     keepAliveStatus.title = `الجلسة نشطة - يتم التحديث كل دقيقة\nعدد الكوكيز: ${data.cookies_count}`;
@@ -186,6 +192,52 @@ document.addEventListener('DOMContentLoaded', function() {
         });
     }
 
+    // Listing paging: only the rows on screen are requested from /api/tenders
+    const TENDERS_PAGE_SIZE = 50;
+    const TENDER_CARD_FIELDS = 'tenderId,tenderIdString,tenderName,agencyName,remainingTime,referenceNumber,tenderType,documentPrice';
+    let tenderListState = { maxPages: 100, page: 0, pageSize: TENDERS_PAGE_SIZE, total: 0, countPrefix: '' };
+
+    function tendersPageUrl(maxPages, page, pageSize) {
+        return `/api/tenders?max_pages=${maxPages}&page=${page}&page_size=${pageSize}&fields=${TENDER_CARD_FIELDS}`;
+    }
+
+    function updateLoadMoreButton() {
+        let loadMoreBtn = document.getElementById('loadMoreTendersBtn');
+        if (!loadMoreBtn) {
+            loadMoreBtn = document.createElement('button');
+            loadMoreBtn.id = 'loadMoreTendersBtn';
+            loadMoreBtn.className = 'btn-primary btn-load-more';
+            loadMoreBtn.addEventListener('click', loadMoreTenders);
+            tendersContainer.after(loadMoreBtn);
+        }
+        const shown = tenderListState.page * tenderListState.pageSize;
+        const remaining = tenderListState.total - shown;
+        loadMoreBtn.style.display = remaining > 0 ? 'block' : 'none';
+        loadMoreBtn.textContent = `عرض المزيد (${remaining} متبقية)`;
+    }
+
+    async function loadMoreTenders() {
+        const loadMoreBtn = document.getElementById('loadMoreTendersBtn');
+        loadMoreBtn.disabled = true;
+        try {
+            const nextPage = tenderListState.page + 1;
+            const response = await fetch(tendersPageUrl(tenderListState.maxPages, nextPage, tenderListState.pageSize));
+            const data = await response.json();
+            if (!data.success) {
+                throw new Error(data.error);
+            }
+            data.tenders.forEach(tender => tendersContainer.appendChild(createTenderCard(tender)));
+            tenderListState.page = nextPage;
+            tenderListState.total = data.total;
+            tenderCount.textContent = `${tenderListState.countPrefix}${data.total}` + formatCacheStatus(data.cache);
+        } catch (error) {
+            showError('فشل تحميل المزيد من المنافسات: ' + error.message);
+        } finally {
+            loadMoreBtn.disabled = false;
+            updateLoadMoreButton();
+        }
+    }
+
     async function fetchTenders(quickMode = false) {
         // Show loading
         loading.style.display = 'block';
@@ -195,21 +247,33 @@ document.addEventListener('DOMContentLoaded', function() {
         loading.querySelector('p').textContent = loadingMsg;
         errorDiv.style.display = 'none';
         tendersContainer.innerHTML = '';
+        tenderListState.total = 0;
+        updateLoadMoreButton();
         fetchBtn.disabled = true;
         if (fetchQuickBtn) fetchQuickBtn.disabled = true;
         if (checkClassificationBtn) checkClassificationBtn.style.display = 'none';
 
         try {
             const maxPages = quickMode ? 1 : 100;
-            const response = await fetch(`/api/tenders?max_pages=${maxPages}`);
+            const pageSize = quickMode ? 10 : TENDERS_PAGE_SIZE;
+            const response = await fetch(tendersPageUrl(maxPages, 1, pageSize));
             const data = await response.json();
 
             if (data.success) {
                 displayTenders(data.tenders);
                 const countMsg = quickMode 
-                    ? `⚡ عرض سريع: ${data.count} منافسة`
-                    : `عدد المنافسات: ${data.count}`;
-                tenderCount.textContent = countMsg;
+                    ? `⚡ عرض سريع: ${data.count} من ${data.total} منافسة`
+                    : `عدد المنافسات: ${data.total}`;
+                tenderCount.textContent = countMsg + formatCacheStatus(data.cache);
+                // Quick mode lists the first portal page; its remaining rows page in on demand
+                tenderListState = {
+                    maxPages: maxPages,
+                    page: 1,
+                    pageSize: pageSize,
+                    total: data.total,
+                    countPrefix: 'عدد المنافسات: '
+                };
+                updateLoadMoreButton();
                 // Show the bulk classification check button
                 if (checkClassificationBtn && data.count > 0) {
                     checkClassificationBtn.style.display = 'inline-block';
@@ -243,6 +307,14 @@ document.addEventListener('DOMContentLoaded', function() {
         }
     }
 
+    function formatCacheStatus(cache) {
+        if (!cache || cache.age_seconds === null) return '';
+        const minutes = Math.floor(cache.age_seconds / 60);
+        const age = minutes > 0 ? `منذ ${minutes} دقيقة` : 'الآن';
+        const refreshing = cache.refreshing ? ' - جاري التحديث في الخلفية' : '';
+        return ` (آخر تحديث: ${age}${refreshing})`;
+    }
+
     function displayTenders(tenders) {
         if (tenders.length === 0) {
             tendersContainer.innerHTML = `
@@ -442,6 +514,10 @@ document.addEventListener('DOMContentLoaded', function() {
             if (!data.success) {
                 throw new Error(data.error);
             }
+            if (data.report?.failed) {
+                console.warn(`⚠️ ${data.report.failed} attachment(s) failed:`,
+                    data.report.files.filter(f => f.status !== 'ok'));
+            }
 
             // Step 2: Get tenderIdString from same card
             const tenderIdString = card?.querySelector('.btn-classification')?.getAttribute('data-tender-id-str');
@@ -585,56 +661,67 @@ document.addEventListener('DOMContentLoaded', function() {
         let deleted = 0;
         let errors = 0;
 
-        // Process each tender
+        // Map tenderIdString -> card; results stream back in completion order
+        const cardsById = new Map();
         for (const card of allCards) {
             const tenderIdStr = card.querySelector('.btn-classification')?.getAttribute('data-tender-id-str');
-            
-            if (!tenderIdStr) {
+            if (tenderIdStr) {
+                cardsById.set(tenderIdStr, card);
+            } else {
                 errors++;
-                continue;
             }
+        }
 
-            try {
-                // Fetch classification
-                const response = await fetch(`/api/tender/${tenderIdStr}/classification`);
-                const data = await response.json();
+        const handleResult = (data) => {
+            const card = cardsById.get(data.tenderIdString);
+            if (!card) return;
 
-                checked++;
-                
-                // Update button text with progress
-                checkClassificationBtn.textContent = `⏳ فحص ${checked}/${allCards.length}...`;
+            checked++;
+            checkClassificationBtn.textContent = `⏳ فحص ${checked}/${cardsById.size}...`;
 
-                if (data.success && data.requires_classification) {
-                    // This tender requires classification - delete it
-                    card.classList.add('deleting');
-                    
-                    // Delete the tender (UI only)
-                    await fetch(`/api/tender/${card.getAttribute('data-tender-id')}/delete`, {
-                        method: 'DELETE'
-                    });
+            if (data.success && data.requires_classification) {
+                // This tender requires classification - delete it (UI only)
+                card.classList.add('deleted');
+                fetch(`/api/tender/${card.getAttribute('data-tender-id')}/delete`, { method: 'DELETE' });
+                setTimeout(() => card.remove(), 300);
 
-                    card.classList.remove('deleting');
-                    card.classList.add('deleted');
-                    
-                    // Remove from DOM
-                    setTimeout(() => card.remove(), 300);
-                    
-                    deleted++;
-                    console.log(`✅ Deleted: ${tenderIdStr} - Classification: ${data.classification}`);
-                } else if (data.success) {
-                    console.log(`✓ Kept: ${tenderIdStr} - No classification required`);
-                } else {
-                    console.warn(`⚠ Error checking: ${tenderIdStr}`);
-                    errors++;
-                }
+                deleted++;
+                console.log(`✅ Deleted: ${data.tenderIdString} - Classification: ${data.classification}`);
+            } else if (data.success) {
+                console.log(`✓ Kept: ${data.tenderIdString} - No classification required${data.cached ? ' (cached)' : ''}`);
+            } else {
+                console.warn(`⚠ Error checking: ${data.tenderIdString}`);
+                errors++;
+            }
+        };
 
-                // Small delay to avoid overwhelming the server
-                await new Promise(resolve => setTimeout(resolve, 500));
+        try {
+            // One streaming request: the server fetches classifications concurrently
+            // (stored ones come back immediately) and sends one JSON line per tender
+            const response = await fetch('/api/tenders/classifications', {
+                method: 'POST',
+                headers: { 'Content-Type': 'application/json' },
+                body: JSON.stringify({ tender_ids: [...cardsById.keys()] })
+            });
+            if (!response.ok) {
+                throw new Error(`HTTP ${response.status}`);
+            }
 
-            } catch (error) {
-                console.error(`Error processing ${tenderIdStr}:`, error);
-                errors++;
+            const reader = response.body.getReader();
+            const decoder = new TextDecoder();
+            let buffer = '';
+            while (true) {
+                const { value, done } = await reader.read();
+                if (done) break;
+                buffer += decoder.decode(value, { stream: true });
+                const lines = buffer.split('\n');
+                buffer = lines.pop();
+                lines.filter(line => line.trim()).forEach(line => handleResult(JSON.parse(line)));
             }
+            if (buffer.trim()) handleResult(JSON.parse(buffer));
+        } catch (error) {
+            console.error('Bulk classification check failed:', error);
+            errors += cardsById.size - checked;
         }
 
         // Update final count
@@ -0,0 +1,146 @@
+"""
+Benchmark: sync TenderScraper vs AsyncTenderScraper on a local stub server
+
+Starts a stub of the Etimad listing and classification endpoints that adds a
+fixed latency to every response, then times a full listing sweep and a batch of
+classification lookups with each backend.
+
+Usage:
+    python tests/benchmark_async_scraper.py [--pages 40] [--latency 0.1] [--concurrency 8]
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import itertools
+import json
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import urlparse, parse_qs
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.scrapers.tender_scraper import TenderScraper
+from src.scrapers.async_scraper import AsyncTenderScraper
+from src.scrapers.http_client import EtimadHttpClient
+from src.scrapers.tender_store import TenderStore
+
+PAGE_SIZE = 24
+
+CLASSIFICATION_HTML = """
+<ul>
+  <li class="list-group-item"><div class="etd-item-title">مجال التصنيف</div><div class="etd-item-info">غير مطلوب</div></li>
+  <li class="list-group-item"><div class="etd-item-title">الحزمة</div><div class="etd-item-info">الحزمة الأولى</div></li>
+</ul>
+"""
+
+
+def make_handler(total_pages, latency):
+    total_count = total_pages * PAGE_SIZE
+
+    class StubHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def do_GET(self):
+            time.sleep(latency)
+            url = urlparse(self.path)
+            query = parse_qs(url.query)
+
+            if url.path.endswith('AllSupplierTendersAsync'):
+                page = int(query.get('PageNumber', ['1'])[0])
+                data = [{'tenderIdString': f'{page}-{i}', 'tenderName': f'Tender {page}-{i}'}
+                        for i in range(PAGE_SIZE)] if page <= total_pages else []
+                body = json.dumps({'data': data, 'totalCount': total_count}).encode('utf-8')
+                content_type = 'application/json; charset=utf-8'
+            else:
+                body = CLASSIFICATION_HTML.encode('utf-8')
+                content_type = 'text/html; charset=utf-8'
+
+            self.send_response(200)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return StubHandler
+
+
+def point_to(scraper, base_url):
+    scraper.base_url = base_url
+    scraper.api_url = f"{base_url}/Tender/AllSupplierTendersAsync"
+    return scraper
+
+
+def timed(fn):
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = fn()
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--pages', type=int, default=40)
+    parser.add_argument('--classifications', type=int, default=200)
+    parser.add_argument('--latency', type=float, default=0.1, help='Stub response latency in seconds')
+    parser.add_argument('--concurrency', type=int, default=8)
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), make_handler(args.pages, args.latency))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_port}"
+
+    http_client = EtimadHttpClient(host_pool_sizes={'127.0.0.1': args.concurrency})
+    tender_ids = [f'id-{i}' for i in range(args.classifications)]
+
+    # Every engine writes to its own throwaway store, never to data/tenders.db
+    data_dir = tempfile.TemporaryDirectory()
+    stores = itertools.count(1)
+
+    def temp_store():
+        return TenderStore(Path(data_dir.name) / f'tenders-{next(stores)}.db')
+
+    sequential = point_to(TenderScraper(use_api=True, fetch_concurrency=1, request_delay=0, http_client=http_client,
+                                        store=temp_store()), base_url)
+    threaded = point_to(TenderScraper(use_api=True, fetch_concurrency=args.concurrency, request_delay=0,
+                                      http_client=http_client, store=temp_store()), base_url)
+
+    async def run_async(coroutine_fn):
+        engine = point_to(AsyncTenderScraper(use_api=True, concurrency=args.concurrency, http_client=http_client,
+                                             store=temp_store()), base_url)
+        try:
+            return await coroutine_fn(engine)
+        finally:
+            await engine.close()
+
+    rows = [
+        ('listing  sync (sequential)', lambda: sequential.fetch_all_tenders(args.pages)),
+        (f'listing  sync ({args.concurrency} threads)', lambda: threaded.fetch_all_tenders(args.pages)),
+        (f'listing  async ({args.concurrency} in flight)',
+         lambda: asyncio.run(run_async(lambda e: e.fetch_all_tenders(args.pages)))),
+        ('classify sync (sequential)', lambda: [sequential.get_tender_classification(t) for t in tender_ids]),
+        (f'classify async ({args.concurrency} in flight)',
+         lambda: asyncio.run(run_async(lambda e: e.get_tender_classifications(tender_ids)))),
+    ]
+
+    print(f"Stub server: {base_url}  pages={args.pages}  classifications={args.classifications}  latency={args.latency}s\n")
+    print(f"{'backend':<36}{'seconds':>10}{'requests/s':>14}{'items':>8}")
+    for name, fn in rows:
+        elapsed, result = timed(fn)
+        requests_made = args.pages if name.startswith('listing') else args.classifications
+        print(f"{name:<36}{elapsed:>10.2f}{requests_made / elapsed:>14.1f}{len(result):>8}")
+
+    server.shutdown()
+    data_dir.cleanup()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,121 @@
+"""
+Benchmark: pandas vs streaming Excel extraction on a large multi-sheet BOQ
+
+Generates a bill of quantities workbook (Arabic/English item descriptions,
+quantities, prices, dates) with openpyxl, then reads it with the pandas code
+DocumentProcessor used before (whole file re-read per sheet, full to_string)
+and with the single-pass read-only reader. Times are measured without
+tracing; peak Python memory is measured in a second, traced run.
+
+Usage:
+    python tests/benchmark_excel_reader.py [--sheets 5] [--rows 20000] [--text-rows 1000]
+"""
+import argparse
+import logging
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date, timedelta
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.processors.document_processor import DocumentProcessor
+
+ITEMS = [
+    ('توريد وتركيب كابلات شبكة', 'Supply and install Cat6 cabling', 'م.ط'),
+    ('أعمال الحفر والردم', 'Excavation and backfilling', 'م3'),
+    ('توريد خرسانة جاهزة', 'Ready-mix concrete supply', 'م3'),
+    ('أجهزة تكييف مركزي', 'Central air conditioning units', 'عدد'),
+]
+
+
+def generate_workbook(path, sheets, rows):
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    start = date(2025, 1, 1)
+    for sheet_num in range(1, sheets + 1):
+        sheet = workbook.create_sheet(f'BOQ {sheet_num}')
+        sheet.append(['رقم البند', 'الوصف', 'Description', 'الوحدة', 'الكمية', 'سعر الوحدة', 'الإجمالي', 'التاريخ'])
+        for row in range(1, rows + 1):
+            arabic, english, unit = ITEMS[row % len(ITEMS)]
+            quantity = (row * 7) % 500 + 1
+            price = round(((row * 13) % 900 + 10) * 1.25, 2)
+            sheet.append([f'{sheet_num}.{row}', arabic, f'{english} - lot {row}', unit, quantity, price,
+                          round(quantity * price, 2), start + timedelta(days=row % 365)])
+    workbook.save(path)
+
+
+def original_read_excel(file_path):
+    """The pandas extraction DocumentProcessor._process_excel used before excel_reader"""
+    import pandas as pd
+
+    excel_file = pd.ExcelFile(file_path)
+    result = {'sheets': {}, 'text_summary': []}
+    for sheet_name in excel_file.sheet_names:
+        df = pd.read_excel(file_path, sheet_name=sheet_name)
+        sheet_text = f"Sheet: {sheet_name}\n"
+        sheet_text += df.to_string(index=False)
+        result['sheets'][sheet_name] = {
+            'rows': len(df),
+            'columns': list(df.columns),
+            'data': df.to_dict('records')[:100],
+            'text': sheet_text
+        }
+        result['text_summary'].append(sheet_text)
+    return result
+
+
+def measure(read, path):
+    start = time.perf_counter()
+    result = read(path)
+    seconds = time.perf_counter() - start
+
+    tracemalloc.start()
+    read(path)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, seconds, peak / 1024 / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sheets', type=int, default=5)
+    parser.add_argument('--rows', type=int, default=20000)
+    parser.add_argument('--text-rows', type=int, default=1000)
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    processor = DocumentProcessor(excel_text_rows=args.text_rows)
+
+    with tempfile.TemporaryDirectory() as folder:
+        path = Path(folder) / 'boq.xlsx'
+        start = time.perf_counter()
+        generate_workbook(path, args.sheets, args.rows)
+        print(f"📊 Generated {args.sheets} sheets x {args.rows:,} rows "
+              f"({path.stat().st_size / 1024 / 1024:.1f} MB) in {time.perf_counter() - start:.1f}s")
+
+        pandas_result, pandas_seconds, pandas_peak = measure(original_read_excel, path)
+        stream_result, stream_seconds, stream_peak = measure(processor._process_excel, path)
+
+    for name, sheet in stream_result['sheets'].items():
+        expected = pandas_result['sheets'][name]
+        if sheet['rows'] != expected['rows'] or sheet['columns'] != [str(c) for c in expected['columns']]:
+            print(f"❌ {name}: streaming reader saw {sheet['rows']} rows / {sheet['columns']}, "
+                  f"pandas {expected['rows']} / {expected['columns']}")
+            return 1
+    print(f"✅ Same sheets, row counts and columns ({sum(s['rows'] for s in stream_result['sheets'].values()):,} rows)")
+
+    text_chars = lambda result: sum(len(text) for text in result['text_summary'])
+    print(f"{'reader':<22}{'seconds':>10}{'peak MB':>10}{'text chars':>14}")
+    print(f"{'pandas (before)':<22}{pandas_seconds:>10.2f}{pandas_peak:>10.1f}{text_chars(pandas_result):>14,}")
+    print(f"{'streaming':<22}{stream_seconds:>10.2f}{stream_peak:>10.1f}{text_chars(stream_result):>14,}")
+    print(f"Speedup: {pandas_seconds / stream_seconds:.2f}x, memory: {pandas_peak / stream_peak:.1f}x less")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,95 @@
+"""
+Benchmark: HTML extraction backends on saved Etimad view-component pages
+
+Times the original BeautifulSoup walks against every available backend of
+src/scrapers/html_extract.py on the fixture pages in tests/fixtures/etimad,
+after checking that each backend extracts exactly the same values.
+
+Usage:
+    python tests/benchmark_html_extraction.py [--iterations 2000]
+"""
+import argparse
+import re
+import sys
+import time
+from pathlib import Path
+
+from bs4 import BeautifulSoup
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.scrapers.html_extract import available_backends, get_extractor
+
+FIXTURES = Path(__file__).parent / 'fixtures' / 'etimad'
+
+
+def original_extract(html):
+    """The BeautifulSoup walks TenderScraper used before html_extract"""
+    soup = BeautifulSoup(html, 'html.parser')
+    items = []
+    for item in soup.find_all('li', class_='list-group-item'):
+        title_div = item.find('div', class_='etd-item-title')
+        info_div = item.find('div', class_='etd-item-info')
+        if title_div and info_div:
+            items.append((title_div.get_text(strip=True), info_div.get_text(strip=True)))
+
+    soup = BeautifulSoup(html, 'html.parser')
+    tender_id = None
+    form = soup.find('form', action='PrintConditionsTemplateRfp')
+    if form:
+        tender_id_input = form.find('input', {'name': 'STenderId'})
+        if tender_id_input:
+            tender_id = tender_id_input.get('value', '')
+
+    links = []
+    for link in soup.find_all('a', onclick=True):
+        match = re.search(r"RedirectURL\('([^']+)','([^']+)'\)", link.get('onclick', ''))
+        if match:
+            links.append((match.group(1), match.group(2)))
+
+    return items, tender_id, links
+
+
+def backend_extract(extractor):
+    def extract(html):
+        return extractor.list_items(html), extractor.rfp_tender_id(html), extractor.redirect_links(html)
+    return extract
+
+
+def bench(extract, pages, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        for html in pages.values():
+            extract(html)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--iterations', type=int, default=2000)
+    args = parser.parse_args()
+
+    pages = {path.name: path.read_text(encoding='utf-8') for path in sorted(FIXTURES.glob('*.html'))}
+    extractors = {'original (bs4 walk)': original_extract}
+    for name in available_backends():
+        extractors[name] = backend_extract(get_extractor(name))
+
+    # Every backend must return exactly what the original walk returned
+    for page_name, html in pages.items():
+        expected = original_extract(html)
+        for name, extract in extractors.items():
+            assert extract(html) == expected, f"{name} differs from the original on {page_name}"
+
+    print(f"{len(pages)} fixture pages x {args.iterations} iterations (outputs verified identical)\n")
+    print(f"{'backend':<24}{'seconds':>10}{'pages/s':>12}{'speedup':>10}")
+    baseline = None
+    for name, extract in extractors.items():
+        elapsed = bench(extract, pages, args.iterations)
+        baseline = baseline or elapsed
+        rate = len(pages) * args.iterations / elapsed
+        print(f"{name:<24}{elapsed:>10.2f}{rate:>12.0f}{baseline / elapsed:>9.1f}x")
+
+
+if __name__ == '__main__':
+    main()
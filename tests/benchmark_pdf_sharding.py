@@ -0,0 +1,149 @@
+"""
+Benchmark: whole-file vs page-sharded extraction of a large PDF
+
+Generates a conditions booklet of mixed Arabic/English pages with reportlab,
+extracts it with DocumentProcessor in this process (the old single loop) and
+then with page shards spread over worker processes, and checks that both give
+exactly the same text before comparing the times.
+
+Arabic text needs a TrueType font with Arabic glyphs (Arial, Tahoma, DejaVu Sans,
+Noto Naskh...); one is searched for in the usual places or given with --font.
+Without one the Arabic lines are drawn with Helvetica and extract as filler
+characters, which still exercises the same extraction work.
+
+Usage:
+    python tests/benchmark_pdf_sharding.py [--pages 500] [--workers 4] [--shard-pages 50] [--font PATH]
+"""
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.processors.document_processor import DocumentProcessor
+
+FONT_CANDIDATES = [
+    'C:/Windows/Fonts/arial.ttf',
+    'C:/Windows/Fonts/tahoma.ttf',
+    '/Library/Fonts/Arial Unicode.ttf',
+    '/System/Library/Fonts/Supplemental/Arial.ttf',
+    '/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf',
+    '/usr/share/fonts/dejavu/DejaVuSans.ttf',
+    '/usr/share/fonts/truetype/noto/NotoNaskhArabic-Regular.ttf',
+]
+
+ARABIC_LINES = [
+    'كراسة الشروط والمواصفات للمنافسة العامة',
+    'يلتزم المتنافس بتقديم العرض الفني والعرض المالي في ملفين منفصلين',
+    'مدة تنفيذ المشروع اثنا عشر شهراً من تاريخ تسليم الموقع',
+    'الضمان الابتدائي بنسبة واحد بالمائة من قيمة العرض',
+]
+
+ENGLISH_LINES = [
+    'Scope of work: supply, installation and commissioning of network equipment',
+    'Bidders must submit the technical and financial proposals separately',
+    'Item {item}: Cat6 cabling, {qty} meters, unit price to be quoted in SAR',
+    'Penalty for delay: 1% of the contract value per week, capped at 10%',
+]
+
+
+def find_font(path=None):
+    for candidate in ([path] if path else FONT_CANDIDATES):
+        if candidate and Path(candidate).exists():
+            return candidate
+    return None
+
+
+def generate_pdf(path, pages, font_path):
+    from reportlab.lib.pagesizes import A4
+    from reportlab.pdfgen import canvas
+
+    arabic_font = 'Helvetica'
+    if font_path:
+        from reportlab.pdfbase import pdfmetrics
+        from reportlab.pdfbase.ttfonts import TTFont
+        pdfmetrics.registerFont(TTFont('Arabic', font_path))
+        arabic_font = 'Arabic'
+
+    pdf = canvas.Canvas(str(path), pagesize=A4)
+    width, height = A4
+    for page in range(1, pages + 1):
+        y = height - 60
+        pdf.setFont('Helvetica-Bold', 14)
+        pdf.drawString(50, y, f'Section {page} - Conditions Booklet')
+        y -= 30
+        for line in range(36):
+            if line % 2:
+                pdf.setFont(arabic_font, 10)
+                pdf.drawRightString(width - 50, y, ARABIC_LINES[(page + line) % len(ARABIC_LINES)])
+            else:
+                pdf.setFont('Helvetica', 10)
+                text = ENGLISH_LINES[(page + line) % len(ENGLISH_LINES)]
+                pdf.drawString(50, y, text.format(item=page * 100 + line, qty=line * 25))
+            y -= 19
+        pdf.showPage()
+    pdf.save()
+
+
+def timed(processor, folder):
+    start = time.perf_counter()
+    result = processor.process_folder(folder)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--pages', type=int, default=500)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--shard-pages', type=int, default=50)
+    parser.add_argument('--font', help='TrueType font with Arabic glyphs')
+    args = parser.parse_args()
+
+    try:
+        import reportlab  # noqa: F401
+    except ImportError:
+        print('❌ This benchmark generates its PDF with reportlab: pip install reportlab')
+        return 1
+
+    logging.disable(logging.INFO)
+    font_path = find_font(args.font)
+    if not font_path:
+        print('⚠️  No Arabic font found (use --font); Arabic lines fall back to Helvetica')
+
+    with tempfile.TemporaryDirectory() as folder:
+        pdf_path = Path(folder) / 'conditions_booklet.pdf'
+        start = time.perf_counter()
+        generate_pdf(pdf_path, args.pages, font_path)
+        print(f"📄 Generated {args.pages}-page PDF ({pdf_path.stat().st_size / 1024 / 1024:.1f} MB) "
+              f"in {time.perf_counter() - start:.1f}s")
+
+        serial, serial_seconds = timed(DocumentProcessor(), folder)
+
+        processor = DocumentProcessor(workers=args.workers, shard_min_pages=1, shard_pages=args.shard_pages)
+        try:
+            processor._get_pool().map([(pdf_path, [1])] * args.workers)  # start the workers outside the timing
+            sharded, sharded_seconds = timed(processor, folder)
+        finally:
+            processor._get_pool().shutdown()
+
+    if serial != sharded:
+        print('❌ Sharded extraction differs from whole-file extraction')
+        return 1
+
+    shards = -(-args.pages // args.shard_pages)
+    print(f"✅ Identical output: {serial['total_text_length']:,} characters")
+    print(f"{'mode':<28}{'seconds':>10}{'pages/s':>10}")
+    print(f"{'whole file (1 process)':<28}{serial_seconds:>10.2f}{args.pages / serial_seconds:>10.1f}")
+    label = f"{shards} shards / {args.workers} workers"
+    print(f"{label:<28}{sharded_seconds:>10.2f}{args.pages / sharded_seconds:>10.1f}")
+    print(f"Speedup: {serial_seconds / sharded_seconds:.2f}x on {os.cpu_count()} CPUs")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
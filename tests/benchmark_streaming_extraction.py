@@ -0,0 +1,120 @@
+"""
+Benchmark: process_folder() vs iter_pages() + PageTextStore on a large PDF
+
+Generates a conditions booklet with reportlab (see benchmark_pdf_sharding.py),
+then extracts it in two fresh processes: once with process_folder(), which
+keeps every page of the tender in memory, and once page by page with
+iter_pages() spilling into a PageTextStore that is read back from disk. Both
+runs hash the "--- Page N ---" text they end up with, so the comparison only
+counts if the texts are identical. Peak RSS comes from getrusage (Unix only).
+
+Usage:
+    python tests/benchmark_streaming_extraction.py [--pages 300] [--font PATH]
+"""
+import argparse
+import hashlib
+import json
+import logging
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add project root (and this folder, for the PDF generator) to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from benchmark_pdf_sharding import find_font, generate_pdf
+
+
+def peak_rss_mb():
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak / 1024 / 1024 if sys.platform == 'darwin' else peak / 1024
+
+
+def measure(mode, folder):
+    """Run one extraction mode in this (fresh) process and report it as JSON"""
+    from src.processors import DocumentProcessor, PageTextStore
+
+    logging.disable(logging.INFO)
+    processor = DocumentProcessor()
+    hasher = hashlib.sha256()
+    start = time.perf_counter()
+
+    if mode == 'whole':
+        result = processor.process_folder(folder)
+        for pdf in result['pdfs']:
+            hasher.update(pdf['content'].encode('utf-8'))
+        pages = sum(pdf['content'].count('--- Page ') for pdf in result['pdfs'])
+    else:
+        with PageTextStore() as store:
+            for _ in processor.iter_pages(folder, store=store):
+                pass
+            for index, record in enumerate(store.pages()):
+                block = f"--- Page {record.page} ---\n{record.text}"
+                hasher.update((block if not index else "\n\n" + block).encode('utf-8'))
+            pages = len(store)
+
+    print(json.dumps({
+        'seconds': time.perf_counter() - start,
+        'peak_mb': peak_rss_mb(),
+        'pages': pages,
+        'sha256': hasher.hexdigest(),
+    }))
+
+
+def run(mode, folder):
+    output = subprocess.run([sys.executable, __file__, '--measure', mode, folder],
+                            check=True, capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--pages', type=int, default=300)
+    parser.add_argument('--font', help='TrueType font with Arabic glyphs')
+    parser.add_argument('--measure', nargs=2, metavar=('MODE', 'FOLDER'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure:
+        measure(*args.measure)
+        return 0
+
+    try:
+        import reportlab  # noqa: F401
+        import resource  # noqa: F401
+    except ImportError as e:
+        print(f'❌ This benchmark needs reportlab and a Unix resource module: {e}')
+        return 1
+
+    font_path = find_font(args.font)
+    if not font_path:
+        print('⚠️  No Arabic font found (use --font); Arabic lines fall back to Helvetica')
+
+    with tempfile.TemporaryDirectory() as folder:
+        pdf_path = Path(folder) / 'conditions_booklet.pdf'
+        start = time.perf_counter()
+        generate_pdf(pdf_path, args.pages, font_path)
+        print(f"📄 Generated {args.pages}-page PDF ({pdf_path.stat().st_size / 1024 / 1024:.1f} MB) "
+              f"in {time.perf_counter() - start:.1f}s")
+
+        whole = run('whole', folder)
+        streamed = run('stream', folder)
+
+    if whole['sha256'] != streamed['sha256']:
+        print('❌ Streamed pages differ from process_folder() text')
+        return 1
+
+    print(f"✅ Identical text: {streamed['pages']} pages")
+    print(f"{'mode':<30}{'seconds':>10}{'peak RSS MB':>14}")
+    print(f"{'process_folder (in memory)':<30}{whole['seconds']:>10.2f}{whole['peak_mb']:>14.1f}")
+    print(f"{'iter_pages + PageTextStore':<30}{streamed['seconds']:>10.2f}{streamed['peak_mb']:>14.1f}")
+    print(f"Peak memory: {whole['peak_mb'] / streamed['peak_mb']:.1f}x less")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())